@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+End-to-end cycle benchmark against the local Inpol mock (mock_inpol.py).
+
+Starts the mock, points the checker at it (INPOL_BASE_URL) and runs
+run_staged_multi_loop_wh.check() a number of times, then reports cycle time
+percentiles and what the mock served. Needs Chrome, nothing else from outside.
+
+Run with: python bench_cycle.py --cycles 10 --latency 0.3 --slots 2 [--session-reuse]
+"""
+
+import argparse
+import logging
+import math
+import os
+import tempfile
+import time
+
+import mock_inpol
+from lib.messenger import ConsoleMessenger
+
+
+class RecordingMessenger(ConsoleMessenger):
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, body: str):
+        self.messages.append(body)
+        super().send_message(body)
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full checking cycles against the local Inpol mock')
+    parser.add_argument('--cycles', type=int, default=5, help='number of check() runs')
+    parser.add_argument('--session-reuse', action='store_true', help='keep one browser session for all cycles')
+    mock_inpol.add_scenario_arguments(parser)
+    args = parser.parse_args()
+
+    log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=log_level)
+
+    server = mock_inpol.serve(mock_inpol.scenario_from_args(args))
+    workdir = tempfile.mkdtemp(prefix='inpol-bench-')
+    os.environ['INPOL_BASE_URL'] = server.base_url
+    os.environ.setdefault('EMAIL', 'bench@example.com')
+    os.environ.setdefault('PASSWORD', 'bench')
+    os.environ.setdefault('CASE_ID', 'bench-case')
+    os.environ.setdefault('HEADLESS', 'true')
+    os.environ.setdefault('DATE_CACHE_PATH', os.path.join(workdir, 'date-cache.json'))
+    logging.info(f'Mock Inpol at {server.base_url}, scratch files in {workdir}')
+
+    # Imported after INPOL_BASE_URL/HEADLESS are set
+    import run_staged_multi_loop_wh as runner
+    from lib.browser_factory import BrowserFactory
+    from lib.browser_session import BrowserSession
+
+    messenger = RecordingMessenger()
+    session = BrowserSession.from_env(BrowserFactory()) if args.session_reuse else None
+    durations = []
+    failures = 0
+    try:
+        for cycle in range(1, args.cycles + 1):
+            started = time.perf_counter()
+            try:
+                runner.check(messenger, session)
+            except Exception as e:
+                failures += 1
+                logging.error(f'Cycle {cycle} failed: {e}')
+            durations.append(time.perf_counter() - started)
+            logging.info(f'Cycle {cycle}/{args.cycles}: {durations[-1]:.1f}s')
+    finally:
+        if session is not None:
+            session.close()
+        server.shutdown()
+
+    ordered = sorted(durations)
+    print()
+    print(f'cycles: {len(ordered)} (failed: {failures}), scenario: latency={args.latency}s '
+          f'jitter={args.jitter}s horizon={args.horizon_days}d slots={args.slots}')
+    print(f'cycle time: p50 {percentile(ordered, 0.5):.2f}s  p90 {percentile(ordered, 0.9):.2f}s  '
+          f'p95 {percentile(ordered, 0.95):.2f}s  max {ordered[-1]:.2f}s  mean {sum(ordered) / len(ordered):.2f}s')
+    print(f'slot notifications: {sum("SLOT FOUND" in m for m in messenger.messages)}')
+    print('mock requests: ' + ', '.join(f'{path} {count}' for path, count in sorted(server.requests.items())))
+
+
+if __name__ == '__main__':
+    main()
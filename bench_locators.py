@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the locator registry (lib/locators.py).
+
+Loads a captured page (HTML saved from the browser, e.g. "Save page as..." on
+the case page with an open calendar) and measures browser-side lookup time of
+every locator in its CSS and XPath form.
+
+Run with: python bench_locators.py captured_case_page.html [--repeat 1000]
+"""
+
+import argparse
+import logging
+import os
+import pathlib
+
+from lib import locators
+from lib.browser_factory import BrowserFactory
+
+
+# Runs the lookup `repeat` times inside the page so WebDriver round-trips
+# are not part of the measurement.
+BENCH_JS = '''
+const [kind, selector, repeat] = arguments;
+let found = 0;
+const started = performance.now();
+for (let i = 0; i < repeat; i++) {
+    if (kind === 'css') {
+        found = document.querySelectorAll(selector).length;
+    } else {
+        found = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+    }
+}
+return {elapsed: (performance.now() - started) / repeat, found: found};
+'''
+
+
+def measure(browser, kind, selector, repeat):
+    """Mean lookup time in microseconds and number of matched elements."""
+    result = browser.execute_script(BENCH_JS, kind, selector, repeat)
+    return result['elapsed'] * 1000, int(result['found'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSS vs XPath lookup of every registered locator')
+    parser.add_argument('html', help='captured page HTML file')
+    parser.add_argument('--repeat', type=int, default=1000, help='lookups per locator and form')
+    args = parser.parse_args()
+
+    log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=log_level)
+
+    browser = BrowserFactory().create(window_size='1300,800')
+    try:
+        browser.get(pathlib.Path(args.html).resolve().as_uri())
+
+        print(f'{"locator":<22} {"css µs":>9} {"xpath µs":>9} {"speedup":>8} {"found":>11}')
+        for locator in locators.ALL:
+            xpath_time, xpath_found = measure(browser, 'xpath', locator.xpath, args.repeat)
+            if locator.css is None:
+                print(f'{locator.name:<22} {"-":>9} {xpath_time:>9.1f} {"-":>8} {xpath_found:>11}')
+                continue
+            css_time, css_found = measure(browser, 'css', locator.css, args.repeat)
+            speedup = f'{xpath_time / css_time:>7.2f}x' if css_time > 0 else f'{"-":>8}'
+            mismatch = '' if css_found == xpath_found else ' !'
+            print(f'{locator.name:<22} {css_time:>9.1f} {xpath_time:>9.1f} '
+                  f'{speedup} {css_found:>4}/{xpath_found:<4}{mismatch}')
+    finally:
+        browser.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Offline replay of DOM snapshots recorded with DOM_RECORD_DIR (lib/dom_recorder.py).
+
+Loads every recorded page into headless Chrome (scripts stripped, so the
+page stays as it was recorded) and runs the Checker's own logic on it:
+calendar_snapshot() and the furthest-date choice on calendar pages, the
+time slot count on slot pages, captcha_reason() on every page. Results are
+compared with what the live run recorded and the time of each step is
+reported. With --fake no browser is started: the recorded calendars are fed
+to the Checker through a stand-in driver, which replays the Python side of
+the date selection (month header parsing, weekends, holidays) only.
+
+Exits with status 1 if any page gives a different result than recorded.
+
+Run with: python bench_replay.py recordings/20240101-120000-123 [more dirs or files...] [--fake]
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import pathlib
+import re
+import tempfile
+import time
+
+from bench_cycle import percentile
+from lib import locators
+from lib.messenger import ConsoleMessenger
+
+SCRIPT_RE = re.compile(r'<script\b[^>]*>.*?</script\s*>', re.IGNORECASE | re.DOTALL)
+BASE_RE = re.compile(r'<base\b[^>]*>', re.IGNORECASE)
+
+
+class RecordedBrowser:
+    """Stands in for the driver: returns the calendar recorded by the live run and finds no elements."""
+
+    def __init__(self):
+        self.meta = {}
+
+    def execute_script(self, script, *args):
+        calendar = self.meta.get('calendar')
+        if calendar is None:
+            return None
+        return {'monthYear': calendar['month_year'], 'cells': calendar['cells']}
+
+    def find_elements(self, *args):
+        return []
+
+
+def recorded_pages(paths: list[str]) -> list[str]:
+    """Sidecar .json files of the given run directories / files, in recording order."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, '**', '*.json'), recursive=True)))
+        elif path.endswith('.html.gz'):
+            found.append(path[:-len('.html.gz')] + '.json')
+        else:
+            found.append(path)
+    return found
+
+
+def load_page(browser, html_path: str, scratch: str):
+    """Open a recorded page without its scripts (the app would re-render or redirect it)."""
+    with gzip.open(html_path, 'rt', encoding='utf-8') as f:
+        html = BASE_RE.sub('', SCRIPT_RE.sub('', f.read()))
+    with open(scratch, 'w', encoding='utf-8') as f:
+        f.write(html)
+    browser.get(pathlib.Path(scratch).as_uri())
+
+
+def timed_call(function):
+    started = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def replay(inpol, meta: dict, fake: bool) -> tuple[dict, list[str]]:
+    """Timings (ms) of the checks run on the loaded page and the differences from the recording."""
+    timings, mismatches = {}, []
+
+    recorded = meta.get('calendar')
+    if recorded is not None:
+        snapshot, timings['calendar'] = timed_call(inpol.calendar_snapshot)
+        if snapshot is None:
+            mismatches.append('calendar not found')
+        else:
+            if snapshot.month_year != recorded['month_year']:
+                mismatches.append(f'header "{snapshot.month_year}" != "{recorded["month_year"]}"')
+            cells = [
+                {'index': c.index, 'day': c.day, 'disabled': c.disabled, 'weekend': c.weekend, 'holiday': c.holiday}
+                for c in snapshot.cells
+            ]
+            if cells != recorded['cells']:
+                mismatches.append(f'{len(snapshot.enabled_cells)} enabled of {len(cells)} cells differ from '
+                                  f'{sum(not c["disabled"] for c in recorded["cells"])} of {len(recorded["cells"])}')
+            last = snapshot.last_candidate()
+            last_day = last.day if last is not None else None
+            if last_day != recorded.get('last_candidate'):
+                mismatches.append(f'furthest date {last_day} != {recorded.get("last_candidate")}')
+
+    if fake:
+        return timings, mismatches
+
+    if meta.get('slot_count') is not None:
+        tiles, timings['slots'] = timed_call(lambda: locators.find_elements(inpol.config.browser, locators.TIME_SLOTS))
+        if len(tiles) != meta['slot_count']:
+            mismatches.append(f'{len(tiles)} slots != {meta["slot_count"]}')
+
+    reason, timings['captcha'] = timed_call(inpol.captcha_reason)
+    if (meta['stage'] == 'captcha') != (reason is not None):
+        mismatches.append(f'captcha: {reason or "not detected"} (recorded: {meta.get("captcha") or "none"})')
+    return timings, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded DOM snapshots through the checker logic')
+    parser.add_argument('paths', nargs='+', help='run directories of DOM_RECORD_DIR, or single snapshot files')
+    parser.add_argument('--fake', action='store_true', help='no browser, recorded calendars only')
+    args = parser.parse_args()
+
+    log_level = os.environ.get("LOG_LEVEL", "WARNING").upper()
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=log_level)
+    # The replay must not record itself
+    os.environ.pop('DOM_RECORD_DIR', None)
+    os.environ.setdefault('HEADLESS', 'true')
+
+    from lib.checker import Checker
+    from lib.checker_config import CheckerConfig
+
+    pages = recorded_pages(args.paths)
+    if not pages:
+        parser.error('no recorded snapshots found')
+
+    if args.fake:
+        browser = RecordedBrowser()
+    else:
+        from lib.browser_factory import BrowserFactory
+        browser = BrowserFactory().create(window_size='1300,800')
+    inpol = Checker(CheckerConfig(messenger=ConsoleMessenger(), browser=browser,
+                                  email='', password='', case_id='replay'))
+    fd, scratch = tempfile.mkstemp(prefix='inpol-replay-', suffix='.html')
+    os.close(fd)
+
+    timings = {}
+    failed = 0
+    try:
+        print(f'{"snapshot":<28} {"stage":<10} {"load ms":>8} {"calendar":>9} {"slots":>7} {"captcha":>8}  result')
+        for path in pages:
+            with open(path, encoding='utf-8') as f:
+                meta = json.load(f)
+            name = os.path.basename(path)[:-len('.json')]
+            load_ms = 0.0
+            if args.fake:
+                browser.meta = meta
+            else:
+                _, load_ms = timed_call(lambda: load_page(browser, path[:-len('.json')] + '.html.gz', scratch))
+            page_timings, mismatches = replay(inpol, meta, args.fake)
+            for step, ms in page_timings.items():
+                timings.setdefault(step, []).append(ms)
+            failed += bool(mismatches)
+            columns = ''.join(f'{page_timings[step]:>{width}.1f}' if step in page_timings else f'{"-":>{width}}'
+                              for step, width in (('calendar', 10), ('slots', 8), ('captcha', 9)))
+            print(f'{name:<28} {meta["stage"]:<10} {load_ms:>8.1f}{columns}  '
+                  f'{"; ".join(mismatches) if mismatches else "ok"}')
+    finally:
+        if not args.fake:
+            browser.quit()
+        os.unlink(scratch)
+
+    print()
+    print(f'snapshots: {len(pages)}, differing from the recording: {failed}')
+    for step, values in timings.items():
+        ordered = sorted(values)
+        print(f'{step}: p50 {percentile(ordered, 0.5):.2f}ms  p95 {percentile(ordered, 0.95):.2f}ms  '
+              f'max {ordered[-1]:.2f}ms  ({len(ordered)} runs)')
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ import os
 import sys
 import time
 
+from lib import locators
 from lib.browser_factory import BrowserFactory
 from lib.checker import Checker
 from lib.checker_config import CheckerConfig
@@ -96,8 +97,7 @@ try:
         time.sleep(3)
         
         print("\n→ Checking if calendar loaded...")
-        from selenium.webdriver.common.by import By
-        calendar = browser.find_elements(By.XPATH, '//mat-calendar[contains(@class,"reservation-calander")]')
+        calendar = locators.find_elements(browser, locators.CALENDAR)
         
         if calendar:
             print(f"✅ CALENDAR FOUND! ({len(calendar)} element(s))")
@@ -110,8 +110,7 @@ try:
         
         # Debug info
         print("\n--- DEBUG INFO ---")
-        from selenium.webdriver.common.by import By
-        all_options = browser.find_elements(By.XPATH, '//mat-option/span[@class="mat-option-text"]')
+        all_options = locators.find_elements(browser, locators.OPTION_TEXT)
         print(f"Currently visible options: {len(all_options)}")
         for opt in all_options:
             try:
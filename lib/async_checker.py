@@ -0,0 +1,330 @@
+"""
+asyncio Checker backend speaking the DevTools Protocol directly (lib.cdp).
+
+Same high-level operations as Checker - login, open_case_page,
+select_location, check_last_date_only - but every step is one or two CDP
+messages on a shared websocket instead of several chromedriver HTTP round
+trips, and waits are coroutines. One AsyncChecker drives one tab; several of
+them (tabs of one browser, or several browsers) run in one event loop, so the
+server waits of all of them overlap.
+
+Locators, the calendar snapshot and the idle tracker are the same JS the
+Selenium Checker uses. Clicks and typing go through Input.dispatch*, i.e.
+they are trusted browser events like Selenium's.
+"""
+
+import asyncio
+import json
+import logging
+import random as rand
+
+from lib import locators, working_days
+from lib.calendar_snapshot import SNAPSHOT_JS, CalendarCell, CalendarSnapshot
+from lib.captcha_probe import CAPTCHA_PROBE
+from lib.cdp import CdpSession
+from lib.checker import Checker
+from lib.checker_config import CheckerConfig
+from lib.page_idle import IDLE_WAIT_JS
+from lib.timing import PhaseTimer
+
+# Visible elements of a locator (CSS form, XPath as fallback), optionally containing `text`
+FIND_JS = '''
+(css, xpath, text) => {
+    let nodes = null;
+    if (css) {
+        try {
+            nodes = Array.from(document.querySelectorAll(css));
+        } catch (e) {
+            nodes = null;
+        }
+    }
+    if (nodes === null) {
+        const found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        nodes = [];
+        for (let i = 0; i < found.snapshotLength; i++) {
+            nodes.push(found.snapshotItem(i));
+        }
+    }
+    return nodes.filter(el => el.getClientRects().length > 0 && (!text || el.textContent.includes(text)));
+}
+'''
+
+WAIT_JS = '''
+(css, xpath, text, timeoutMs) => new Promise(resolve => {
+    const find = %s;
+    const started = Date.now();
+    (function poll() {
+        const count = find(css, xpath, text).length;
+        if (count > 0 || Date.now() - started >= timeoutMs) {
+            resolve(count);
+            return;
+        }
+        setTimeout(poll, 50);
+    })();
+})
+''' % FIND_JS
+
+# Scrolls the element into view and returns a point inside it for the mouse events
+POINT_JS = '''
+(css, xpath, text, index) => {
+    const el = (%s)(css, xpath, text)[index];
+    if (!el) {
+        return null;
+    }
+    el.scrollIntoView({block: 'center'});
+    const r = el.getBoundingClientRect();
+    return {x: r.left + r.width * (0.3 + Math.random() * 0.4), y: r.top + r.height * (0.3 + Math.random() * 0.4)};
+}
+''' % FIND_JS
+
+TEXTS_JS = '(css, xpath) => (%s)(css, xpath, null).map(el => el.textContent.trim())' % FIND_JS
+
+
+def _snapshot_function() -> str:
+    """SNAPSHOT_JS (written for execute_script) as a function; element handles are dropped."""
+    return ('(...args) => { const raw = (function () {%s}).apply(null, args);'
+            ' if (raw) { raw.cells.forEach(c => delete c.element); } return raw; }' % SNAPSHOT_JS)
+
+
+class AsyncChecker:
+    """
+    Checker for one tab. `config.browser` is not used (may be None); the tab
+    is the CdpSession.
+    """
+
+    def __init__(self, config: CheckerConfig, tab: CdpSession):
+        self.config = config
+        self.tab = tab
+        self.timer = PhaseTimer()
+        self.captcha_hits = 0
+
+    @property
+    def name(self):
+        return self.timer.location or self.config.case_id
+
+    # --- primitives ---
+
+    async def count(self, locator: locators.Locator, text: str | None = None) -> int:
+        return await self.wait_for(locator, text, timeout=0)
+
+    async def wait_for(self, locator: locators.Locator, text: str | None = None, timeout: float | None = None) -> int:
+        """Number of visible matches once there is at least one; 0 after `timeout` seconds."""
+        timeout = self.config.page_load_timeout if timeout is None else timeout
+        return await self.tab.call(WAIT_JS, locator.css, locator.xpath, text, int(timeout * 1000),
+                                   timeout=timeout + 10)
+
+    async def texts(self, locator: locators.Locator) -> list[str]:
+        return await self.tab.call(TEXTS_JS, locator.css, locator.xpath)
+
+    async def click(self, locator: locators.Locator, text: str | None = None, index: int = 0):
+        point = await self.tab.call(POINT_JS, locator.css, locator.xpath, text, index)
+        if point is None:
+            raise LookupError(f'{locator.name} ({text or index}) not found')
+        await asyncio.sleep(rand.uniform(0.05, 0.15))
+        mouse = {'x': point['x'], 'y': point['y'], 'button': 'left', 'clickCount': 1}
+        await self.tab.send('Input.dispatchMouseEvent', {'type': 'mouseMoved', 'x': point['x'], 'y': point['y']})
+        await self.tab.send('Input.dispatchMouseEvent', {'type': 'mousePressed', **mouse})
+        await asyncio.sleep(rand.uniform(0.03, 0.09))
+        await self.tab.send('Input.dispatchMouseEvent', {'type': 'mouseReleased', **mouse})
+
+    async def type_text(self, locator: locators.Locator, text: str):
+        await self.click(locator)
+        for char in text:
+            await self.tab.send('Input.insertText', {'text': char})
+            await asyncio.sleep(rand.uniform(0.05, 0.15))
+
+    async def wait_spinner(self):
+        """Checker.wait_spinner: no pending XHR/fetch, no spinner, quiet DOM."""
+        timeout = self.config.page_load_timeout
+        # IDLE_WAIT_JS is an execute_async_script body: the callback comes last
+        args = json.dumps([150, int(timeout * 1000), 25, locators.SPINNER.css])[1:-1]
+        expression = 'new Promise(resolve => (function () {%s})(%s, resolve))' % (IDLE_WAIT_JS, args)
+        with self.timer.phase('wait_spinner'):
+            result = await self.tab.evaluate(expression, timeout=timeout + 10)
+        if not isinstance(result, dict):
+            # The page navigated away during the wait: the promise was dropped with it
+            logging.debug(f'[{self.name}] idle wait interrupted, treating the page as not idle')
+            result = {'idle': False}
+        if not result.get('idle') and result.get('spinner'):
+            raise TimeoutError(f'spinner still visible after {timeout}s')
+
+    async def detect_captcha(self) -> bool:
+        """Checker.detect_captcha: notify and give the user two minutes to solve it."""
+        with self.timer.phase('detect_captcha'):
+            reason = await self.tab.call(CAPTCHA_PROBE, False)
+        if reason is None:
+            return False
+        logging.warning(f'[{self.name}] CAPTCHA DETECTED ({reason}) - pausing for 2 minutes')
+        self.config.messenger.send_message(
+            f'🚨 AKAMAI CAPTCHA DETECTED!\n📍 Detection: {reason}\n\n⏰ Bot paused for 2 minutes\n'
+            f'✅ Please solve the captcha manually')
+        await asyncio.sleep(120)
+        await asyncio.sleep(rand.uniform(3, 5))
+        try:
+            await self.wait_spinner()
+        except Exception:
+            logging.debug('No spinner after captcha')
+        self.captcha_hits += 1
+        return True
+
+    # --- high-level operations, as in Checker ---
+
+    def case_page_url(self) -> str:
+        return f'{Checker.base_url()}/home/cases/{self.config.case_id}'
+
+    async def login(self) -> bool:
+        with self.timer.phase('login'):
+            await self.tab.navigate(Checker.login_page_url())
+            await asyncio.sleep(rand.uniform(1.5, 3.0))
+            if not await self.wait_for(locators.LOGIN_SUBMIT):
+                logging.error('Login form did not appear')
+                return False
+            if await self.count(locators.COOKIE_DISMISS):
+                await self.click(locators.COOKIE_DISMISS)
+            await self.type_text(locators.EMAIL_INPUT, self.config.email)
+            await asyncio.sleep(rand.uniform(0.5, 1.2))
+            await self.type_text(locators.PASSWORD_INPUT, self.config.password)
+            await asyncio.sleep(rand.uniform(0.8, 1.5))
+            logging.info('sign in')
+            await self.click(locators.LOGIN_SUBMIT)
+            await asyncio.sleep(2)
+            if await self.count(locators.LOGIN_ERROR):
+                logging.error('Wrong password or maintenance hours')
+                return False
+            return await self.wait_for(locators.CASES_LINK) > 0
+
+    async def open_case_page(self) -> bool:
+        with self.timer.phase('open_case_page'):
+            await self.tab.navigate(self.case_page_url())
+            await asyncio.sleep(rand.uniform(0.5, 1.0))
+            await self.detect_captcha()
+            if not await self.wait_for(locators.APPOINTMENT_SECTION):
+                logging.error(f'[{self.name}] Appointment section not found')
+                return False
+            return True
+
+    async def expand_appointment_panel(self):
+        with self.timer.phase('expand_appointment_panel'):
+            await asyncio.sleep(rand.uniform(2, 4))
+            if await self.count(locators.LOCATION_DROPDOWN):
+                return
+            if await self.count(locators.APPOINTMENT_BUTTON):
+                await self.click(locators.APPOINTMENT_BUTTON)
+                await asyncio.sleep(rand.uniform(2, 3))
+
+    async def expand_locations(self):
+        await asyncio.sleep(rand.uniform(0.15, 0.35))
+        await self.wait_for(locators.LOCATION_DROPDOWN)
+        await self.click(locators.LOCATION_DROPDOWN)
+
+    async def get_locations(self) -> list[str]:
+        await self.wait_for(locators.OPTION_TEXT)
+        return [text for text in await self.texts(locators.OPTION_TEXT) if text != '-']
+
+    async def select_location(self, location_name: str):
+        logging.info(f'[{self.name}] location selection ({location_name})')
+        self.timer.location = location_name
+        with self.timer.phase('select_location'):
+            await self.wait_for(locators.OPTION_TEXT, location_name, timeout=3)
+            await self.click(locators.OPTION_TEXT, location_name)
+            await self.wait_spinner()
+
+    async def select_first_queue(self) -> str | None:
+        with self.timer.phase('select_first_queue_atomic'):
+            await asyncio.sleep(rand.uniform(0.1, 0.3))
+            await self.wait_for(locators.QUEUE_DROPDOWN)
+            await self.click(locators.QUEUE_DROPDOWN)
+            await self.wait_for(locators.OPTION_TEXT)
+            queues = [text for text in await self.texts(locators.OPTION_TEXT) if text != '-']
+            if not queues:
+                logging.warning(f'[{self.name}] No queues found in dropdown')
+                return None
+            logging.info(f'[{self.name}] queue selection ({queues[0]})')
+            await self.click(locators.OPTION_TEXT, queues[0])
+            await self.wait_spinner()
+            await self.detect_captcha()
+            return queues[0]
+
+    async def calendar_snapshot(self) -> CalendarSnapshot | None:
+        raw = await self.tab.call(_snapshot_function(), locators.CALENDAR.css, locators.CALENDAR_CELLS.css,
+                                  locators.CELL_CONTENT.css, locators.MONTH_YEAR.css)
+        if not raw:
+            return None
+        year, month = working_days.parse_month_year(raw.get('monthYear', ''))
+        cells = []
+        for item in raw.get('cells', []):
+            day = int(item['day'])
+            weekend = bool(year and month) and Checker.is_weekend_date(day, year, month)
+            holiday = bool(year and month) and not weekend and not Checker.is_bookable_date(day, year, month)
+            cells.append(CalendarCell(index=int(item['index']), day=day, disabled=bool(item['disabled']),
+                                      weekend=weekend, holiday=holiday))
+        return CalendarSnapshot(month_year=raw.get('monthYear', ''), year=year, month=month, cells=cells)
+
+    async def _month(self, locator: locators.Locator):
+        await self.click(locator)
+        await asyncio.sleep(rand.uniform(0.1, 0.2))
+        await self.wait_spinner()
+
+    async def find_furthest_available_date(self, max_months: int = 3) -> tuple[CalendarSnapshot, CalendarCell, int] | None:
+        """Checker.find_furthest_available_date without the date cache: (month, cell, months forward)."""
+        with self.timer.phase('find_furthest_available_date'):
+            for months_forward in range(max_months):
+                snapshot = await self.calendar_snapshot()
+                if snapshot is None or not snapshot.year or not snapshot.month:
+                    return None
+                last_cell = snapshot.last_candidate()
+                if last_cell is None:
+                    if months_forward == 0:
+                        return None
+                    # Nothing bookable in this month: the furthest date is at the end of the previous one
+                    await self._month(locators.PREV_MONTH)
+                    snapshot = await self.calendar_snapshot()
+                    last_cell = snapshot.last_candidate() if snapshot is not None else None
+                    return (snapshot, last_cell, months_forward - 1) if last_cell is not None else None
+                if last_cell.day != Checker.get_last_working_day_of_month(snapshot.year, snapshot.month):
+                    return snapshot, last_cell, months_forward
+                # Dates extend to the end of the month, look at the next one
+                await self._month(locators.NEXT_MONTH)
+            logging.warning(f'Reached max months ({max_months})')
+            return None
+
+    async def check_last_date_only(self, location: str, queue: str) -> bool | None:
+        """Click the furthest bookable date and look for time slots, as Checker.check_last_date_only."""
+        await asyncio.sleep(rand.uniform(0.3, 0.8))
+        if not await self.wait_for(locators.CALENDAR, timeout=5):
+            logging.warning(f'Calendar did not load for "{location}" - "{queue}" - skipping')
+            return None
+        found = await self.find_furthest_available_date()
+        if found is None:
+            logging.warning(f'No valid date found for "{location}" - "{queue}"')
+            return None
+        snapshot, cell, months_forward = found
+        logging.info(f'[{self.name}] ✅ Checking FURTHEST date: {cell.day} {snapshot.month_year}')
+        await self.click(locators.CALENDAR_CELLS, index=cell.index)
+        await self.wait_spinner()
+        await self.detect_captcha()
+
+        slot_count = len(await self.texts(locators.TIME_SLOTS)) if await self.count(locators.RESERVATION_HOURS) else 0
+        if slot_count > 0:
+            msg = f'🎯 SLOT FOUND! {cell.day} {snapshot.month_year}: {location} - {queue} ({slot_count} slots)'
+            logging.info(msg)
+            self.config.messenger.send_message(msg)
+        for _ in range(months_forward):
+            await self._month(locators.PREV_MONTH)
+        return slot_count > 0
+
+    async def check_location(self, location: str, list_open: bool = False) -> bool | None:
+        """
+        Whole pass for one location in this tab: case page, location, first queue, furthest date.
+        list_open=True: the tab already shows the open list of locations, start with the selection.
+        """
+        if not list_open:
+            if not await self.open_case_page():
+                return None
+            await self.expand_appointment_panel()
+            await self.expand_locations()
+        await self.select_location(location)
+        queue = await self.select_first_queue()
+        if queue is None:
+            return None
+        return await self.check_last_date_only(location, queue)
@@ -1,7 +1,7 @@
 import logging
 import os
-import tempfile
 import random
+import time
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
@@ -9,20 +9,54 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.remote.remote_connection import LOGGER as webdriver_logger
 from urllib3.connectionpool import log as urllib_logger
 
-# Import undetected-chromedriver for anti-bot detection
-try:
-    import undetected_chromedriver as uc
-    UC_AVAILABLE = True
-except ImportError:
-    UC_AVAILABLE = False
-    logging.warning('undetected-chromedriver not installed - using standard selenium with enhanced anti-detection')
+from lib.driver_cache import DriverCache, chrome_major_version
+from lib.page_idle import install_tracker
+from lib.profile_pool import ProfilePool
+from lib.timing import PhaseTimer
+
+_uc = None
+_uc_loaded = False
+
+
+def load_undetected_chromedriver():
+    """
+    undetected-chromedriver for anti-bot detection, or None if it is not installed.
+    Imported on the first browser start, not when the scripts start.
+    """
+    global _uc, _uc_loaded
+    if not _uc_loaded:
+        _uc_loaded = True
+        try:
+            import undetected_chromedriver
+            _uc = undetected_chromedriver
+        except ImportError:
+            logging.warning('undetected-chromedriver not installed - using standard selenium with enhanced anti-detection')
+    return _uc
 
 
 class BrowserFactory:
-    def __init__(self, log_level=logging.WARNING):
+    def __init__(self, log_level=logging.WARNING, profiles: ProfilePool | None = None,
+                 driver_cache: DriverCache | None = None, timer: PhaseTimer | None = None):
+        self.profiles = profiles or ProfilePool.from_env()
+        self.driver_cache = driver_cache or DriverCache.from_env()
+        # Startup phases (see run_staged_multi_loop_wh.py --startup-profile)
+        self.timer = timer
+        self._chrome_major: int | None = None
         webdriver_logger.setLevel(log_level)
         urllib_logger.setLevel(log_level)
 
+    def _record(self, phase: str, started: float):
+        if self.timer is not None:
+            self.timer.add(phase, started)
+
+    def chrome_major(self, binary_path: str | None) -> int | None:
+        # Asked once per factory: the installed Chrome does not change while the script runs
+        if self._chrome_major is None:
+            started = time.perf_counter()
+            self._chrome_major = chrome_major_version(binary_path)
+            self._record('chrome_version', started)
+        return self._chrome_major
+
     def create(
         self,
         maximized: bool = False,
@@ -39,14 +73,11 @@ class BrowserFactory:
         if maximized:
             options.add_argument('--start-maximized')
         
-        # Generate unique user-data-dir to avoid "directory is already in use" error
-        profile_path = os.environ.get('PROFILE_PATH')
-        if profile_path:
-            # If PROFILE_PATH is set, use it with PID to make it unique
-            user_data_dir = f'{profile_path}-{os.getpid()}'
-        else:
-            # Otherwise create temporary directory
-            user_data_dir = tempfile.mkdtemp(prefix='chrome-profile-')
+        # Locked profile from the pool: warm caches, never shared by two browsers
+        started = time.perf_counter()
+        profile = self.profiles.acquire()
+        self._record('profile', started)
+        user_data_dir = profile.path
         
         options.add_argument(f'--user-data-dir={user_data_dir}')
         
@@ -75,6 +106,11 @@ class BrowserFactory:
             'profile.default_content_setting_values.notifications': 2,
         })
 
+        # Performance log with Network events, read by lib.network_capture
+        network_capture = os.environ.get('NETWORK_CAPTURE', 'false').lower() == 'true'
+        if network_capture:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
         # Headless mode support
         headless_mode = os.environ.get('HEADLESS', 'false').lower() == 'true'
         if headless_mode:
@@ -92,7 +128,11 @@ class BrowserFactory:
         # Create Chrome WebDriver - try undetected-chromedriver first
         driver = None
         
-        if UC_AVAILABLE:
+        started = time.perf_counter()
+        uc = load_undetected_chromedriver()
+        self._record('import_uc', started)
+
+        if uc is not None:
             try:
                 logging.info('Attempting to create undetected Chrome driver...')
                 
@@ -116,14 +156,31 @@ class BrowserFactory:
                 # Set binary if specified
                 if binary_path:
                     uc_options.binary_location = binary_path
+
+                if network_capture:
+                    uc_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
                 
-                # Create undetected driver (let it manage chromedriver itself)
+                # Patched chromedriver from the cache: no download/patching on every start
+                version_main = self.chrome_major(binary_path)
+                driver_executable_path = None
+                if self.driver_cache is not None and version_main is not None:
+                    started = time.perf_counter()
+                    try:
+                        driver_executable_path = self.driver_cache.resolve(version_main, uc)
+                    except Exception as e:
+                        logging.warning(f'Chromedriver cache failed, undetected-chromedriver will patch it: {e}')
+                    self._record('driver_cache', started)
+
+                # Create undetected driver
+                started = time.perf_counter()
                 driver = uc.Chrome(
                     options=uc_options,
-                    version_main=None,
+                    version_main=version_main,
+                    driver_executable_path=driver_executable_path,
                     use_subprocess=False,
                     headless=headless_mode
                 )
+                self._record('launch', started)
                 
                 logging.info('✅ Undetected Chrome driver created successfully')
                 
@@ -135,12 +192,34 @@ class BrowserFactory:
         # Fallback to standard Selenium (or if uc not available)
         if driver is None:
             logging.info('Creating standard Chrome driver with enhanced anti-detection')
-            if service:
-                driver = webdriver.Chrome(service=service, options=options)
-            else:
-                driver = webdriver.Chrome(options=options)
+            started = time.perf_counter()
+            try:
+                if service:
+                    driver = webdriver.Chrome(service=service, options=options)
+                else:
+                    driver = webdriver.Chrome(options=options)
+            except Exception:
+                profile.release()
+                raise
+            self._record('launch', started)
+
+        # The profile stays locked until the browser is quit
+        quit_driver = driver.quit
+        released = False
+
+        def quit_and_release():
+            nonlocal released
+            try:
+                quit_driver()
+            finally:
+                if not released:
+                    released = True
+                    profile.release()
+
+        driver.quit = quit_and_release
         
         # Execute CDP commands to hide automation and bypass Akamai fingerprinting
+        started = time.perf_counter()
         driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
             'source': '''
                 // Hide webdriver property
@@ -204,6 +283,8 @@ class BrowserFactory:
                 };
             '''
         })
+        # Request tracker of PageIdleWaiter, in place before the page's scripts start any request
+        install_tracker(driver)
         
         # Set timezone to Europe/Warsaw via CDP
         driver.execute_cdp_cmd('Emulation.setTimezoneOverride', {
@@ -214,5 +295,6 @@ class BrowserFactory:
         driver.execute_cdp_cmd('Emulation.setLocaleOverride', {
             'locale': 'pl-PL'
         })
+        self._record('cdp_setup', started)
         
         return driver
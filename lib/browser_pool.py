@@ -0,0 +1,103 @@
+"""
+Pool of pre-launched browsers.
+
+WorkingHoursRunner can call prewarm() a little before the next scheduled run,
+so Chrome startup (and the first page load) happens while the runner is still
+sleeping and the check starts on a ready driver.
+"""
+
+import logging
+import threading
+import time
+
+from lib.browser_factory import BrowserFactory
+
+
+class BrowserPool:
+    def __init__(self, factory: BrowserFactory, size: int = 1, window_size: str = '1300,800'):
+        self.factory = factory
+        self.size = max(1, size)
+        self.window_size = window_size
+        self._ready = []
+        self._launching = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+    def prewarm(self, warm_url: str | None = None):
+        """Launch browsers in the background until `size` are ready or launching."""
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - len(self._ready) - self._launching
+            self._launching += max(0, missing)
+        for _ in range(missing):
+            threading.Thread(target=self._launch, args=(warm_url,), daemon=True).start()
+
+    def _launch(self, warm_url):
+        driver = None
+        started = time.monotonic()
+        try:
+            driver = self.factory.create(window_size=self.window_size)
+            if warm_url:
+                driver.get(warm_url)
+            logging.info(f'Pre-warmed browser ready in {time.monotonic() - started:.1f}s')
+        except Exception as e:
+            logging.warning(f'Failed to pre-warm browser: {e}')
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = None
+        with self._lock:
+            self._launching -= 1
+            closed = self._closed
+            if driver is not None and not closed:
+                self._ready.append(driver)
+            self._lock.notify_all()
+        if driver is not None and closed:
+            # close() ran while this browser was starting: nobody will take it
+            self._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug(f'Error quitting pooled browser: {e}')
+
+    @staticmethod
+    def _alive(driver) -> bool:
+        try:
+            driver.title
+            return True
+        except Exception as e:
+            logging.warning(f'Pre-warmed browser is not responding, discarding it: {e}')
+            return False
+
+    def acquire(self, timeout: float = 120):
+        """A ready browser; waits for one that is still launching, otherwise starts one now."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                while not self._ready and self._launching > 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._lock.wait(remaining)
+                if not self._ready:
+                    break
+                driver = self._ready.pop(0)
+            # A pre-warmed Chrome may have crashed while it waited
+            if self._alive(driver):
+                return driver
+            self._quit(driver)
+        logging.info('No pre-warmed browser available, starting one now')
+        return self.factory.create(window_size=self.window_size)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            drivers, self._ready = self._ready, []
+        for driver in drivers:
+            self._quit(driver)
@@ -0,0 +1,70 @@
+"""
+Long-lived browser session shared between WorkingHoursRunner loops.
+
+Chrome startup, the undetected-chromedriver patch and the login take much
+longer than the check itself, so in session-reuse mode the same driver (and
+its authenticated Inpol session) is kept between loops and only recycled
+after a number of cycles or hours.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+
+from pytimeparse.timeparse import timeparse
+from selenium import webdriver
+
+from lib.browser_factory import BrowserFactory
+
+
+@dataclass
+class BrowserSession:
+    factory: BrowserFactory
+    max_cycles: int = 20
+    max_age_seconds: float = 4 * 3600
+    window_size: str = '1300,800'
+    driver: webdriver.Chrome | None = field(default=None, init=False)
+    authenticated: bool = field(default=False, init=False)
+    started_at: float = field(default=0.0, init=False)
+    cycles: int = field(default=0, init=False)
+
+    @classmethod
+    def from_env(cls, factory: BrowserFactory):
+        return cls(
+            factory=factory,
+            max_cycles=int(os.environ.get('SESSION_MAX_CYCLES', '20')),
+            max_age_seconds=timeparse(os.environ.get('SESSION_MAX_AGE', '4h')),
+        )
+
+    def expired(self) -> bool:
+        if self.driver is None:
+            return False
+        return self.cycles >= self.max_cycles or time.monotonic() - self.started_at >= self.max_age_seconds
+
+    def acquire(self):
+        """Driver for the next cycle: the current one, or a fresh one if there is none or it is due for recycling."""
+        if self.expired():
+            logging.info(f'Recycling browser after {self.cycles} cycles '
+                         f'({(time.monotonic() - self.started_at) / 3600:.1f}h)')
+            self.recycle()
+        if self.driver is None:
+            self.driver = self.factory.create(window_size=self.window_size)
+            self.started_at = time.monotonic()
+            self.cycles = 0
+            self.authenticated = False
+        self.cycles += 1
+        return self.driver
+
+    def recycle(self):
+        """Quit the current browser; the next acquire() starts a new one."""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logging.debug(f'Error quitting browser: {e}')
+        self.driver = None
+        self.authenticated = False
+
+    def close(self):
+        self.recycle()
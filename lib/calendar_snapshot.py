@@ -0,0 +1,88 @@
+"""
+In-memory snapshot of the reservation calendar.
+
+The whole month view (header text, every day cell, its disabled state and the
+element handle) is read with a single execute_script call, so the date
+selection logic never has to go back to the browser for `cell.text`.
+"""
+
+from dataclasses import dataclass, field
+
+from selenium.webdriver.remote.webelement import WebElement
+
+
+# Returns null when the calendar is not rendered, otherwise
+# {monthYear: str, cells: [{index, day, disabled, element}]}.
+# `index` is the position of the cell among all gridcells of the month view,
+# so it stays stable for the lifetime of the rendered month.
+# Arguments are the CSS forms of the calendar, gridcell, cell content and
+# month header locators from lib.locators.
+SNAPSHOT_JS = '''
+const [calendarCss, cellsCss, contentCss, headerCss] = arguments;
+if (!document.querySelector(calendarCss)) {
+    return null;
+}
+const header = document.querySelector(headerCss);
+const cells = [];
+document.querySelectorAll(cellsCss).forEach((td, index) => {
+    const content = td.querySelector(contentCss);
+    if (!content) {
+        return;
+    }
+    const day = parseInt(content.textContent.trim(), 10);
+    if (isNaN(day)) {
+        return;
+    }
+    cells.push({
+        index: index,
+        day: day,
+        disabled: (td.getAttribute('class') || '').indexOf('disabled') !== -1,
+        element: content,
+    });
+});
+return {
+    monthYear: header ? header.innerText.trim() : '',
+    cells: cells,
+};
+'''
+
+
+@dataclass
+class CalendarCell:
+    index: int
+    day: int
+    disabled: bool
+    weekend: bool
+    holiday: bool = False
+    element: WebElement | None = None
+
+    @property
+    def is_candidate(self) -> bool:
+        """Enabled working day - the only kind of cell worth clicking."""
+        return not self.disabled and not self.weekend and not self.holiday
+
+
+@dataclass
+class CalendarSnapshot:
+    month_year: str
+    year: int | None
+    month: int | None
+    cells: list[CalendarCell] = field(default_factory=list)
+
+    @property
+    def enabled_cells(self) -> list[CalendarCell]:
+        return [c for c in self.cells if not c.disabled]
+
+    @property
+    def candidate_cells(self) -> list[CalendarCell]:
+        return [c for c in self.cells if c.is_candidate]
+
+    def last_candidate(self) -> CalendarCell | None:
+        candidates = self.candidate_cells
+        return candidates[-1] if candidates else None
+
+    def find_day(self, day: int) -> CalendarCell | None:
+        for cell in self.cells:
+            if cell.day == day:
+                return cell
+        return None
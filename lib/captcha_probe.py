@@ -0,0 +1,87 @@
+"""
+Captcha detection in one script call.
+
+The element-by-element detection (Checker.captcha_reason_by_elements) costs
+a find_elements per indicator plus is_displayed()/size/text round-trips for
+every match, and it runs after each page load, queue selection and date
+click. CAPTCHA_PROBE checks the same indicators inside the page and returns
+the same reason strings, or null.
+
+In watch mode (CAPTCHA_MODE=watch) the probe also leaves a MutationObserver
+in the page that raises a flag once anything that could be a challenge
+(Akamai containers, the proceed button, dialogs, captcha ids) is added to
+the document. Until then a check is a single property read, without
+querying or laying out the page.
+"""
+
+# Function expression: `watch` -> reason string or null
+CAPTCHA_PROBE = '''
+(watch) => {
+    const candidates = "#proceed-button, iframe[src*='akamai'], div[id^='sec-if-cpt'], div[id^='sec-cpt'], "
+        + "div.behavioral-content, div[class*='akamai'], [id*='captcha'], div[class*='modal'], "
+        + "div[class*='dialog'], div[class*='popup']";
+    if (watch) {
+        let state = window.__inpolCaptcha;
+        if (!state) {
+            state = window.__inpolCaptcha = {seen: document.querySelector(candidates) !== null};
+            if (!state.seen) {
+                const observer = new MutationObserver(records => {
+                    for (const record of records) {
+                        for (const node of record.addedNodes) {
+                            if (node.nodeType === 1 && (node.matches(candidates) || node.querySelector(candidates))) {
+                                state.seen = true;
+                                observer.disconnect();
+                                return;
+                            }
+                        }
+                    }
+                });
+                observer.observe(document.documentElement, {childList: true, subtree: true});
+            }
+        }
+        if (!state.seen) {
+            return null;
+        }
+    }
+
+    const visible = el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+
+    for (const btn of document.querySelectorAll('#proceed-button')) {
+        const text = btn.innerText.toLowerCase();
+        if (visible(btn) && (text === '' || /kontynuuj|proceed|continue/.test(text))) {
+            return `Akamai proceed button (text: "${text || 'Kontynuuj'}")`;
+        }
+    }
+    for (const frame of document.querySelectorAll("iframe[src*='akamai']")) {
+        const r = frame.getBoundingClientRect();
+        if (visible(frame) && r.width > 100 && r.height > 100) {
+            return 'Akamai iframe (visible and sized)';
+        }
+    }
+    for (const selector of ["div[id^='sec-if-cpt']", "div[id^='sec-cpt']", 'div.behavioral-content', "div[class*='akamai']"]) {
+        for (const div of document.querySelectorAll(selector)) {
+            const r = div.getBoundingClientRect();
+            if (visible(div) && r.width > 200 && r.height > 200 && parseFloat(getComputedStyle(div).opacity) > 0.5) {
+                return `Akamai overlay (${selector}, size: ${Math.round(r.width)}x${Math.round(r.height)})`;
+            }
+        }
+    }
+    const textXpaths = [
+        "//div[contains(@class, 'modal') or contains(@class, 'dialog') or contains(@class, 'popup')]//*[contains(text(), 'Potwierdź') or contains(text(), 'człowiekiem') or contains(text(), 'robot')]",
+        "//*[contains(@id, 'captcha')]//*[contains(text(), 'Potwierdź') or contains(text(), 'człowiekiem')]",
+    ];
+    for (const xpath of textXpaths) {
+        const found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < found.snapshotLength; i++) {
+            const el = found.snapshotItem(i);
+            if (visible(el)) {
+                return `Captcha text in modal/dialog: "${el.innerText.slice(0, 50)}"`;
+            }
+        }
+    }
+    return null;
+}
+'''
+
+# For execute_script: arguments[0] is `watch`
+PROBE_JS = f'return ({CAPTCHA_PROBE})(arguments[0]);'
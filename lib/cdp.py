@@ -0,0 +1,229 @@
+"""
+Minimal asyncio client for the Chrome DevTools Protocol.
+
+Starts Chrome with a DevTools port and talks to it over one websocket, with
+no chromedriver in between. Every tab is a flattened target session
+(Target.attachToTarget with flatten=True), so any number of tabs share the
+connection and their commands can be awaited concurrently.
+
+Needs the optional `websockets` package (pip install websockets).
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+from lib.driver_cache import CHROME_CANDIDATES
+
+
+class CdpError(Exception):
+    pass
+
+
+class CdpConnection:
+    def __init__(self, ws_url: str):
+        self.ws_url = ws_url
+        self._ws = None
+        self._reader: asyncio.Task | None = None
+        self._ids = itertools.count(1)
+        self._calls: dict[int, asyncio.Future] = {}
+        self._listeners: list[tuple[str, str | None, asyncio.Queue]] = []
+
+    async def connect(self):
+        if not WEBSOCKETS_AVAILABLE:
+            raise CdpError('websockets is not installed (pip install websockets)')
+        self._ws = await websockets.connect(self.ws_url, max_size=None, ping_interval=None)
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._calls.pop(message['id'], None)
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(CdpError(message['error'].get('message', str(message['error']))))
+                    else:
+                        future.set_result(message.get('result', {}))
+                    continue
+                for method, session_id, queue in self._listeners:
+                    if method == message.get('method') and session_id in (None, message.get('sessionId')):
+                        queue.put_nowait(message.get('params', {}))
+        except Exception as e:
+            logging.debug(f'DevTools connection closed: {e}')
+        finally:
+            for future in self._calls.values():
+                if not future.done():
+                    future.set_exception(CdpError('DevTools connection closed'))
+            self._calls.clear()
+
+    async def send(self, method: str, params: dict | None = None, session_id: str | None = None,
+                   timeout: float = 30) -> dict:
+        call_id = next(self._ids)
+        message = {'id': call_id, 'method': method, 'params': params or {}}
+        if session_id is not None:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = future
+        await self._ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._calls.pop(call_id, None)
+
+    def listen(self, method: str, session_id: str | None = None) -> asyncio.Queue:
+        """Queue receiving the params of every `method` event (of one session) until unlisten()."""
+        queue = asyncio.Queue()
+        self._listeners.append((method, session_id, queue))
+        return queue
+
+    def unlisten(self, queue: asyncio.Queue):
+        self._listeners = [entry for entry in self._listeners if entry[2] is not queue]
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+@dataclass
+class CdpSession:
+    """One tab."""
+    connection: CdpConnection
+    target_id: str
+    session_id: str
+
+    async def send(self, method: str, params: dict | None = None, timeout: float = 30) -> dict:
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    async def evaluate(self, expression: str, timeout: float = 30):
+        """Value of a JS expression; promises are awaited."""
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression,
+            'awaitPromise': True,
+            'returnByValue': True,
+        }, timeout=timeout)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise CdpError(details.get('exception', {}).get('description') or details.get('text', 'JS error'))
+        return result.get('result', {}).get('value')
+
+    async def call(self, function: str, *args, timeout: float = 30):
+        """Call a JS function expression with JSON-serializable arguments."""
+        return await self.evaluate(f'({function})(...{json.dumps(list(args))})', timeout=timeout)
+
+    async def navigate(self, url: str, timeout: float = 60):
+        loaded = self.connection.listen('Page.loadEventFired', self.session_id)
+        try:
+            result = await self.send('Page.navigate', {'url': url})
+            if result.get('errorText'):
+                raise CdpError(f'navigation to {url} failed: {result["errorText"]}')
+            await asyncio.wait_for(loaded.get(), timeout)
+        finally:
+            self.connection.unlisten(loaded)
+
+    async def url(self) -> str:
+        return await self.evaluate('location.href')
+
+    async def close(self):
+        await self.connection.send('Target.closeTarget', {'targetId': self.target_id})
+
+
+@dataclass
+class ChromeProcess:
+    """Chrome started with --remote-debugging-port, and the DevTools connection to it."""
+    profile_dir: str
+    binary: str | None = None
+    headless: bool = False
+    window_size: str = '1300,800'
+    process: asyncio.subprocess.Process | None = field(default=None, init=False)
+    connection: CdpConnection | None = field(default=None, init=False)
+
+    def _binary(self) -> str:
+        for candidate in ([self.binary] if self.binary else CHROME_CANDIDATES):
+            path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+            if path:
+                return path
+        raise CdpError('Chrome not found, set CHROME_BINARY')
+
+    async def start(self, timeout: float = 30):
+        port_file = os.path.join(self.profile_dir, 'DevToolsActivePort')
+        if os.path.exists(port_file):
+            os.unlink(port_file)
+        args = [
+            self._binary(),
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self.profile_dir}',
+            f'--window-size={self.window_size}',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-blink-features=AutomationControlled',
+            '--lang=pl-PL',
+            'about:blank',
+        ]
+        if self.headless:
+            args.insert(1, '--headless=new')
+        self.process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+
+        # Chrome writes the chosen port and the browser websocket path into the profile
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            try:
+                with open(port_file) as f:
+                    port, path = f.read().split()[:2]
+                break
+            except (OSError, ValueError):
+                if self.process.returncode is not None:
+                    raise CdpError(f'Chrome exited with code {self.process.returncode}')
+                if asyncio.get_running_loop().time() > deadline:
+                    raise CdpError(f'Chrome did not open a DevTools port in {timeout}s')
+                await asyncio.sleep(0.05)
+        self.connection = CdpConnection(f'ws://127.0.0.1:{port}{path}')
+        await self.connection.connect()
+
+    async def new_tab(self, url: str = 'about:blank') -> CdpSession:
+        target_id = (await self.connection.send('Target.createTarget', {'url': url}))['targetId']
+        session_id = (await self.connection.send(
+            'Target.attachToTarget', {'targetId': target_id, 'flatten': True}))['sessionId']
+        tab = CdpSession(self.connection, target_id, session_id)
+        await tab.send('Page.enable')
+        await tab.send('Runtime.enable')
+        # Same environment as BrowserFactory gives Selenium browsers
+        await tab.send('Page.addScriptToEvaluateOnNewDocument', {
+            'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+                      "Object.defineProperty(navigator, 'languages', {get: () => ['pl-PL', 'pl', 'en-US', 'en']});"
+        })
+        await tab.send('Emulation.setTimezoneOverride', {'timezoneId': 'Europe/Warsaw'})
+        await tab.send('Emulation.setLocaleOverride', {'locale': 'pl-PL'})
+        return tab
+
+    async def close(self):
+        if self.connection is not None:
+            try:
+                await self.connection.send('Browser.close', timeout=5)
+            except Exception:
+                pass
+            await self.connection.close()
+        if self.process is not None and self.process.returncode is None:
+            try:
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
@@ -1,125 +1,53 @@
 import logging
+import os
 import random as rand
 import time
 from random import random
 import calendar as cal
 from datetime import datetime
 
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from lib import locators, working_days
+from lib.calendar_snapshot import SNAPSHOT_JS, CalendarCell, CalendarSnapshot
+from lib.captcha_probe import PROBE_JS
+from lib.network_capture import Availability, NetworkCapture
+from lib.observation_store import Observation
 from lib.checker_config import CheckerConfig
+from lib.dom_recorder import DomRecorder
 from lib.human_behavior import HumanBehavior
+from lib.page_idle import PageIdleWaiter
+from lib.timing import PhaseTimer, timed
 
 
 class Checker:
     def __init__(self, config: CheckerConfig):
         self.config = config
         self.human = HumanBehavior(config.browser)
+        self.idle_waiter = PageIdleWaiter(config.browser)
+        self.timer = PhaseTimer()
+        self.network = NetworkCapture.from_env(config.browser)  # None unless NETWORK_CAPTURE=true
+        self.recorder = DomRecorder.from_env()  # None unless DOM_RECORD_DIR is set
+        self.captcha_hits = 0
+        self.captcha_mode = os.environ.get('CAPTCHA_MODE', 'probe').lower()  # probe, watch or legacy
+        self._observation: Observation | None = None  # filled while a location/queue is checked
+        self._enabled_by_month = {}
+        self._location_captcha_mark = 0
+        self._timer_marks: dict[str, int] = {}  # location -> len(timer.records) when it was last selected
         self._cached_check_date = None  # Cache for date to check (shared across all locations)
     
+    @timed('detect_captcha')
     def detect_captcha(self):
         """Detect Akamai captcha and wait for manual solving."""
         try:
-            captcha_detected = False
-            detection_reason = ""
-            
-            # Method 0: Check for Akamai proceed button (MOST RELIABLE!)
-            # This button appears ONLY when captcha is active
-            try:
-                proceed_buttons = self.config.browser.find_elements(By.CSS_SELECTOR, "#proceed-button")
-                for btn in proceed_buttons:
-                    if btn.is_displayed():
-                        # Double-check it's the captcha button by text
-                        btn_text = ""
-                        try:
-                            btn_text = btn.text.lower()
-                        except:
-                            try:
-                                span = btn.find_element(By.ID, "proceed-message")
-                                btn_text = span.text.lower()
-                            except:
-                                pass
-                        
-                        if 'kontynuuj' in btn_text or 'proceed' in btn_text or 'continue' in btn_text or btn_text == '':
-                            captcha_detected = True
-                            detection_reason = f'Akamai proceed button (text: "{btn_text or "Kontynuuj"}")'
-                            logging.debug(f'Captcha detected: {detection_reason}')
-                            break
-            except Exception as e:
-                logging.debug(f'Error checking proceed button: {e}')
-            
-            # Method 1: Check for VISIBLE Akamai iframe
-            captcha_iframes = self.config.browser.find_elements(By.CSS_SELECTOR, "iframe[src*='akamai']")
-            for iframe in captcha_iframes:
-                if iframe.is_displayed():
-                    try:
-                        size = iframe.size
-                        if size['width'] > 100 and size['height'] > 100:  # Must be reasonably sized
-                            captcha_detected = True
-                            detection_reason = 'Akamai iframe (visible and sized)'
-                            logging.debug(f'Captcha detected: {detection_reason}')
-                            break
-                    except:
-                        pass
-            
-            # Method 2: Check for VISIBLE Akamai div overlay with proper size
-            if not captcha_detected:
-                # More specific selectors based on real Akamai structure
-                akamai_selectors = [
-                    "div[id^='sec-if-cpt']",  # starts with
-                    "div[id^='sec-cpt']",
-                    "div.behavioral-content",
-                    "div[class*='akamai']"
-                ]
-                
-                for selector in akamai_selectors:
-                    try:
-                        containers = self.config.browser.find_elements(By.CSS_SELECTOR, selector)
-                        for container in containers:
-                            if container.is_displayed():
-                                size = container.size
-                                # Overlay должен быть достаточно большим (минимум 200x200px)
-                                if size['width'] > 200 and size['height'] > 200:
-                                    # Проверяем что элемент действительно видим (не прозрачный)
-                                    opacity = container.value_of_css_property('opacity')
-                                    if opacity and float(opacity) > 0.5:
-                                        captcha_detected = True
-                                        detection_reason = f'Akamai overlay ({selector}, size: {size["width"]}x{size["height"]})'
-                                        logging.debug(f'Captcha detected: {detection_reason}')
-                                        break
-                    except Exception as e:
-                        logging.debug(f'Error checking {selector}: {e}')
-                        continue
-                    
-                    if captcha_detected:
-                        break
-            
-            # Method 3: Check for VISIBLE captcha text in modal/dialog
-            if not captcha_detected:
-                try:
-                    # Ищем только ВИДИМЫЙ текст капчи в модальном окне или диалоге
-                    captcha_text_xpaths = [
-                        "//div[contains(@class, 'modal') or contains(@class, 'dialog') or contains(@class, 'popup')]//*[contains(text(), 'Potwierdź') or contains(text(), 'człowiekiem') or contains(text(), 'robot')]",
-                        "//*[contains(@id, 'captcha')]//*[contains(text(), 'Potwierdź') or contains(text(), 'człowiekiem')]"
-                    ]
-                    
-                    for xpath in captcha_text_xpaths:
-                        elements = self.config.browser.find_elements(By.XPATH, xpath)
-                        for el in elements:
-                            if el.is_displayed():
-                                captcha_detected = True
-                                detection_reason = f'Captcha text in modal/dialog: "{el.text[:50]}"'
-                                logging.debug(f'Captcha detected: {detection_reason}')
-                                break
-                        if captcha_detected:
-                            break
-                except Exception as e:
-                    logging.debug(f'Text element search error: {e}')
+            detection_reason = self.captcha_reason()
             
             # If captcha detected, notify and wait
-            if captcha_detected:
+            if detection_reason is not None:
+                self.record_dom('captcha', captcha=detection_reason)
                 msg = f'🚨 AKAMAI CAPTCHA DETECTED!\n'
                 msg += f'📍 Detection: {detection_reason}\n\n'
                 msg += '⏰ Bot paused for 2 minutes\n'
@@ -145,6 +73,7 @@ class Checker:
                     logging.debug('No spinner after captcha')
                 
                 logging.info('Resuming after captcha wait period')
+                self.captcha_hits += 1
                 return True
                 
         except Exception as e:
@@ -152,43 +81,182 @@ class Checker:
         
         return False
 
+    def captcha_reason(self):
+        """What shows an Akamai captcha on the current page, or None."""
+        if self.captcha_mode != 'legacy':
+            try:
+                reason = self.config.browser.execute_script(PROBE_JS, self.captcha_mode == 'watch')
+                if reason:
+                    logging.debug(f'Captcha detected: {reason}')
+                return reason or None
+            except Exception as e:
+                logging.debug(f'Captcha probe failed, checking element by element: {e}')
+        return self.captcha_reason_by_elements()
+
+    def captcha_reason_by_elements(self):
+        """captcha_reason with one WebDriver call per indicator and element (CAPTCHA_MODE=legacy, probe fallback)."""
+        captcha_detected = False
+        detection_reason = ""
+        
+        # Method 0: Check for Akamai proceed button (MOST RELIABLE!)
+        # This button appears ONLY when captcha is active
+        try:
+            proceed_buttons = self.config.browser.find_elements(By.CSS_SELECTOR, "#proceed-button")
+            for btn in proceed_buttons:
+                if btn.is_displayed():
+                    # Double-check it's the captcha button by text
+                    btn_text = ""
+                    try:
+                        btn_text = btn.text.lower()
+                    except:
+                        try:
+                            span = btn.find_element(By.ID, "proceed-message")
+                            btn_text = span.text.lower()
+                        except:
+                            pass
+                    
+                    if 'kontynuuj' in btn_text or 'proceed' in btn_text or 'continue' in btn_text or btn_text == '':
+                        captcha_detected = True
+                        detection_reason = f'Akamai proceed button (text: "{btn_text or "Kontynuuj"}")'
+                        logging.debug(f'Captcha detected: {detection_reason}')
+                        break
+        except Exception as e:
+            logging.debug(f'Error checking proceed button: {e}')
+        
+        # Method 1: Check for VISIBLE Akamai iframe
+        captcha_iframes = self.config.browser.find_elements(By.CSS_SELECTOR, "iframe[src*='akamai']")
+        for iframe in captcha_iframes:
+            if iframe.is_displayed():
+                try:
+                    size = iframe.size
+                    if size['width'] > 100 and size['height'] > 100:  # Must be reasonably sized
+                        captcha_detected = True
+                        detection_reason = 'Akamai iframe (visible and sized)'
+                        logging.debug(f'Captcha detected: {detection_reason}')
+                        break
+                except:
+                    pass
+        
+        # Method 2: Check for VISIBLE Akamai div overlay with proper size
+        if not captcha_detected:
+            # More specific selectors based on real Akamai structure
+            akamai_selectors = [
+                "div[id^='sec-if-cpt']",  # starts with
+                "div[id^='sec-cpt']",
+                "div.behavioral-content",
+                "div[class*='akamai']"
+            ]
+            
+            for selector in akamai_selectors:
+                try:
+                    containers = self.config.browser.find_elements(By.CSS_SELECTOR, selector)
+                    for container in containers:
+                        if container.is_displayed():
+                            size = container.size
+                            # Overlay должен быть достаточно большим (минимум 200x200px)
+                            if size['width'] > 200 and size['height'] > 200:
+                                # Проверяем что элемент действительно видим (не прозрачный)
+                                opacity = container.value_of_css_property('opacity')
+                                if opacity and float(opacity) > 0.5:
+                                    captcha_detected = True
+                                    detection_reason = f'Akamai overlay ({selector}, size: {size["width"]}x{size["height"]})'
+                                    logging.debug(f'Captcha detected: {detection_reason}')
+                                    break
+                except Exception as e:
+                    logging.debug(f'Error checking {selector}: {e}')
+                    continue
+                
+                if captcha_detected:
+                    break
+        
+        # Method 3: Check for VISIBLE captcha text in modal/dialog
+        if not captcha_detected:
+            try:
+                # Ищем только ВИДИМЫЙ текст капчи в модальном окне или диалоге
+                captcha_text_xpaths = [
+                    "//div[contains(@class, 'modal') or contains(@class, 'dialog') or contains(@class, 'popup')]//*[contains(text(), 'Potwierdź') or contains(text(), 'człowiekiem') or contains(text(), 'robot')]",
+                    "//*[contains(@id, 'captcha')]//*[contains(text(), 'Potwierdź') or contains(text(), 'człowiekiem')]"
+                ]
+                
+                for xpath in captcha_text_xpaths:
+                    elements = self.config.browser.find_elements(By.XPATH, xpath)
+                    for el in elements:
+                        if el.is_displayed():
+                            captcha_detected = True
+                            detection_reason = f'Captcha text in modal/dialog: "{el.text[:50]}"'
+                            logging.debug(f'Captcha detected: {detection_reason}')
+                            break
+                    if captcha_detected:
+                        break
+            except Exception as e:
+                logging.debug(f'Text element search error: {e}')
+        
+        return detection_reason if captcha_detected else None
+
+    def record_dom(self, stage, **state):
+        """Save the current page for offline replay (DOM_RECORD_DIR), attributed to the current location/queue."""
+        if self.recorder is None:
+            return
+        state.setdefault('location', self.timer.location)
+        if self._observation is not None:
+            state.setdefault('queue', self._observation.queue)
+        self.recorder.record(self.config.browser, stage, **state)
+
+    def switch_case(self, case_id, messenger=None):
+        """Continue with another case of the same account (browser stays logged in)."""
+        self.config.case_id = case_id
+        if messenger is not None:
+            self.config.messenger = messenger
+        # Dates found for one case say nothing about the calendar of another
+        self._cached_check_date = None
+        if self.network is not None:
+            self.network.availability.clear()
+
     @property
     def waiter(self):
         return WebDriverWait(self.config.browser, self.config.page_load_timeout)
 
-    def login_page_url(self):
-        return 'https://inpol.mazowieckie.pl/login'
+    @staticmethod
+    def base_url():
+        """Inpol site root; INPOL_BASE_URL points the checker at another host (e.g. the local mock)."""
+        return os.environ.get('INPOL_BASE_URL', 'https://inpol.mazowieckie.pl').rstrip('/')
+
+    @classmethod
+    def login_page_url(cls):
+        return f'{cls.base_url()}/login'
 
     def case_page_url(self, case_id):
-        return f'https://inpol.mazowieckie.pl/home/cases/{case_id}'
+        return f'{self.base_url()}/home/cases/{case_id}'
 
+    @timed('login')
     def login(self):
-        self.config.browser.get(self.login_page_url())
+        # A pre-warmed browser is already on the login page
+        if self.config.browser.current_url != self.login_page_url():
+            self.config.browser.get(self.login_page_url())
         
         # Simulate page load time (human reading)
         self.human.simulate_reading(1.5, 3.0)
 
         sign_in = self.waiter.until(
-            EC.visibility_of_element_located((By.XPATH, '//button[contains(@class, "btn--submit")]')))
+            EC.visibility_of_element_located(locators.LOGIN_SUBMIT.by))
 
         # Handle cookie banner with human-like behavior
-        x_cookie = '//a[contains(@aria-label,"cookie") and contains(@aria-label,"dismiss")]'
         try:
-            cookie_block = self.config.browser.find_element(by=By.XPATH, value=x_cookie)
+            cookie_block = locators.find_element(self.config.browser, locators.COOKIE_DISMISS)
             if cookie_block.is_displayed():
                 self.human.human_click(cookie_block)
         except:
             pass
 
         # Type email slowly like a human
-        email_el = self.config.browser.find_element(by=By.XPATH, value='//input[@formcontrolname="email"]')
+        email_el = locators.find_element(self.config.browser, locators.EMAIL_INPUT)
         self.human.slow_type(email_el, self.config.email)
         
         # Random delay before password (thinking time)
         self.human.random_delay(0.5, 1.2)
 
         # Type password slowly
-        password_el = self.config.browser.find_element(by=By.XPATH, value='//input[@formcontrolname="password"]')
+        password_el = locators.find_element(self.config.browser, locators.PASSWORD_INPUT)
         self.human.slow_type(password_el, self.config.password)
 
         # Random delay before clicking sign in
@@ -201,26 +269,81 @@ class Checker:
         self.human.random_mouse_movement()
         time.sleep(2)
 
-        x_error = '//mat-error[contains(text(),"Incorrect email")]'
-        if len(self.config.browser.find_elements(by=By.XPATH, value=x_error)) != 0:
+        if len(locators.find_elements(self.config.browser, locators.LOGIN_ERROR)) != 0:
             logging.error('Wrong password or maintenance hours')
             return False
         self.waiter.until(
-            EC.visibility_of_element_located((By.XPATH, '//a[@routerlink="/home/cases-choose" and @class="btn"]')))
+            EC.visibility_of_element_located(locators.CASES_LINK.by))
+        if self.config.session_store is not None:
+            self.config.session_store.save(self.config.browser)
         return True
 
+    def restore_session(self):
+        """
+        Skip the login form by restoring a saved session. Returns True if the
+        case page opened with it (browser is left there), False if a full
+        login is needed.
+        """
+        if self.config.session_store is None:
+            return False
+        try:
+            if not self.config.session_store.restore(self.config.browser, self.login_page_url()):
+                return False
+            if self.session_is_valid():
+                logging.info('Saved session accepted, login skipped')
+                return True
+        except Exception as e:
+            logging.warning(f'Could not restore saved session: {e}')
+        self.config.session_store.clear()
+        return False
+
     def random_sleep(self, min_period=0.3, max_period=0.9):
         time.sleep(random() * (max_period - min_period) + min_period)
 
+    @timed('wait_spinner')
     def wait_spinner(self):
-        self.random_sleep(min_period=0.3, max_period=0.5)
-        x_progress_bar = '//mat-spinner[@role="progressbar"]'
-        self.waiter.until_not(EC.visibility_of_element_located((By.XPATH, x_progress_bar)))
+        """
+        Wait until the Angular app is idle: no pending XHR/fetch, no visible
+        spinner and a quiet DOM. Falls back to polling the spinner element if
+        the in-page tracker can't be used.
+        """
+        started = time.monotonic()
+        try:
+            result = self.idle_waiter.wait(self.config.page_load_timeout)
+        except Exception as e:
+            logging.debug(f'Idle tracker unavailable ({e}), polling spinner instead')
+            WebDriverWait(self.config.browser, self.config.page_load_timeout, poll_frequency=0.1).until_not(
+                EC.visibility_of_element_located(locators.SPINNER.by))
+        else:
+            if not result.idle and result.spinner:
+                raise TimeoutException(f'spinner still visible after {self.config.page_load_timeout}s')
+            if not result.idle:
+                logging.debug(f'Page not quiet after {result.elapsed:.1f}s '
+                              f'({result.pending} pending requests), continuing')
 
-    # Language-independent selector - find accordion with "appointment" class or structure
-    # Look for the accordion section that contains location/queue dropdowns
-    x_appointment_section = '//div[contains(@class,"accordion")]//mat-select[@name="location"]'
+        elapsed = time.monotonic() - started
+        self.idle_waiter.record(elapsed)
+        logging.debug(f'wait_spinner took {elapsed * 1000:.0f} ms')
 
+    def session_is_valid(self):
+        """
+        Cheap check of an already logged-in browser: load the case page and see
+        whether the app redirects to /login. Leaves the browser on the case page.
+        """
+        self.config.browser.get(self.case_page_url(self.config.case_id))
+        try:
+            self.waiter.until(lambda d: '/login' in d.current_url
+                              or len(locators.find_elements(d, locators.APPOINTMENT_SECTION)) != 0)
+        except TimeoutException:
+            logging.info('Session check timed out')
+            return False
+        if '/login' in self.config.browser.current_url:
+            logging.info('Session expired (redirected to login)')
+            return False
+        self.detect_captcha()
+        return True
+
+    @timed('open_case_page')
     def open_case_page(self):
         self.config.browser.get(self.case_page_url(self.config.case_id))
         time.sleep(rand.uniform(0.5, 1.0))  # Super fast page load
@@ -231,26 +354,27 @@ class Checker:
         # Look for location dropdown (it's inside the appointment section)
         # This is language-independent
         try:
-            self.waiter.until(EC.presence_of_element_located((By.XPATH, self.x_appointment_section)))
+            self.waiter.until(EC.presence_of_element_located(locators.APPOINTMENT_SECTION.by))
             logging.info('Appointment section found (detected location dropdown)')
+            self.record_dom('case_page', location=None)
             return True
         except Exception as e:
             logging.error(f'Appointment section not found: {e}')
             # Debug: print page structure
-            all_buttons = self.config.browser.find_elements(by=By.XPATH, value='//button')
+            all_buttons = locators.find_elements(self.config.browser, locators.BUTTONS)
             logging.error(f'Found {len(all_buttons)} buttons on page')
             return False
 
-    def expand_appointment_panel(self):
+    @timed('expand_appointment_panel')
+    def expand_appointment_panel(self, pause=True):
+        """Open the appointment accordion; pause=False skips the human-like delays (background tabs)."""
+        delay = rand.uniform if pause else (lambda low, high: 0)
         logging.info('check if appointment panel needs expanding')
-        time.sleep(rand.uniform(2, 4))  # Human-like delay
-        
-        # Language-independent: find location dropdown and check if visible
-        x_location_dropdown = '//mat-select[@name="location"]'
+        time.sleep(delay(2, 4))  # Human-like delay
         
         try:
             # Check if location dropdown is already visible first
-            dropdown_elements = self.config.browser.find_elements(by=By.XPATH, value=x_location_dropdown)
+            dropdown_elements = locators.find_elements(self.config.browser, locators.LOCATION_DROPDOWN)
             
             if len(dropdown_elements) > 0 and dropdown_elements[0].is_displayed():
                 logging.info('Panel already expanded (location dropdown visible)')
@@ -258,32 +382,31 @@ class Checker:
             
             # Multi-language XPath for appointment section button
             # Finds h3 heading with any language variant and gets the accordion button after it
-            x_appointment_button = '//h3[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "appointment") or contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "wizyt") or contains(translate(text(), "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"), "зустріч") or contains(translate(text(), "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"), "встречу")]/following::button[contains(@class, "btn--accordion")][1]'
             
             logging.debug('Looking for appointment accordion button with multi-language selector')
-            button_elements = self.config.browser.find_elements(by=By.XPATH, value=x_appointment_button)
+            button_elements = locators.find_elements(self.config.browser, locators.APPOINTMENT_BUTTON)
             
             if len(button_elements) == 0:
                 logging.warning('Appointment accordion button not found with multi-language selector')
                 # Fallback: check if dropdown is visible anyway
-                dropdown_elements = self.config.browser.find_elements(by=By.XPATH, value=x_location_dropdown)
+                dropdown_elements = locators.find_elements(self.config.browser, locators.LOCATION_DROPDOWN)
                 if len(dropdown_elements) > 0 and dropdown_elements[0].is_displayed():
                     logging.info('Panel already expanded (no button needed)')
                 return
             
             # Panel is collapsed, click the accordion button to expand
             logging.info('Panel collapsed, clicking appointment accordion button to expand')
-            time.sleep(rand.uniform(1, 2))  # Human thinking time
+            time.sleep(delay(1, 2))  # Human thinking time
             button_el = button_elements[0]
             
             # Scroll into view with human-like behavior
             _, _ = button_el.location_once_scrolled_into_view
-            time.sleep(rand.uniform(0.5, 1.0))
+            time.sleep(delay(0.5, 1.0))
             
             # Use JavaScript click as it's more reliable for accordion buttons
             logging.debug('Clicking accordion button via JavaScript')
             self.config.browser.execute_script("arguments[0].click();", button_el)
-            time.sleep(rand.uniform(2, 3))  # Wait for animation with human-like delay
+            time.sleep(delay(2, 3))  # Wait for animation with human-like delay
             logging.info('Panel expanded successfully')
         except Exception as e:
             logging.debug(f'Error expanding panel (likely already expanded): {e}')
@@ -293,103 +416,109 @@ class Checker:
         logging.info('expand list of locations')
         time.sleep(rand.uniform(0.15, 0.35))  # Ultra fast dropdown
         
-        x_show_location_button = '//mat-select[@name="location"]'
-        self.waiter.until(EC.visibility_of_element_located((By.XPATH, x_show_location_button)))
-        location_dropdown = self.config.browser.find_element(by=By.XPATH, value=x_show_location_button)
+        self.waiter.until(EC.visibility_of_element_located(locators.LOCATION_DROPDOWN.by))
+        location_dropdown = locators.find_element(self.config.browser, locators.LOCATION_DROPDOWN)
         self.human.human_click(location_dropdown)
 
     def get_locations(self):
         logging.info('get a list of locations')
-        x_location_elements = '//mat-option/span[@class="mat-option-text"]'
-        self.waiter.until(EC.visibility_of_element_located((By.XPATH, x_location_elements)))
-        location_elements = self.config.browser.find_elements(by=By.XPATH, value=x_location_elements)
+        self.waiter.until(EC.visibility_of_element_located(locators.OPTION_TEXT.by))
+        location_elements = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
         location = list(map(lambda el: el.text, location_elements))
         location = list(filter(lambda s: s.strip() != '-', location))
         return location
 
-    def select_location(self, location_name):
+    @timed('select_location')
+    def select_location(self, location_name, wait=True):
+        """Pick a location from the open dropdown; with wait=False return right after the click."""
         logging.info(f'location selection ({location_name})')
+        # Phases from here on are attributed to this location
+        self.timer.location = location_name
+        self._location_captcha_mark = self.captcha_hits
+        self._timer_marks[location_name] = len(self.timer.records)
+        self.skip_captured()
         # ВАЖНО: Не добавляем задержку здесь - dropdown уже открыт и может закрыться!
         
-        x_location_selector = lambda text: f'//mat-option/span[@class="mat-option-text" and contains(text(),"{text}")]'
-        
         try:
             # Ждем что элемент видим и кликабелен (dropdown должен быть открыт)
             location_option = WebDriverWait(self.config.browser, 3).until(
-                EC.element_to_be_clickable((By.XPATH, x_location_selector(location_name)))
+                EC.element_to_be_clickable(locators.option_with_text(location_name).by)
             )
             self.human.human_click(location_option)
-            self.wait_spinner()
+            if wait:
+                self.wait_spinner()
+                self.record_dom('location')
         except Exception as e:
             logging.error(f'Failed to select location "{location_name}": {e}')
             # Попытка найти похожие элементы для отладки
-            all_options = self.config.browser.find_elements(By.XPATH, '//mat-option/span[@class="mat-option-text"]')
+            all_options = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
             logging.debug(f'Available location options: {[opt.text for opt in all_options]}')
             raise
 
+    def focus_location(self, location_name, captcha_mark):
+        """Attribute the next phases (and captchas since `captcha_mark`) to a location selected earlier."""
+        self.timer.location = location_name
+        self._location_captcha_mark = captcha_mark
+
     def expand_queues(self):
         logging.info('open list of queues')
         time.sleep(rand.uniform(0.15, 0.35))  # Ultra fast dropdown
         
-        x_show_queue_button = '//mat-select[@name="queueName"]'
-        self.waiter.until(EC.visibility_of_element_located((By.XPATH, x_show_queue_button)))
-        queue_dropdown = self.config.browser.find_element(by=By.XPATH, value=x_show_queue_button)
+        self.waiter.until(EC.visibility_of_element_located(locators.QUEUE_DROPDOWN.by))
+        queue_dropdown = locators.find_element(self.config.browser, locators.QUEUE_DROPDOWN)
         self.human.human_click(queue_dropdown)
         self.wait_spinner()
 
     def get_queues(self):
         logging.info('get list of queues')
-        x_queue_elements = '//mat-option/span[@class="mat-option-text"]'
-        self.waiter.until(EC.visibility_of_element_located((By.XPATH, x_queue_elements)))
-        queue_elements = self.config.browser.find_elements(by=By.XPATH, value=x_queue_elements)
+        self.waiter.until(EC.visibility_of_element_located(locators.OPTION_TEXT.by))
+        queue_elements = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
         queues = list(map(lambda el: el.text, queue_elements))
         queues = list(filter(lambda s: s.strip() != '-', queues))
         return queues
 
     def select_queue(self, queue_name):
         logging.info(f'queue selection ({queue_name})')
+        self.skip_captured()
         # ВАЖНО: Не добавляем задержку здесь - dropdown уже открыт и может закрыться!
         
-        # Ищем элемент очереди в открытом dropdown
-        x_queue_selector = lambda text: f'//mat-option/span[@class="mat-option-text" and contains(text(),"{text}")]'
-        
         try:
             # Ждем что элемент видим (dropdown должен быть открыт)
             queue_option = WebDriverWait(self.config.browser, 3).until(
-                EC.element_to_be_clickable((By.XPATH, x_queue_selector(queue_name)))
+                EC.element_to_be_clickable(locators.option_with_text(queue_name).by)
             )
             self.human.human_click(queue_option)
             self.wait_spinner()
         except Exception as e:
             logging.error(f'Failed to select queue "{queue_name}": {e}')
             # Попытка найти похожие элементы для отладки
-            all_options = self.config.browser.find_elements(By.XPATH, '//mat-option/span[@class="mat-option-text"]')
+            all_options = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
             logging.debug(f'Available options: {[opt.text for opt in all_options]}')
             raise
     
-    def select_first_queue_atomic(self):
+    @timed('select_first_queue_atomic')
+    def select_first_queue_atomic(self, wait=True):
         """
         Атомарная операция: открыть dropdown очередей и выбрать первую очередь.
         Минимизирует время между открытием dropdown и кликом.
+        wait=False: не ждем загрузку календаря после клика (pipelined mode).
         """
         logging.info('open list of queues (atomic operation)')
+        self.skip_captured()
         time.sleep(rand.uniform(0.1, 0.3))  # Lightning fast
         
-        x_show_queue_button = '//mat-select[@name="queueName"]'
-        x_queue_elements = '//mat-option/span[@class="mat-option-text"]'
-        
         # Открываем dropdown
-        self.waiter.until(EC.visibility_of_element_located((By.XPATH, x_show_queue_button)))
-        queue_dropdown = self.config.browser.find_element(by=By.XPATH, value=x_show_queue_button)
+        self.waiter.until(EC.visibility_of_element_located(locators.QUEUE_DROPDOWN.by))
+        queue_dropdown = locators.find_element(self.config.browser, locators.QUEUE_DROPDOWN)
         self.human.human_click(queue_dropdown)
         
         # СРАЗУ получаем список и кликаем по первой очереди
         try:
             # Ждем появления опций
-            self.waiter.until(EC.visibility_of_element_located((By.XPATH, x_queue_elements)))
+            self.waiter.until(EC.visibility_of_element_located(locators.OPTION_TEXT.by))
             
             # Получаем все опции
-            queue_elements = self.config.browser.find_elements(by=By.XPATH, value=x_queue_elements)
+            queue_elements = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
             queues = [el.text for el in queue_elements if el.text.strip() != '-']
             
             if len(queues) == 0:
@@ -401,28 +530,30 @@ class Checker:
             logging.info(f'Found queue: {queue_name}')
             
             # СРАЗУ кликаем по ней (dropdown еще открыт!)
-            x_queue_selector = f'//mat-option/span[@class="mat-option-text" and contains(text(),"{queue_name}")]'
-            
             # Находим элемент среди уже полученных (чтобы не искать заново)
             for el in queue_elements:
                 if el.text == queue_name:
                     logging.info(f'queue selection ({queue_name})')
                     self.human.human_click(el)
-                    self.wait_spinner()
-                    
-                    # Check for captcha after queue selection
-                    self.detect_captcha()
+                    if wait:
+                        self.wait_spinner()
+                        
+                        # Check for captcha after queue selection
+                        self.detect_captcha()
+                        self.record_dom('queue', queue=queue_name)
                     
                     return queue_name
             
             # Если не нашли среди старых элементов, пробуем найти заново
-            queue_option = self.config.browser.find_element(by=By.XPATH, value=x_queue_selector)
+            queue_option = locators.find_element(self.config.browser, locators.option_with_text(queue_name))
             logging.info(f'queue selection ({queue_name})')
             self.human.human_click(queue_option)
-            self.wait_spinner()
-            
-            # Check for captcha after queue selection
-            self.detect_captcha()
+            if wait:
+                self.wait_spinner()
+                
+                # Check for captcha after queue selection
+                self.detect_captcha()
+                self.record_dom('queue', queue=queue_name)
             
             return queue_name
             
@@ -430,30 +561,47 @@ class Checker:
             logging.error(f'Failed in atomic queue selection: {e}')
             # Debug info
             try:
-                all_options = self.config.browser.find_elements(By.XPATH, x_queue_elements)
+                all_options = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
                 logging.debug(f'Available options: {[opt.text for opt in all_options]}')
             except:
                 pass
             raise
 
+    def _begin_observation(self, location, queue):
+        self._observation = Observation(case_id=self.config.case_id, location=location, queue=queue)
+        self._enabled_by_month = {}
+
+    def _finish_observation(self):
+        """Complete the current observation and buffer it in the store (written once per cycle)"""
+        observation, self._observation = self._observation, None
+        if observation is None or self.config.observation_store is None:
+            return
+        observation.enabled_dates = max(observation.enabled_dates, sum(self._enabled_by_month.values()))
+        observation.captcha = self.captcha_hits > self._location_captcha_mark
+        # Only this pass: earlier cases and loops of this Checker selected the same location before
+        since = self._timer_marks.get(observation.location, 0)
+        observation.timings = self.timer.locations(since).get(observation.location, {})
+        self.config.observation_store.add(observation)
+
+    def _iso_date(self, day, month_year):
+        year, month = self.parse_month_year(month_year)
+        return datetime(year, month, int(day)).date().isoformat() if year and month else None
+
     def day_checker_full(self, location, queue, months_to_check=3):
-        # Updated Material Design calendar selectors
-        x_calendar = '//mat-calendar[contains(@class,"reservation-calander")]'
-        x_enabled_cells = '//mat-calendar[contains(@class,"reservation-calander")]/div/mat-month-view/table/tbody/tr/td[@role="gridcell" and not(contains(@class,"disabled"))]//div[contains(@class,"mat-calendar-body-cell-content")]'
-        x_month_year = '//button[contains(@class,"mat-calendar-period-button")]/span'
-        x_next_month = '//button[contains(@class,"mat-calendar-next-button")]'
-        x_prev_month = '//button[contains(@class,"mat-calendar-previous-button")]'
-        # Time slots container - updated selector from selectors.md
-        x_reservations_hours = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]'
-        x_time_slots = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]//*[contains(@class,"tile")]'
+        self._begin_observation(location, queue)
+        try:
+            return self._day_checker_full(location, queue, months_to_check)
+        finally:
+            self._finish_observation()
 
+    def _day_checker_full(self, location, queue, months_to_check=3):
         # Wait for calendar to appear after queue selection
         logging.info('waiting for calendar to load...')
         time.sleep(rand.uniform(2, 4))
         
         try:
             WebDriverWait(self.config.browser, 5).until(
-                EC.presence_of_element_located((By.XPATH, x_calendar))
+                EC.presence_of_element_located(locators.CALENDAR.by)
             )
             logging.info('Calendar loaded successfully')
         except Exception as e:
@@ -469,8 +617,9 @@ class Checker:
             self.detect_captcha()
             
             try:
-                month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-                enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
+                snapshot = self.calendar_snapshot()
+                month_year_text = snapshot.month_year
+                enabled_cells = snapshot.enabled_cells
                 logging.info(f'{len(enabled_cells)} enabled cells in {month_year_text}')
             except Exception as e:
                 logging.error(f'Error accessing calendar: {e}')
@@ -493,7 +642,7 @@ class Checker:
                 
                 logging.info('go to next month')
                 time.sleep(rand.uniform(0.5, 1.0))  # Quick skip to next month
-                next_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_next_month)
+                next_month_btn = locators.find_element(self.config.browser, locators.NEXT_MONTH)
                 self.human.human_click(next_month_btn)
                 self.wait_spinner()
                 continue
@@ -501,22 +650,24 @@ class Checker:
             # Reset counter if we found dates
             empty_months_in_row = 0
 
+            self._observation.furthest_date = self._iso_date(enabled_cells[-1].day, month_year_text)
             for enabled_cell in enabled_cells:
-                date_text = enabled_cell.text
+                date_text = str(enabled_cell.day)
                 logging.info(f'check {date_text} {month_year_text}')
                 time.sleep(rand.uniform(0.5, 1.5))  # Faster but still human-like
-                self.human.human_click(enabled_cell)
+                self.human.human_click(enabled_cell.element)
                 day_counter += 1
                 self.wait_spinner()
 
                 # Check if time slots container appears (improved detection)
-                slots_container = self.config.browser.find_elements(by=By.XPATH, value=x_reservations_hours)
+                slots_container = locators.find_elements(self.config.browser, locators.RESERVATION_HOURS)
                 if len(slots_container) != 0:
                     # Double-check for actual time slot elements
-                    time_slots = self.config.browser.find_elements(by=By.XPATH, value=x_time_slots)
+                    time_slots = locators.find_elements(self.config.browser, locators.TIME_SLOTS)
                     if len(time_slots) > 0:
                         msg = f'🎯 SLOT FOUND! {date_text} {month_year_text}: {location} - {queue} ({len(time_slots)} slots available)'
                         logging.info(msg)
+                        self._observation.slot_count += len(time_slots)
                         self.config.messenger.send_message(msg)
                     else:
                         logging.debug(f'Container found but no time slots for {date_text}')
@@ -531,49 +682,29 @@ class Checker:
 
             logging.info('go to next month')
             time.sleep(rand.uniform(0.5, 1.0))  # Faster month switching
-            next_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_next_month)
+            next_month_btn = locators.find_element(self.config.browser, locators.NEXT_MONTH)
             self.human.human_click(next_month_btn)
             self.wait_spinner()
 
     @staticmethod
     def parse_month_year(month_year_text):
         """Parse month/year text like 'PAŹ 2025' into (year, month_number)"""
-        months_pl = {
-            'STY': 1, 'LUT': 2, 'MAR': 3, 'KWI': 4, 'MAJ': 5, 'CZE': 6,
-            'LIP': 7, 'SIE': 8, 'WRZ': 9, 'PAŹ': 10, 'LIS': 11, 'GRU': 12
-        }
-        
-        try:
-            parts = month_year_text.split()
-            if len(parts) >= 2:
-                month_str = parts[0]
-                year = int(parts[1])
-                month = months_pl.get(month_str, 1)
-                return year, month
-        except Exception as e:
-            logging.debug(f'Error parsing month/year "{month_year_text}": {e}')
-        
-        return None, None
+        return working_days.parse_month_year(month_year_text)
     
     @staticmethod
     def get_last_working_day_of_month(year, month):
         """
-        Get the last working day (Mon-Fri) of the month.
+        Get the last working day (Mon-Fri, not a Polish public holiday) of the month.
         
         Examples:
         - October 2025: last day 31 (Friday) → 31
         - November 2025: last day 30 (Sunday), 29 (Saturday) → 28 (Friday)
         - December 2025: last day 31 (Wednesday) → 31
         """
-        last_day = cal.monthrange(year, month)[1]
-        
-        # Go backwards from last day to first working day
-        for day in range(last_day, 0, -1):
-            weekday = datetime(year, month, day).weekday()
-            if weekday < 5:  # Mon-Fri (0-4)
-                return day
-        
-        return last_day  # Fallback
+        last_day = working_days.get_working_day_index().last_bookable_day(year, month)
+        if last_day is None:
+            return cal.monthrange(year, month)[1]  # Fallback
+        return last_day
     
     @staticmethod
     def is_weekend_date(date_num, year, month):
@@ -585,7 +716,58 @@ class Checker:
             logging.debug(f'Error checking weekend for {date_num}/{month}/{year}: {e}')
             return False
 
-    def find_furthest_available_date(self, x_month_year, x_enabled_cells, x_next_month, x_prev_month):
+    @staticmethod
+    def is_bookable_date(date_num, year, month):
+        """Check if given date is a working day (Mon-Fri and not a public holiday)"""
+        try:
+            return working_days.get_working_day_index().is_bookable(year, month, date_num)
+        except Exception as e:
+            logging.debug(f'Error checking working day for {date_num}/{month}/{year}: {e}')
+            return True
+
+    def calendar_snapshot(self):
+        """
+        Read the visible calendar month in one round-trip.
+
+        Returns CalendarSnapshot or None if the calendar is not rendered.
+        """
+        raw = self.config.browser.execute_script(
+            SNAPSHOT_JS,
+            locators.CALENDAR.css,
+            locators.CALENDAR_CELLS.css,
+            locators.CELL_CONTENT.css,
+            locators.MONTH_YEAR.css,
+        )
+        if not raw:
+            return None
+
+        month_year_text = raw.get('monthYear', '')
+        year, month = self.parse_month_year(month_year_text)
+        cells = []
+        for item in raw.get('cells', []):
+            date_num = int(item['day'])
+            weekend, holiday = False, False
+            if year and month:
+                weekend = self.is_weekend_date(date_num, year, month)
+                holiday = not weekend and not self.is_bookable_date(date_num, year, month)
+            cells.append(CalendarCell(
+                index=int(item['index']),
+                day=date_num,
+                disabled=bool(item['disabled']),
+                weekend=weekend,
+                holiday=holiday,
+                element=item.get('element'),
+            ))
+        snapshot = CalendarSnapshot(month_year=month_year_text, year=year, month=month, cells=cells)
+        if self._observation is not None:
+            self._enabled_by_month[month_year_text] = len(snapshot.enabled_cells)
+        if self.recorder is not None and snapshot.year and snapshot.month:
+            self.record_dom('calendar', snapshot=snapshot,
+                            last_working_day=self.get_last_working_day_of_month(snapshot.year, snapshot.month))
+        return snapshot
+
+    @timed('find_furthest_available_date')
+    def find_furthest_available_date(self, location=None):
         """
         Find the furthest available date by checking if last available date
         equals last working day of month. If yes, move to next month.
@@ -593,114 +775,119 @@ class Checker:
         Returns: dict with 'cell', 'date', 'month_year', 'months_forward'
         or None if no dates found.
         """
+        base_snapshot = self.calendar_snapshot()
+        if base_snapshot is None:
+            logging.warning('Calendar is not rendered')
+            return None
+        base_month_year = base_snapshot.month_year
+
         # Check if we have cached result
-        if self._cached_check_date is not None:
-            cached = self._cached_check_date
+        cached = self._get_cached_date(location)
+        if cached is not None and cached.get('base_month_year', base_month_year) != base_month_year:
+            # Calendar starts at another month now, months_forward no longer points to the cached month
+            logging.info(f'Calendar now starts at {base_month_year} (cached at {cached["base_month_year"]}), '
+                         f'dropping cached date')
+            self._invalidate_cached_date(location)
+            cached = None
+
+        if cached is not None:
             logging.info(f'Using CACHED date: {cached["date"]} {cached["month_year"]} '
                         f'(+{cached["months_forward"]} months)')
             
             # Navigate to cached month
             for _ in range(cached['months_forward']):
-                next_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_next_month)
+                next_month_btn = locators.find_element(self.config.browser, locators.NEXT_MONTH)
                 self.human.human_click(next_month_btn)
                 time.sleep(rand.uniform(0.1, 0.2))
                 self.wait_spinner()
             
             # Find the cell for cached date
             try:
-                month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-                enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
-                
-                year, month = self.parse_month_year(month_year_text)
-                if year and month:
-                    for cell in enabled_cells:
-                        try:
-                            date_num = int(cell.text)
-                            if date_num == cached['date'] and not self.is_weekend_date(date_num, year, month):
-                                return {
-                                    'cell': cell,
-                                    'date': date_num,
-                                    'month_year': month_year_text,
-                                    'months_forward': cached['months_forward']
-                                }
-                        except:
-                            continue
+                snapshot = self.calendar_snapshot()
+                if snapshot is not None and snapshot.month_year == cached['month_year']:
+                    cell = snapshot.find_day(cached['date'])
+                    if cell is not None and cell.is_candidate:
+                        return {
+                            'cell': cell.element,
+                            'date': cell.day,
+                            'month_year': snapshot.month_year,
+                            'months_forward': cached['months_forward']
+                        }
+                logging.info(f'Cached date {cached["date"]} {cached["month_year"]} is no longer enabled, '
+                             f'will search again')
             except Exception as e:
                 logging.warning(f'Error using cached date, will search again: {e}')
+            self._invalidate_cached_date(location)
+
+            # Back to the initial month before searching
+            for _ in range(cached['months_forward']):
+                prev_month_btn = locators.find_element(self.config.browser, locators.PREV_MONTH)
+                self.human.human_click(prev_month_btn)
+                time.sleep(rand.uniform(0.1, 0.2))
+                self.wait_spinner()
         
         # Search for furthest date
         max_months = 3  # Max 3 months forward (safety limit)
         
         for month_offset in range(max_months):
             try:
-                month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-                enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
+                # The initial month was already read above unless we went to a cached month and back
+                snapshot = base_snapshot if month_offset == 0 and cached is None else self.calendar_snapshot()
+                if snapshot is None:
+                    logging.warning('Calendar is not rendered')
+                    return None
                 
-                logging.info(f'[Month +{month_offset}] {month_year_text}: {len(enabled_cells)} enabled cells')
+                logging.info(f'[Month +{month_offset}] {snapshot.month_year}: '
+                             f'{len(snapshot.enabled_cells)} enabled cells')
                 
-                if len(enabled_cells) == 0:
+                if len(snapshot.enabled_cells) == 0:
                     # No dates in this month
                     if month_offset > 0:
                         # Go back to previous month
                         logging.info('No dates in this month, returning to previous month')
-                        prev_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_prev_month)
+                        prev_month_btn = locators.find_element(self.config.browser, locators.PREV_MONTH)
                         self.human.human_click(prev_month_btn)
                         time.sleep(rand.uniform(0.1, 0.2))
                         self.wait_spinner()
                         
                         # Get last available date from previous month
-                        month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-                        enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
-                        year, month = self.parse_month_year(month_year_text)
-                        
-                        if year and month:
-                            valid_cells = [c for c in enabled_cells 
-                                         if not self.is_weekend_date(int(c.text), year, month)]
-                            if valid_cells:
-                                last_cell = valid_cells[-1]
-                                result = {
-                                    'cell': last_cell,
-                                    'date': int(last_cell.text),
-                                    'month_year': month_year_text,
-                                    'months_forward': month_offset - 1
-                                }
-                                self._cache_date_info(result)
-                                return result
+                        snapshot = self.calendar_snapshot()
+                        last_cell = snapshot.last_candidate() if snapshot is not None else None
+                        if last_cell is not None:
+                            result = {
+                                'cell': last_cell.element,
+                                'date': last_cell.day,
+                                'month_year': snapshot.month_year,
+                                'months_forward': month_offset - 1
+                            }
+                            self._cache_date_info(result, location, base_month_year)
+                            return result
                     return None
                 
-                # Parse month/year
-                year, month = self.parse_month_year(month_year_text)
-                if not year or not month:
-                    logging.warning(f'Could not parse month/year: {month_year_text}')
+                if not snapshot.year or not snapshot.month:
+                    logging.warning(f'Could not parse month/year: {snapshot.month_year}')
                     return None
                 
-                # Filter weekends
-                valid_cells = []
-                for cell in enabled_cells:
-                    try:
-                        date_num = int(cell.text)
-                        if not self.is_weekend_date(date_num, year, month):
-                            valid_cells.append(cell)
-                        else:
-                            logging.debug(f'Skipping weekend: {date_num} {month_year_text}')
-                    except:
-                        continue
+                for cell in snapshot.enabled_cells:
+                    if cell.weekend or cell.holiday:
+                        logging.debug(f'Skipping non-working day: {cell.day} {snapshot.month_year}')
                 
-                if len(valid_cells) == 0:
-                    logging.warning(f'No non-weekend dates in {month_year_text}')
+                last_cell = snapshot.last_candidate()
+                if last_cell is None:
+                    logging.warning(f'No working-day dates in {snapshot.month_year}')
                     if month_offset > 0:
                         # Go back
-                        prev_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_prev_month)
+                        prev_month_btn = locators.find_element(self.config.browser, locators.PREV_MONTH)
                         self.human.human_click(prev_month_btn)
                         time.sleep(rand.uniform(0.1, 0.2))
                         self.wait_spinner()
                     return None
                 
                 # Get last available date
-                last_available_date = int(valid_cells[-1].text)
-                last_working_day = self.get_last_working_day_of_month(year, month)
+                last_available_date = last_cell.day
+                last_working_day = self.get_last_working_day_of_month(snapshot.year, snapshot.month)
                 
-                logging.info(f'[Month +{month_offset}] {month_year_text}: '
+                logging.info(f'[Month +{month_offset}] {snapshot.month_year}: '
                            f'last_available={last_available_date}, last_working_day={last_working_day}')
                 
                 if last_available_date == last_working_day:
@@ -708,25 +895,25 @@ class Checker:
                     logging.info(f'Last available date {last_available_date} matches '
                                f'last working day {last_working_day} → going to next month')
                     
-                    next_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_next_month)
+                    next_month_btn = locators.find_element(self.config.browser, locators.NEXT_MONTH)
                     self.human.human_click(next_month_btn)
                     time.sleep(rand.uniform(0.1, 0.2))
                     self.wait_spinner()
                     continue
                 else:
                     # Found our date!
-                    logging.info(f'✅ Found furthest date: {last_available_date} {month_year_text} '
+                    logging.info(f'✅ Found furthest date: {last_available_date} {snapshot.month_year} '
                                f'(< last working day {last_working_day})')
                     
                     result = {
-                        'cell': valid_cells[-1],
+                        'cell': last_cell.element,
                         'date': last_available_date,
-                        'month_year': month_year_text,
+                        'month_year': snapshot.month_year,
                         'months_forward': month_offset
                     }
                     
                     # Cache this result
-                    self._cache_date_info(result)
+                    self._cache_date_info(result, location, base_month_year)
                     
                     return result
                     
@@ -738,47 +925,132 @@ class Checker:
         logging.warning(f'Reached max months ({max_months}), using last available')
         return None
     
-    def _cache_date_info(self, date_info):
-        """Cache date info for reuse across all locations in session"""
+    def _get_cached_date(self, location):
+        """Cached date for this case/location from disk, else the one found earlier in this session"""
+        if self.config.date_cache is not None and location is not None:
+            cached = self.config.date_cache.get(self.config.case_id, location)
+            if cached is not None:
+                return cached
+        return self._cached_check_date
+
+    def _invalidate_cached_date(self, location):
+        self._cached_check_date = None
+        if self.config.date_cache is not None and location is not None:
+            self.config.date_cache.invalidate(self.config.case_id, location)
+
+    def _cache_date_info(self, date_info, location, base_month_year):
+        """Cache date info for reuse across all locations in session (and on disk per location)"""
         self._cached_check_date = {
             'date': date_info['date'],
             'month_year': date_info['month_year'],
-            'months_forward': date_info['months_forward']
+            'months_forward': date_info['months_forward'],
+            'base_month_year': base_month_year,
         }
+        if self.config.date_cache is not None and location is not None:
+            self.config.date_cache.put(self.config.case_id, location, self._cached_check_date)
         logging.info(f'📌 CACHED date for session: {date_info["date"]} {date_info["month_year"]} '
                     f'(+{date_info["months_forward"]} months)')
 
+    def skip_captured(self):
+        """Before moving to another location/queue: responses to requests sent so far belong to the previous one."""
+        if self.network is None:
+            return
+        try:
+            self.network.skip()
+        except Exception as e:
+            logging.debug(f'Could not skip captured responses: {e}')
+
+    def captured_availability(self, location, queue) -> Availability | None:
+        """Dates/slots captured from XHR responses so far for this location/queue (None without capture)"""
+        if self.network is None:
+            return None
+        try:
+            availability = self.network.collect(location, queue)
+        except Exception as e:
+            logging.warning(f'Network capture failed, using the DOM: {e}')
+            return None
+        logging.info(f'Captured availability: {availability.summary()}')
+        return availability
+
+    def open_captured_furthest_date(self, availability: Availability, location=None, max_months=3):
+        """
+        Go straight to the month of the furthest captured working-day date and
+        return its cell like find_furthest_available_date does, or None (calendar
+        left at its initial month) if the DOM does not confirm it.
+        """
+        target = availability.furthest_date(
+            lambda day: self.is_bookable_date(day.day, day.year, day.month))
+        base_snapshot = self.calendar_snapshot()
+        if target is None or base_snapshot is None or not base_snapshot.year:
+            return None
+        months_forward = (target.year - base_snapshot.year) * 12 + target.month - base_snapshot.month
+        if not 0 <= months_forward < max_months:
+            logging.info(f'Captured furthest date {target.isoformat()} is outside the calendar window')
+            return None
+
+        for _ in range(months_forward):
+            next_month_btn = locators.find_element(self.config.browser, locators.NEXT_MONTH)
+            self.human.human_click(next_month_btn)
+            time.sleep(rand.uniform(0.1, 0.2))
+            self.wait_spinner()
+
+        snapshot = self.calendar_snapshot()
+        if snapshot is not None and (snapshot.year, snapshot.month) == (target.year, target.month):
+            cell = snapshot.find_day(target.day)
+            if cell is not None and cell.is_candidate:
+                logging.info(f'✅ Furthest date from captured response: {target.day} {snapshot.month_year}')
+                result = {
+                    'cell': cell.element,
+                    'date': cell.day,
+                    'month_year': snapshot.month_year,
+                    'months_forward': months_forward,
+                }
+                self._cache_date_info(result, location, base_snapshot.month_year)
+                return result
+
+        logging.info(f'Captured date {target.isoformat()} not enabled in the calendar, walking months instead')
+        for _ in range(months_forward):
+            prev_month_btn = locators.find_element(self.config.browser, locators.PREV_MONTH)
+            self.human.human_click(prev_month_btn)
+            time.sleep(rand.uniform(0.1, 0.2))
+            self.wait_spinner()
+        return None
+
     def check_last_date_only(self, location, queue):
+        self._begin_observation(location, queue)
+        try:
+            return self._check_last_date_only(location, queue)
+        finally:
+            self._finish_observation()
+
+    def _check_last_date_only(self, location, queue):
         """
         Check ONLY the furthest available date in calendar (~6 weeks forward).
         Uses improved logic: keep going to next month while last_available == last_working_day.
-        Skip weekends (Sat/Sun).
+        Skip weekends (Sat/Sun) and Polish public holidays.
         Cache result for all locations in session.
         """
-        # Calendar selectors
-        x_calendar = '//mat-calendar[contains(@class,"reservation-calander")]'
-        x_enabled_cells = '//mat-calendar[contains(@class,"reservation-calander")]/div/mat-month-view/table/tbody/tr/td[@role="gridcell" and not(contains(@class,"disabled"))]//div[contains(@class,"mat-calendar-body-cell-content")]'
-        x_month_year = '//button[contains(@class,"mat-calendar-period-button")]/span'
-        x_next_month = '//button[contains(@class,"mat-calendar-next-button")]'
-        x_prev_month = '//button[contains(@class,"mat-calendar-previous-button")]'
-        x_reservations_hours = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]'
-        x_time_slots = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]//*[contains(@class,"tile")]'
-
         # Wait for calendar
         logging.info('waiting for calendar to load...')
         time.sleep(rand.uniform(0.3, 0.8))
         
         try:
             WebDriverWait(self.config.browser, 5).until(
-                EC.presence_of_element_located((By.XPATH, x_calendar))
+                EC.presence_of_element_located(locators.CALENDAR.by)
             )
             logging.info('Calendar loaded successfully')
         except Exception as e:
             logging.warning(f'Calendar did not load for "{location}" - "{queue}" - skipping')
             return None
         
-        # Find the furthest available date (passing through months)
-        date_info = self.find_furthest_available_date(x_month_year, x_enabled_cells, x_next_month, x_prev_month)
+        # Dates the page has just loaded over XHR, if captured; otherwise walk the calendar months
+        availability = self.captured_availability(location, queue)
+        date_info = None
+        if availability is not None and availability.dates:
+            self._observation.enabled_dates = len(availability.dates)
+            date_info = self.open_captured_furthest_date(availability, location)
+        if date_info is None:
+            date_info = self.find_furthest_available_date(location)
         
         if date_info is None:
             logging.warning(f'No valid date found for "{location}" - "{queue}"')
@@ -796,24 +1068,35 @@ class Checker:
         if captcha_appeared:
             logging.info('Captcha was solved, continuing...')
         
-        # Check for time slots
+        # Check for time slots: the captured slots response if there is one, else the rendered tiles
         slots_found = False
-        slots_container = self.config.browser.find_elements(by=By.XPATH, value=x_reservations_hours)
-        if len(slots_container) != 0:
-            time_slots = self.config.browser.find_elements(by=By.XPATH, value=x_time_slots)
-            if len(time_slots) > 0:
-                msg = f'🎯 SLOT FOUND! {date_info["date"]} {date_info["month_year"]}: {location} - {queue} ({len(time_slots)} slots)'
-                logging.info(msg)
-                self.config.messenger.send_message(msg)
-                slots_found = True
-            else:
-                logging.debug(f'Container found but no time slots for {date_info["date"]}')
+        availability = self.captured_availability(location, queue)
+        year, month = self.parse_month_year(date_info['month_year'])
+        clicked_date = datetime(year, month, date_info['date']).date() if year and month else None
+        self._observation.furthest_date = clicked_date.isoformat() if clicked_date else None
+        if availability is not None and clicked_date in availability.slots:
+            slot_count = len(availability.slots[clicked_date])
+            logging.info(f'Captured {slot_count} slot(s) for {clicked_date.isoformat()}')
+        else:
+            slot_count = 0
+            slots_container = locators.find_elements(self.config.browser, locators.RESERVATION_HOURS)
+            if len(slots_container) != 0:
+                slot_count = len(locators.find_elements(self.config.browser, locators.TIME_SLOTS))
+                if slot_count == 0:
+                    logging.debug(f'Container found but no time slots for {date_info["date"]}')
+        self._observation.slot_count = slot_count
+        self.record_dom('slots', date=clicked_date.isoformat() if clicked_date else None, slot_count=slot_count)
+        if slot_count > 0:
+            msg = f'🎯 SLOT FOUND! {date_info["date"]} {date_info["month_year"]}: {location} - {queue} ({slot_count} slots)'
+            logging.info(msg)
+            self.config.messenger.send_message(msg)
+            slots_found = True
         
         # Return to initial month if we went forward
         if date_info['months_forward'] > 0:
             logging.info(f'Returning to initial month (-{date_info["months_forward"]} months)...')
             for _ in range(date_info['months_forward']):
-                prev_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_prev_month)
+                prev_month_btn = locators.find_element(self.config.browser, locators.PREV_MONTH)
                 self.human.human_click(prev_month_btn)
                 time.sleep(rand.uniform(0.1, 0.2))
                 self.wait_spinner()
@@ -828,21 +1111,16 @@ class Checker:
         self.detect_captcha()
 
         logging.info('check if appointment panel needs expanding')
-        # Language-independent selectors
-        x_location_dropdown = '//mat-select[@name="location"]'
-        # Multi-language XPath for appointment section button (same as expand_appointment_panel)
-        x_accordion_button = '//h3[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "appointment") or contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "wizyt") or contains(translate(text(), "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"), "зустріч") or contains(translate(text(), "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"), "встречу")]/following::button[contains(@class, "btn--accordion")][1]'
-        
         # Wait for page to load with human-like delay
         time.sleep(rand.uniform(1, 2))
         
         # Check if accordion is already expanded
-        dropdown_elements = self.config.browser.find_elements(by=By.XPATH, value=x_location_dropdown)
+        dropdown_elements = locators.find_elements(self.config.browser, locators.LOCATION_DROPDOWN)
         if len(dropdown_elements) > 0 and dropdown_elements[0].is_displayed():
             logging.info('Panel already expanded (location dropdown visible)')
         else:
             # Panel collapsed, click to expand with multi-language selector
-            button_elements = self.config.browser.find_elements(by=By.XPATH, value=x_accordion_button)
+            button_elements = locators.find_elements(self.config.browser, locators.APPOINTMENT_BUTTON)
             if len(button_elements) > 0:
                 logging.info('Panel collapsed, clicking appointment accordion button to expand')
                 time.sleep(rand.uniform(1, 2))
@@ -857,17 +1135,15 @@ class Checker:
         logging.info('expand list of locations')
         time.sleep(rand.uniform(0.5, 1.0))  # Faster dropdown
         
-        x_show_location_button = '//mat-select[@name="location"]'
         WebDriverWait(self.config.browser, self.config.page_load_timeout).until(
-            EC.visibility_of_element_located((By.XPATH, x_show_location_button)))
-        location_dropdown = self.config.browser.find_element(by=By.XPATH, value=x_show_location_button)
+            EC.visibility_of_element_located(locators.LOCATION_DROPDOWN.by))
+        location_dropdown = locators.find_element(self.config.browser, locators.LOCATION_DROPDOWN)
         self.human.human_click(location_dropdown)
 
         logging.info('get a list of locations')
-        x_location_elements = '//mat-option/span[@class="mat-option-text"]'
         WebDriverWait(self.config.browser, self.config.page_load_timeout).until(
-            EC.visibility_of_element_located((By.XPATH, x_location_elements)))
-        location_elements = self.config.browser.find_elements(by=By.XPATH, value=x_location_elements)
+            EC.visibility_of_element_located(locators.OPTION_TEXT.by))
+        location_elements = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
         location = list(map(lambda el: el.text, location_elements))
         location = list(filter(lambda s: s.strip() != '-', location))
 
@@ -882,8 +1158,7 @@ class Checker:
         logging.info(f'location selection ({location_name})')
         time.sleep(rand.uniform(0.5, 1.0))  # Faster selection
         
-        x_location_selector = lambda text: f'//mat-option/span[@class="mat-option-text" and contains(text(),"{text}")]'
-        location_option = self.config.browser.find_element(by=By.XPATH, value=x_location_selector(location_name))
+        location_option = locators.find_element(self.config.browser, locators.option_with_text(location_name))
         self.human.human_click(location_option)
         self.wait_spinner()
 
@@ -892,18 +1167,16 @@ class Checker:
         logging.info('open list of queues')
         time.sleep(rand.uniform(0.5, 1.0))  # Faster dropdown
         
-        x_show_queue_button = '//mat-select[@name="queueName"]'
         WebDriverWait(self.config.browser, self.config.page_load_timeout).until(
-            EC.visibility_of_element_located((By.XPATH, x_show_queue_button)))
-        queue_dropdown = self.config.browser.find_element(by=By.XPATH, value=x_show_queue_button)
+            EC.visibility_of_element_located(locators.QUEUE_DROPDOWN.by))
+        queue_dropdown = locators.find_element(self.config.browser, locators.QUEUE_DROPDOWN)
         self.human.human_click(queue_dropdown)
         self.wait_spinner()
 
         logging.info('get list of queues')
-        x_queue_elements = '//mat-option/span[@class="mat-option-text"]'
         WebDriverWait(self.config.browser, self.config.page_load_timeout).until(
-            EC.visibility_of_element_located((By.XPATH, x_queue_elements)))
-        queue_elements = self.config.browser.find_elements(by=By.XPATH, value=x_queue_elements)
+            EC.visibility_of_element_located(locators.OPTION_TEXT.by))
+        queue_elements = locators.find_elements(self.config.browser, locators.OPTION_TEXT)
         queues = list(map(lambda el: el.text, queue_elements))
         queues = list(filter(lambda s: s.strip() != '-', queues))
 
@@ -919,8 +1192,7 @@ class Checker:
         logging.info(f'queue selection ({queue_name})')
         time.sleep(rand.uniform(0.5, 1.0))  # Faster selection
         
-        x_queue_selector = lambda text: f'//mat-option/span[@class="mat-option-text" and contains(text(),"{text}")]'
-        queue_option = self.config.browser.find_element(by=By.XPATH, value=x_queue_selector(queue_name))
+        queue_option = locators.find_element(self.config.browser, locators.option_with_text(queue_name))
         self.human.human_click(queue_option)
         self.wait_spinner()
 
@@ -928,20 +1200,10 @@ class Checker:
         logging.info('waiting for calendar to load...')
         time.sleep(rand.uniform(2, 4))
         
-        # Updated Material Design calendar selectors
-        x_calendar = '//mat-calendar[contains(@class,"reservation-calander")]'
-        x_enabled_cells = '//mat-calendar[contains(@class,"reservation-calander")]/div/mat-month-view/table/tbody/tr/td[@role="gridcell" and not(contains(@class,"disabled"))]//div[contains(@class,"mat-calendar-body-cell-content")]'
-        x_month_year = '//button[contains(@class,"mat-calendar-period-button")]/span'
-        x_next_month = '//button[contains(@class,"mat-calendar-next-button")]'
-        x_prev_month = '//button[contains(@class,"mat-calendar-previous-button")]'
-        # Time slots container - updated selector from selectors.md
-        x_reservations_hours = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]'
-        x_time_slots = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]//*[contains(@class,"tile")]'
-
         # Check if calendar loaded
         try:
             WebDriverWait(self.config.browser, 5).until(
-                EC.presence_of_element_located((By.XPATH, x_calendar))
+                EC.presence_of_element_located(locators.CALENDAR.by)
             )
             logging.info('Calendar loaded successfully')
         except Exception as e:
@@ -955,8 +1217,8 @@ class Checker:
             self.detect_captcha()
             
             try:
-                month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-                enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
+                month_year_text = locators.find_element(self.config.browser, locators.MONTH_YEAR).text
+                enabled_cells = locators.find_elements(self.config.browser, locators.ENABLED_CELLS)
                 logging.info(f'{len(enabled_cells)} enabled cells in {month_year_text}')
             except Exception as e:
                 logging.error(f'Error getting calendar data: {e}')
@@ -971,10 +1233,10 @@ class Checker:
                 self.wait_spinner()
                 
                 # Check if time slots container appears (improved detection)
-                slots_container = self.config.browser.find_elements(by=By.XPATH, value=x_reservations_hours)
+                slots_container = locators.find_elements(self.config.browser, locators.RESERVATION_HOURS)
                 if len(slots_container) != 0:
                     # Double-check for actual time slot elements
-                    time_slots = self.config.browser.find_elements(by=By.XPATH, value=x_time_slots)
+                    time_slots = locators.find_elements(self.config.browser, locators.TIME_SLOTS)
                     if len(time_slots) > 0:
                         msg = f'🎯 SLOT FOUND! {date_text} {month_year_text} {location_name} ({len(time_slots)} slots available)'
                         logging.info(msg)
@@ -992,7 +1254,7 @@ class Checker:
             logging.info('go to next month')
             time.sleep(rand.uniform(0.5, 1.0))  # Faster month switching
             month_counter += 1
-            next_month_button = self.config.browser.find_element(by=By.XPATH, value=x_next_month)
+            next_month_button = locators.find_element(self.config.browser, locators.NEXT_MONTH)
             self.human.human_click(next_month_button)
             self.wait_spinner()
 
@@ -2,7 +2,10 @@ from dataclasses import dataclass
 
 from selenium import webdriver
 
+from lib.date_cache import DateCache
 from lib.messenger import Messenger
+from lib.observation_store import ObservationStore
+from lib.session_store import SessionStore
 
 
 @dataclass
@@ -14,3 +17,6 @@ class CheckerConfig:
     case_id: str
     page_load_timeout: int = 90
     count_of_locations: int = 3
+    date_cache: DateCache | None = None
+    session_store: SessionStore | None = None
+    observation_store: ObservationStore | None = None
@@ -8,16 +8,8 @@ def check_last_date_only(self, location, queue):
     If dates extend to end of month, check next month too.
     """
     import calendar as cal
-    from datetime import datetime
-    
-    # Calendar selectors
-    x_calendar = '//mat-calendar[contains(@class,"reservation-calander")]'
-    x_enabled_cells = '//mat-calendar[contains(@class,"reservation-calander")]/div/mat-month-view/table/tbody/tr/td[@role="gridcell" and not(contains(@class,"disabled"))]//div[contains(@class,"mat-calendar-body-cell-content")]'
-    x_month_year = '//button[contains(@class,"mat-calendar-period-button")]/span'
-    x_next_month = '//button[contains(@class,"mat-calendar-next-button")]'
-    x_prev_month = '//button[contains(@class,"mat-calendar-previous-button")]'
-    x_reservations_hours = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]'
-    x_time_slots = '//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]//*[contains(@class,"tile")]'
+
+    from lib import locators, working_days
 
     # Wait for calendar
     logging.info('waiting for calendar to load...')
@@ -25,7 +17,7 @@ def check_last_date_only(self, location, queue):
     
     try:
         WebDriverWait(self.config.browser, 5).until(
-            EC.presence_of_element_located((By.XPATH, x_calendar))
+            EC.presence_of_element_located(locators.CALENDAR.by)
         )
         logging.info('Calendar loaded successfully')
     except Exception as e:
@@ -33,26 +25,11 @@ def check_last_date_only(self, location, queue):
         return None
     
     def is_weekend(date_text, month_year_text):
-        """Check if date is Saturday or Sunday"""
+        """Check if date is Saturday, Sunday or a public holiday"""
         try:
-            # Parse month/year (e.g., "PAŹ 2025" -> October 2025)
-            months_pl = {
-                'STY': 1, 'LUT': 2, 'MAR': 3, 'KWI': 4, 'MAJ': 5, 'CZE': 6,
-                'LIP': 7, 'SIE': 8, 'WRZ': 9, 'PAŹ': 10, 'LIS': 11, 'GRU': 12
-            }
-            
-            parts = month_year_text.split()
-            if len(parts) >= 2:
-                month_str = parts[0]
-                year = int(parts[1])
-                month = months_pl.get(month_str, 1)
-                day = int(date_text)
-                
-                # Get weekday (0=Mon, 6=Sun)
-                weekday = datetime(year, month, day).weekday()
-                
-                # Saturday=5, Sunday=6
-                return weekday >= 5
+            year, month = working_days.parse_month_year(month_year_text)
+            if year and month:
+                return not working_days.get_working_day_index().is_bookable(year, month, int(date_text))
         except Exception as e:
             logging.debug(f'Error checking weekend: {e}')
             return False
@@ -62,22 +39,13 @@ def check_last_date_only(self, location, queue):
     def is_end_of_month(date_text, month_year_text):
         """Check if date is close to end of month (last 5 days)"""
         try:
-            parts = month_year_text.split()
-            if len(parts) >= 2:
-                months_pl = {
-                    'STY': 1, 'LUT': 2, 'MAR': 3, 'KWI': 4, 'MAJ': 5, 'CZE': 6,
-                    'LIP': 7, 'SIE': 8, 'WRZ': 9, 'PAŹ': 10, 'LIS': 11, 'GRU': 12
-                }
-                month_str = parts[0]
-                year = int(parts[1])
-                month = months_pl.get(month_str, 1)
-                day = int(date_text)
-                
+            year, month = working_days.parse_month_year(month_year_text)
+            if year and month:
                 # Get last day of month
                 last_day = cal.monthrange(year, month)[1]
                 
                 # If within last 5 days of month
-                return (last_day - day) <= 5
+                return (last_day - int(date_text)) <= 5
         except Exception as e:
             logging.debug(f'Error checking end of month: {e}')
             return False
@@ -86,8 +54,8 @@ def check_last_date_only(self, location, queue):
     
     # Get current month info
     try:
-        month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-        enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
+        month_year_text = locators.find_element(self.config.browser, locators.MONTH_YEAR).text
+        enabled_cells = locators.find_elements(self.config.browser, locators.ENABLED_CELLS)
         logging.info(f'{len(enabled_cells)} enabled cells in {month_year_text}')
     except Exception as e:
         logging.error(f'Error accessing calendar: {e}')
@@ -129,9 +97,9 @@ def check_last_date_only(self, location, queue):
     
     # Check for time slots
     slots_found = False
-    slots_container = self.config.browser.find_elements(by=By.XPATH, value=x_reservations_hours)
+    slots_container = locators.find_elements(self.config.browser, locators.RESERVATION_HOURS)
     if len(slots_container) != 0:
-        time_slots = self.config.browser.find_elements(by=By.XPATH, value=x_time_slots)
+        time_slots = locators.find_elements(self.config.browser, locators.TIME_SLOTS)
         if len(time_slots) > 0:
             msg = f'🎯 SLOT FOUND! {last_date_text} {month_year_text}: {location} - {queue} ({len(time_slots)} slots)'
             logging.info(msg)
@@ -149,14 +117,14 @@ def check_last_date_only(self, location, queue):
         time.sleep(rand.uniform(0.15, 0.35))
         
         # Go to next month
-        next_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_next_month)
+        next_month_btn = locators.find_element(self.config.browser, locators.NEXT_MONTH)
         self.human.human_click(next_month_btn)
         self.wait_spinner()
         
         # Get next month info
         try:
-            next_month_year_text = self.config.browser.find_element(by=By.XPATH, value=x_month_year).text
-            next_enabled_cells = self.config.browser.find_elements(by=By.XPATH, value=x_enabled_cells)
+            next_month_year_text = locators.find_element(self.config.browser, locators.MONTH_YEAR).text
+            next_enabled_cells = locators.find_elements(self.config.browser, locators.ENABLED_CELLS)
             logging.info(f'{len(next_enabled_cells)} enabled cells in {next_month_year_text}')
             
             if len(next_enabled_cells) > 0:
@@ -185,9 +153,9 @@ def check_last_date_only(self, location, queue):
                         time.sleep(rand.uniform(1, 2))
                     
                     # Check slots
-                    slots_container = self.config.browser.find_elements(by=By.XPATH, value=x_reservations_hours)
+                    slots_container = locators.find_elements(self.config.browser, locators.RESERVATION_HOURS)
                     if len(slots_container) != 0:
-                        time_slots = self.config.browser.find_elements(by=By.XPATH, value=x_time_slots)
+                        time_slots = locators.find_elements(self.config.browser, locators.TIME_SLOTS)
                         if len(time_slots) > 0:
                             msg = f'🎯 SLOT FOUND! {next_last_date_text} {next_month_year_text}: {location} - {queue} ({len(time_slots)} slots)'
                             logging.info(msg)
@@ -199,7 +167,7 @@ def check_last_date_only(self, location, queue):
                 # Go back to previous month
                 logging.info('Returning to previous month...')
                 time.sleep(rand.uniform(0.15, 0.35))
-                prev_month_btn = self.config.browser.find_element(by=By.XPATH, value=x_prev_month)
+                prev_month_btn = locators.find_element(self.config.browser, locators.PREV_MONTH)
                 self.human.human_click(prev_month_btn)
                 self.wait_spinner()
             else:
@@ -0,0 +1,100 @@
+"""
+On-disk cache of the furthest checked date, keyed by case and location.
+
+Lets a fresh Checker (new loop, restarted container) jump straight to the
+month that was found last time instead of probing month by month again.
+Updates are serialized with a lock file, so several processes (run_accounts.py)
+can share one cache file without losing each other's entries.
+"""
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+from pytimeparse.timeparse import timeparse
+
+
+@dataclass
+class DateCache:
+    path: str
+    ttl_seconds: float
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get('DATE_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'inpol-date-cache.json'))
+        ttl = timeparse(os.environ.get('DATE_CACHE_TTL', '6h'))
+        return cls(path=path, ttl_seconds=ttl)
+
+    @staticmethod
+    def _key(case_id, location):
+        return f'{case_id}|{location}'
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning(f'Date cache {self.path} is unreadable, starting empty: {e}')
+            return {}
+
+    def _save(self, entries: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so a crash never leaves a truncated cache
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.date-cache-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusive lock around a load -> modify -> save."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f'{self.path}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def get(self, case_id, location) -> dict | None:
+        entry = self._load().get(self._key(case_id, location))
+        if entry is None:
+            return None
+        if time.time() - entry.get('saved_at', 0) > self.ttl_seconds:
+            logging.info(f'Cached date for "{location}" expired')
+            self.invalidate(case_id, location)
+            return None
+        return entry
+
+    def put(self, case_id, location, date_info: dict):
+        try:
+            with self._locked():
+                entries = self._load()
+                entries[self._key(case_id, location)] = {
+                    'date': date_info['date'],
+                    'month_year': date_info['month_year'],
+                    'months_forward': date_info['months_forward'],
+                    'base_month_year': date_info['base_month_year'],
+                    'saved_at': time.time(),
+                }
+                self._save(entries)
+        except Exception as e:
+            logging.warning(f'Could not write date cache {self.path}: {e}')
+
+    def invalidate(self, case_id, location):
+        try:
+            with self._locked():
+                entries = self._load()
+                if entries.pop(self._key(case_id, location), None) is not None:
+                    self._save(entries)
+        except Exception as e:
+            logging.warning(f'Could not write date cache {self.path}: {e}')
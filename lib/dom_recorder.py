@@ -0,0 +1,92 @@
+"""
+Recorder of DOM snapshots for offline replay (bench_replay.py).
+
+With DOM_RECORD_DIR set, the checker saves the page at every stage of the
+flow (case page, location, queue, each calendar month read, time slots,
+captcha) as gzipped HTML, next to a JSON file with what the live run made
+of it: the calendar header and cells, the chosen date, the slot count, the
+captcha reason. Every Checker writes into its own run directory; only the
+newest DOM_RECORD_KEEP runs are kept.
+"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+
+from lib.calendar_snapshot import CalendarSnapshot
+
+# Page source with doctype, as the browser has it now (page_source may be the original response)
+PAGE_JS = '''
+return {
+    html: '<!DOCTYPE html>\\n' + document.documentElement.outerHTML,
+    url: location.href,
+};
+'''
+
+
+def snapshot_state(snapshot: CalendarSnapshot) -> dict:
+    """JSON form of a calendar snapshot (without element handles)."""
+    last = snapshot.last_candidate()
+    return {
+        'month_year': snapshot.month_year,
+        'cells': [
+            {'index': c.index, 'day': c.day, 'disabled': c.disabled, 'weekend': c.weekend, 'holiday': c.holiday}
+            for c in snapshot.cells
+        ],
+        'last_candidate': last.day if last is not None else None,
+    }
+
+
+@dataclass
+class DomRecorder:
+    root: str
+    keep_runs: int = 20
+    run_dir: str | None = field(default=None, init=False)
+    sequence: int = field(default=0, init=False)
+
+    @classmethod
+    def from_env(cls):
+        root = os.environ.get('DOM_RECORD_DIR')
+        if not root:
+            return None
+        return cls(root, keep_runs=int(os.environ.get('DOM_RECORD_KEEP', '20')))
+
+    def _start_run(self):
+        os.makedirs(self.root, exist_ok=True)
+        self.run_dir = os.path.join(self.root, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}')
+        os.makedirs(self.run_dir, exist_ok=True)
+        runs = sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+        for name in runs[:-self.keep_runs]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        logging.info(f'Recording DOM snapshots to {self.run_dir}')
+
+    def record(self, browser, stage: str, location: str | None = None, queue: str | None = None,
+               snapshot: CalendarSnapshot | None = None, **state):
+        """Save the current page as `<n>-<stage>.html.gz` plus `<n>-<stage>.json`. Never raises."""
+        try:
+            if self.run_dir is None:
+                self._start_run()
+            self.sequence += 1
+            started = time.perf_counter()
+            page = browser.execute_script(PAGE_JS)
+            name = f'{self.sequence:04d}-{stage}'
+            with gzip.open(os.path.join(self.run_dir, f'{name}.html.gz'), 'wt', encoding='utf-8') as f:
+                f.write(page['html'])
+            meta = {
+                'stage': stage,
+                'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'url': page['url'],
+                'location': location,
+                'queue': queue,
+                'calendar': snapshot_state(snapshot) if snapshot is not None else None,
+                **state,
+            }
+            with open(os.path.join(self.run_dir, f'{name}.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=1)
+            logging.debug(f'DOM snapshot {name} saved in {time.perf_counter() - started:.3f}s')
+        except Exception as e:
+            logging.warning(f'Could not record DOM snapshot ({stage}): {e}')
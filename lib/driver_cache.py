@@ -0,0 +1,95 @@
+"""
+On-disk cache of the patched chromedriver, keyed by Chrome's major version.
+
+Without it undetected-chromedriver resolves the Chrome version, downloads
+chromedriver and patches it again on every browser start. The cache keeps
+one patched binary per Chrome major version under DRIVER_CACHE_DIR (put it
+on a Docker volume to survive container restarts); a Chrome update simply
+lands in a new version directory and old ones are pruned.
+"""
+
+import fcntl
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+
+CHROME_CANDIDATES = (
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+)
+
+
+def chrome_major_version(binary: str | None = None) -> int | None:
+    """Major version of the Chrome that will be started (CHROME_BINARY or the first one found)."""
+    for candidate in ([binary] if binary else CHROME_CANDIDATES):
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path is None:
+            continue
+        try:
+            output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=15).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logging.debug(f'Could not get version of {path}: {e}')
+            continue
+        match = re.search(r'(\d+)\.\d+\.\d+', output)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+@dataclass
+class DriverCache:
+    root: str
+    keep_versions: int = 2
+
+    @classmethod
+    def from_env(cls):
+        if os.environ.get('DRIVER_CACHE', 'true').lower() != 'true':
+            return None
+        default = os.path.join(os.path.expanduser('~'), '.cache', 'inpol-checker', 'chromedriver')
+        return cls(os.environ.get('DRIVER_CACHE_DIR', default))
+
+    def path_for(self, major: int) -> str:
+        return os.path.join(self.root, str(major), 'chromedriver')
+
+    def get(self, major: int) -> str | None:
+        path = self.path_for(major)
+        return path if os.access(path, os.X_OK) else None
+
+    def resolve(self, major: int, uc) -> str:
+        """Cached patched driver for `major`, patched with undetected-chromedriver `uc` on first use."""
+        path = self.get(major)
+        if path is not None:
+            return path
+        directory = os.path.dirname(self.path_for(major))
+        os.makedirs(directory, exist_ok=True)
+        # Several processes (run_accounts.py) may start at once: one patches, the others wait for it
+        with open(os.path.join(self.root, f'{major}.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            path = self.get(major)
+            if path is not None:
+                return path
+            logging.info(f'Patching chromedriver for Chrome {major} into {directory}')
+            patcher = uc.Patcher(version_main=major)
+            patcher.auto()
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.chromedriver-')
+            os.close(fd)
+            shutil.copy2(patcher.executable_path, tmp_path)
+            os.chmod(tmp_path, 0o755)
+            os.replace(tmp_path, self.path_for(major))
+        self.prune()
+        return self.path_for(major)
+
+    def prune(self):
+        """Keep only the newest `keep_versions` driver versions."""
+        versions = sorted((int(name) for name in os.listdir(self.root) if name.isdigit()), reverse=True)
+        for major in versions[self.keep_versions:]:
+            logging.info(f'Removing cached chromedriver for Chrome {major}')
+            shutil.rmtree(os.path.join(self.root, str(major)), ignore_errors=True)
+            try:
+                os.unlink(os.path.join(self.root, f'{major}.lock'))
+            except FileNotFoundError:
+                pass
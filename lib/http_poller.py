@@ -0,0 +1,171 @@
+"""
+Fast path: poll the reservation endpoints over plain HTTP.
+
+After a browser cycle with network capture (lib.network_capture) the poller
+knows which dates/slots urls the page used for every location/queue. It takes
+over the browser's cookies, auth token and User-Agent into a keep-alive
+requests.Session and, on the next cycles, asks those urls directly: the dates
+of each queue, then the slots of its furthest working-day date, the same date
+the browser flow would click.
+
+Requests are spaced by at least HTTP_POLL_INTERVAL. Any auth failure,
+redirect or unexpected response raises PollerError and drops the learned
+state, so the caller falls back to the browser flow, which primes the poller
+again afterwards.
+"""
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from pytimeparse.timeparse import timeparse
+
+from lib import working_days
+from lib.network_capture import Availability, parse_dates, parse_slots
+from lib.session_store import READ_LOCAL_STORAGE_JS
+
+if TYPE_CHECKING:
+    import requests
+
+DATE_IN_URL = re.compile(r'\d{4}-\d{2}-\d{2}')
+MONTH_NAMES = {number: name for name, number in working_days.MONTHS_PL.items()}
+
+
+class PollerError(Exception):
+    """The fast path can't be trusted any more; use the browser flow. `results`: pairs polled before the error."""
+
+    def __init__(self, message: str, results: list | None = None):
+        super().__init__(message)
+        self.results = results or []
+
+
+@dataclass
+class Endpoint:
+    location: str
+    queue: str
+    dates_url: str
+    slots_url: str
+
+
+class HttpPoller:
+    def __init__(self, min_interval: float = 2.0, token_key: str = 'token', timeout: float = 15):
+        self.min_interval = min_interval
+        self.token_key = token_key
+        self.timeout = timeout
+        self.session: requests.Session | None = None
+        self.endpoints: list[Endpoint] = []
+        self._last_request = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """HttpPoller if HTTP_POLL=true (needs NETWORK_CAPTURE=true to learn the urls), else None."""
+        if os.environ.get('HTTP_POLL', 'false').lower() != 'true':
+            return None
+        if os.environ.get('NETWORK_CAPTURE', 'false').lower() != 'true':
+            logging.warning('HTTP_POLL needs NETWORK_CAPTURE=true to learn the endpoints - fast path disabled')
+            return None
+        if len([case_id for case_id in os.environ.get('CASE_ID', '').split(',') if case_id.strip()]) > 1:
+            # The learned urls belong to one case page
+            logging.warning('HTTP_POLL covers a single case, CASE_ID lists several - fast path disabled')
+            return None
+        return cls(
+            min_interval=timeparse(os.environ.get('HTTP_POLL_INTERVAL', '2s')),
+            token_key=os.environ.get('HTTP_POLL_TOKEN_KEY', 'token'),
+        )
+
+    def ready(self) -> bool:
+        return self.session is not None and len(self.endpoints) > 0
+
+    def prime(self, driver, availabilities: list[Availability]):
+        """Take cookies/token/User-Agent from a logged-in browser and the urls it used."""
+        endpoints = [Endpoint(a.location, a.queue, a.dates_url, a.slots_url)
+                     for a in availabilities if a.dates_url and a.slots_url]
+        if not endpoints:
+            logging.info('Fast path not primed: no dates/slots urls were captured')
+            self.reset()
+            return
+
+        # requests is only imported once the fast path is actually used
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        session.headers['User-Agent'] = driver.execute_script('return navigator.userAgent;')
+        session.headers['Accept'] = 'application/json, text/plain, */*'
+        for cookie in driver.get_cookies():
+            session.cookies.set(cookie['name'], cookie['value'],
+                                domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        token = (driver.execute_script(READ_LOCAL_STORAGE_JS) or {}).get(self.token_key)
+        if token:
+            # Angular apps often keep the token JSON-encoded, i.e. with quotes
+            session.headers['Authorization'] = 'Bearer ' + token.strip('"')
+
+        if self.session is not None:
+            self.session.close()
+        self.session = session
+        self.endpoints = endpoints
+        logging.info(f'Fast path primed for {len(endpoints)} location/queue pair(s)')
+
+    def reset(self):
+        if self.session is not None:
+            self.session.close()
+        self.session = None
+        self.endpoints = []
+
+    def _get_json(self, url: str):
+        import requests
+
+        wait = self.min_interval - (time.monotonic() - self._last_request)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=self.timeout, allow_redirects=False)
+        except requests.RequestException as e:
+            raise PollerError(f'request to {url} failed: {e}')
+        if response.status_code in (401, 403) or 300 <= response.status_code < 400:
+            raise PollerError(f'{url} answered {response.status_code} - session no longer valid')
+        if response.status_code != 200:
+            raise PollerError(f'{url} answered {response.status_code}')
+        try:
+            return response.json()
+        except ValueError:
+            raise PollerError(f'{url} did not return JSON')
+
+    def poll(self) -> list[tuple[Endpoint, str, int]]:
+        """
+        One fast check of every learned location/queue.
+        Returns (endpoint, 'DD MON YYYY' text of the checked date, slot count) per pair. On an error the
+        PollerError carries the pairs polled before it, so slots found there are not lost.
+        """
+        if not self.ready():
+            raise PollerError('not primed')
+        index = working_days.get_working_day_index()
+        results = []
+        try:
+            for endpoint in self.endpoints:
+                dates = parse_dates(self._get_json(endpoint.dates_url))
+                bookable = [d for d in dates if index.is_bookable(d.year, d.month, d.day)]
+                if not bookable:
+                    logging.info(f'[fast] {endpoint.location} - {endpoint.queue}: no dates')
+                    continue
+                target = max(bookable)
+                slots_url = DATE_IN_URL.sub(target.isoformat(), endpoint.slots_url, count=1)
+                slots = parse_slots(self._get_json(slots_url)).get(target, [])
+                checked = f'{target.day} {MONTH_NAMES[target.month]} {target.year}'
+                logging.info(f'[fast] {endpoint.location} - {endpoint.queue}: {len(dates)} dates, '
+                             f'furthest {checked} has {len(slots)} slot(s)')
+                results.append((endpoint, checked, len(slots)))
+        except ValueError as e:
+            self.reset()
+            raise PollerError(f'unexpected response shape: {e}', results)
+        except PollerError as e:
+            self.reset()
+            e.results = results
+            raise
+        return results
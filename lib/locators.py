@@ -0,0 +1,188 @@
+"""
+Single registry of every page locator used by the checker.
+
+Each locator keeps the original XPath and, where the same element can be
+expressed without text matching, a CSS equivalent. CSS is what the browser
+resolves fastest (querySelectorAll vs. document.evaluate), so it is used by
+default; the XPath stays as fallback for locators without a CSS form, for
+invalid CSS and for debugging (LOCATOR_MODE=xpath).
+
+Named `locators` rather than `selectors` so the module can never shadow the
+standard library `selectors` module when a file in lib/ is run directly.
+"""
+
+import os
+from dataclasses import dataclass
+
+from selenium.common.exceptions import InvalidSelectorException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+@dataclass(frozen=True)
+class Locator:
+    name: str
+    xpath: str
+    css: str | None = None
+
+    @property
+    def by(self) -> tuple[str, str]:
+        """(By, value) pair for find_element(s) and expected_conditions."""
+        if self.css and os.environ.get('LOCATOR_MODE', 'css').lower() != 'xpath':
+            return By.CSS_SELECTOR, self.css
+        return By.XPATH, self.xpath
+
+    @property
+    def xpath_by(self) -> tuple[str, str]:
+        return By.XPATH, self.xpath
+
+
+def find_elements(driver: WebDriver, locator: Locator):
+    try:
+        return driver.find_elements(*locator.by)
+    except InvalidSelectorException:
+        return driver.find_elements(*locator.xpath_by)
+
+
+def find_element(driver: WebDriver, locator: Locator):
+    try:
+        return driver.find_element(*locator.by)
+    except InvalidSelectorException:
+        return driver.find_element(*locator.xpath_by)
+
+
+# --- Login page ---
+
+LOGIN_SUBMIT = Locator(
+    'login_submit',
+    xpath='//button[contains(@class, "btn--submit")]',
+    css='button[class*="btn--submit"]',
+)
+COOKIE_DISMISS = Locator(
+    'cookie_dismiss',
+    xpath='//a[contains(@aria-label,"cookie") and contains(@aria-label,"dismiss")]',
+    css='a[aria-label*="cookie"][aria-label*="dismiss"]',
+)
+EMAIL_INPUT = Locator(
+    'email_input',
+    xpath='//input[@formcontrolname="email"]',
+    css='input[formcontrolname="email"]',
+)
+PASSWORD_INPUT = Locator(
+    'password_input',
+    xpath='//input[@formcontrolname="password"]',
+    css='input[formcontrolname="password"]',
+)
+LOGIN_ERROR = Locator(
+    'login_error',
+    xpath='//mat-error[contains(text(),"Incorrect email")]',
+)
+CASES_LINK = Locator(
+    'cases_link',
+    xpath='//a[@routerlink="/home/cases-choose" and @class="btn"]',
+    css='a[routerlink="/home/cases-choose"][class="btn"]',
+)
+
+# --- Case page: appointment panel and dropdowns ---
+
+APPOINTMENT_SECTION = Locator(
+    'appointment_section',
+    xpath='//div[contains(@class,"accordion")]//mat-select[@name="location"]',
+    css='div[class*="accordion"] mat-select[name="location"]',
+)
+# Multi-language: h3 heading with any language variant, then the accordion button after it
+APPOINTMENT_BUTTON = Locator(
+    'appointment_button',
+    xpath='//h3[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "appointment") or contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "wizyt") or contains(translate(text(), "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"), "зустріч") or contains(translate(text(), "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"), "встречу")]/following::button[contains(@class, "btn--accordion")][1]',
+)
+LOCATION_DROPDOWN = Locator(
+    'location_dropdown',
+    xpath='//mat-select[@name="location"]',
+    css='mat-select[name="location"]',
+)
+QUEUE_DROPDOWN = Locator(
+    'queue_dropdown',
+    xpath='//mat-select[@name="queueName"]',
+    css='mat-select[name="queueName"]',
+)
+OPTION_TEXT = Locator(
+    'option_text',
+    xpath='//mat-option/span[@class="mat-option-text"]',
+    css='mat-option > span[class="mat-option-text"]',
+)
+
+
+def option_with_text(text: str) -> Locator:
+    """mat-option containing `text` (location or queue name) - XPath only."""
+    return Locator(
+        'option_with_text',
+        xpath=f'//mat-option/span[@class="mat-option-text" and contains(text(),"{text}")]',
+    )
+
+
+SPINNER = Locator(
+    'spinner',
+    xpath='//mat-spinner[@role="progressbar"]',
+    css='mat-spinner[role="progressbar"]',
+)
+BUTTONS = Locator('buttons', xpath='//button', css='button')
+
+# --- Reservation calendar ---
+
+CALENDAR = Locator(
+    'calendar',
+    xpath='//mat-calendar[contains(@class,"reservation-calander")]',
+    css='mat-calendar[class*="reservation-calander"]',
+)
+CALENDAR_CELLS = Locator(
+    'calendar_cells',
+    xpath='//mat-calendar[contains(@class,"reservation-calander")]/div/mat-month-view/table/tbody/tr/td[@role="gridcell"]',
+    css='mat-calendar[class*="reservation-calander"] > div > mat-month-view > table > tbody > tr > td[role="gridcell"]',
+)
+ENABLED_CELLS = Locator(
+    'enabled_cells',
+    xpath='//mat-calendar[contains(@class,"reservation-calander")]/div/mat-month-view/table/tbody/tr/td[@role="gridcell" and not(contains(@class,"disabled"))]//div[contains(@class,"mat-calendar-body-cell-content")]',
+    css='mat-calendar[class*="reservation-calander"] > div > mat-month-view > table > tbody > tr > td[role="gridcell"]:not([class*="disabled"]) div[class*="mat-calendar-body-cell-content"]',
+)
+CELL_CONTENT = Locator(
+    'cell_content',
+    xpath='.//div[contains(@class,"mat-calendar-body-cell-content")]',
+    css='div[class*="mat-calendar-body-cell-content"]',
+)
+MONTH_YEAR = Locator(
+    'month_year',
+    xpath='//button[contains(@class,"mat-calendar-period-button")]/span',
+    css='button[class*="mat-calendar-period-button"] > span',
+)
+NEXT_MONTH = Locator(
+    'next_month',
+    xpath='//button[contains(@class,"mat-calendar-next-button")]',
+    css='button[class*="mat-calendar-next-button"]',
+)
+PREV_MONTH = Locator(
+    'prev_month',
+    xpath='//button[contains(@class,"mat-calendar-previous-button")]',
+    css='button[class*="mat-calendar-previous-button"]',
+)
+
+# --- Time slots ---
+
+RESERVATION_HOURS = Locator(
+    'reservation_hours',
+    xpath='//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]',
+    css='div[class="reservation__hours"] div[class="tiles tiles--hours"] div[class="row"]',
+)
+TIME_SLOTS = Locator(
+    'time_slots',
+    xpath='//div[@class="reservation__hours"]//div[@class="tiles tiles--hours"]//div[@class="row"]//*[contains(@class,"tile")]',
+    css='div[class="reservation__hours"] div[class="tiles tiles--hours"] div[class="row"] [class*="tile"]',
+)
+
+
+ALL = [
+    LOGIN_SUBMIT, COOKIE_DISMISS, EMAIL_INPUT, PASSWORD_INPUT, LOGIN_ERROR, CASES_LINK,
+    APPOINTMENT_SECTION, APPOINTMENT_BUTTON, LOCATION_DROPDOWN, QUEUE_DROPDOWN, OPTION_TEXT,
+    SPINNER, BUTTONS,
+    CALENDAR, CALENDAR_CELLS, ENABLED_CELLS, CELL_CONTENT, MONTH_YEAR, NEXT_MONTH, PREV_MONTH,
+    RESERVATION_HOURS, TIME_SLOTS,
+]
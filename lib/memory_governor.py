@@ -0,0 +1,150 @@
+"""
+Memory governor for the browser.
+
+Chrome's renderer grows over a long session (SESSION_REUSE) and on a small
+VPS that ends with the OOM killer in the middle of a check. The governor
+finds the driver's process tree in /proc (chromedriver, Chrome and all its
+helpers), measures it and acts only at safe points:
+
+- between locations, above the soft limit: drop caches via CDP (memory
+  pressure signal, garbage collection, HTTP cache);
+- between locations, above the hard limit: additionally reset the tab to
+  about:blank, the caller reopens the case page;
+- between loops, above the hard limit: the browser is recycled.
+
+Memory is PSS where the kernel provides it (shared pages of the Chrome
+processes are not counted several times), RSS otherwise.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _children_map() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # "pid (comm) state ppid ..." - comm may contain spaces and parentheses
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree(roots: list[int]) -> set[int]:
+    """`roots` and all their descendants that are still alive."""
+    children = _children_map()
+    found = set()
+    stack = [pid for pid in roots if os.path.exists(f'/proc/{pid}')]
+    while stack:
+        pid = stack.pop()
+        if pid in found:
+            continue
+        found.add(pid)
+        stack.extend(children.get(pid, []))
+    return found
+
+
+def process_memory_kb(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def browser_root_pids(driver) -> list[int]:
+    """chromedriver and (for undetected-chromedriver) the browser process it started itself."""
+    pids = []
+    browser_pid = getattr(driver, 'browser_pid', None)
+    if browser_pid:
+        pids.append(browser_pid)
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is not None and getattr(process, 'pid', None):
+        pids.append(process.pid)
+    return pids
+
+
+@dataclass
+class MemoryGovernor:
+    soft_limit_mb: int = 0  # 0 - no action, only measuring
+    hard_limit_mb: int = 0
+
+    @classmethod
+    def from_env(cls):
+        """None where there is no /proc to measure (e.g. macOS)."""
+        if not os.path.isdir('/proc/self'):
+            return None
+        return cls(
+            soft_limit_mb=int(os.environ.get('MEMORY_SOFT_LIMIT', '0')),
+            hard_limit_mb=int(os.environ.get('MEMORY_HARD_LIMIT', '0')),
+        )
+
+    def measure(self, driver) -> int:
+        """Memory of the driver's whole process tree in MB."""
+        pids = process_tree(browser_root_pids(driver))
+        mb = sum(process_memory_kb(pid) for pid in pids) // 1024
+        logging.debug(f'Browser memory: {mb} MB in {len(pids)} processes')
+        return mb
+
+    def over_soft(self, mb: int) -> bool:
+        return 0 < self.soft_limit_mb <= mb
+
+    def over_hard(self, mb: int) -> bool:
+        return 0 < self.hard_limit_mb <= mb
+
+    def release_caches(self, driver):
+        for command, params in (
+            ('Memory.simulatePressureNotification', {'level': 'critical'}),
+            ('HeapProfiler.collectGarbage', {}),
+            ('Network.clearBrowserCache', {}),
+        ):
+            try:
+                driver.execute_cdp_cmd(command, params)
+            except Exception as e:
+                logging.debug(f'{command} failed: {e}')
+
+    def between_locations(self, driver) -> bool:
+        """
+        Safe point between two locations. Returns True if the page was reset
+        to about:blank and the case page has to be opened again.
+        """
+        mb = self.measure(driver)
+        if not self.over_soft(mb) and not self.over_hard(mb):
+            return False
+        logging.info(f'Browser uses {mb} MB, releasing caches')
+        self.release_caches(driver)
+        if not self.over_hard(mb):
+            return False
+        try:
+            driver.get('about:blank')
+        except Exception as e:
+            logging.warning(f'Could not reset page: {e}')
+        self.release_caches(driver)
+        logging.info(f'Browser memory after reset: {self.measure(driver)} MB')
+        return True
+
+    def after_cycle(self, driver) -> tuple[int, bool]:
+        """Safe point after a loop. Returns (MB, whether the browser should be recycled)."""
+        mb = self.measure(driver)
+        if self.over_hard(mb):
+            logging.warning(f'Browser uses {mb} MB (limit {self.hard_limit_mb} MB), recycling it')
+            return mb, True
+        if self.over_soft(mb):
+            logging.info(f'Browser uses {mb} MB, releasing caches')
+            self.release_caches(driver)
+        return mb, False
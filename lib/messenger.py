@@ -1,27 +1,164 @@
+import logging
 import os
-from urllib.parse import quote_plus
-
-import requests
+import queue
+import random
+import threading
+import time
 
 
 class Messenger:
     def send_message(self, body: str):
         raise NotImplementedError
 
+    def flush(self, timeout: float = 10) -> bool:
+        """Wait until queued messages are delivered. Returns False if some are still pending."""
+        return True
+
 
 class ConsoleMessenger(Messenger):
     def send_message(self, body: str):
         print(body)
 
 
+class PrefixedMessenger(Messenger):
+    """Puts a prefix (e.g. the case id) in front of every message of another messenger."""
+
+    def __init__(self, messenger: Messenger, prefix: str):
+        self.messenger = messenger
+        self.prefix = prefix
+
+    def send_message(self, body: str):
+        self.messenger.send_message(f'{self.prefix}{body}')
+
+    def flush(self, timeout: float = 10) -> bool:
+        return self.messenger.flush(timeout)
+
+
 class TelegramMessenger(Messenger):
+    """
+    Sends messages from a background thread, so the checker never waits on the Telegram API.
+
+    Messages go into a bounded queue and are posted over one keep-alive session.
+    429 and 5xx responses (and connection errors) are retried with backoff.
+    Call flush() before exiting so queued messages are not lost.
+    """
+
+    def __init__(self, token: str | None = None, chat_id: str | None = None, api_url: str | None = None,
+                 queue_size: int = 100, max_retries: int = 5, timeout: float = 10):
+        self.token = token or os.environ['TELEGRAM_TOKEN']
+        self.chat_id = chat_id or os.environ['TELEGRAM_CHAT_ID']
+        self.api_url = (api_url or os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')).rstrip('/')
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        # Imported here, so scripts that only print to the console do not load requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._worker, name='telegram-sender', daemon=True)
+        self._thread.start()
+
     def send_message(self, body: str):
-        token = os.environ['TELEGRAM_TOKEN']
-        chat_id = os.environ['TELEGRAM_CHAT_ID']
-        url = 'https://api.telegram.org/bot%s/sendMessage?chat_id=%s&text=%s' % (token, chat_id, quote_plus(f'{body}'))
-        _ = requests.get(url, timeout=10)
+        message = f'{body}'
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            # Keep the newest message (it may be a found slot), drop the oldest one
+            try:
+                dropped = self._queue.get_nowait()
+                self._queue.task_done()
+                logging.warning(f'Telegram queue is full, dropped message: {dropped[:80]}')
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(message)
+
+    def flush(self, timeout: float = 10) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logging.warning(f'{self._queue.unfinished_tasks} Telegram message(s) not delivered')
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _worker(self):
+        while True:
+            message = self._queue.get()
+            try:
+                self._deliver(message)
+            except Exception as e:
+                logging.error(f'Telegram delivery failed: {e}')
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, message: str):
+        import requests
+
+        url = f'{self.api_url}/bot{self.token}/sendMessage'
+        for attempt in range(self.max_retries + 1):
+            delay = min(30.0, 2 ** attempt) + random.random()
+            try:
+                response = self.session.post(url, data={'chat_id': self.chat_id, 'text': message},
+                                             timeout=self.timeout)
+            except requests.RequestException as e:
+                logging.warning(f'Telegram request error (attempt {attempt + 1}): {e}')
+            else:
+                if response.status_code < 400:
+                    return
+                if response.status_code == 429:
+                    try:
+                        delay = float(response.json()['parameters']['retry_after'])
+                    except Exception:
+                        pass
+                elif response.status_code < 500:
+                    logging.error(f'Telegram rejected message: {response.status_code} {response.text[:200]}')
+                    return
+                logging.warning(f'Telegram responded {response.status_code} (attempt {attempt + 1}), '
+                                f'retrying in {delay:.1f}s')
+            if attempt < self.max_retries:
+                time.sleep(delay)
+        logging.error(f'Giving up on Telegram message after {self.max_retries + 1} attempts')
+
+
+def _run_stub_server():
+    """Local Telegram API stand-in: answers 429, then 500, then 200, and prints what it received."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs
+
+    responses = iter([(429, b'{"ok":false,"parameters":{"retry_after":1}}'), (500, b'{"ok":false}')])
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+            status, payload = next(responses, (200, b'{"ok":true}'))
+            print(f'stub <- {self.path} {parse_qs(body)} -> {status}')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
 
 
 if __name__ == '__main__':
-    tm = TelegramMessenger()
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
+    if os.environ.get('TELEGRAM_STUB', 'false').lower() == 'true':
+        stub = _run_stub_server()
+        tm = TelegramMessenger(token='TEST', chat_id='1', api_url=f'http://127.0.0.1:{stub.server_port}')
+    else:
+        tm = TelegramMessenger()
     tm.send_message("TEsT bOdY")
+    tm.flush(timeout=30)
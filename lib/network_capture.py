@@ -0,0 +1,213 @@
+"""
+Availability read from the front end's own XHR responses.
+
+With NETWORK_CAPTURE=true the browser is started with Chrome performance
+logging (see BrowserFactory). The Network.responseReceived events for the
+reservation endpoints (NETWORK_CAPTURE_PATTERN) are picked out of that log
+and their bodies fetched with Network.getResponseBody, then parsed into an
+Availability per location/queue: every offered date, and the time slots of
+every date whose slots the page has loaded.
+
+Anything unexpected (no events, body evicted, unknown JSON shape) just
+leaves the Availability empty; the Checker then uses the DOM as before.
+
+The performance log covers every tab. Each entry names its tab ("webview"),
+so with several tabs open (PIPELINE_TABS) `target` is set to the window
+handle being checked and only that tab's responses are read; entries of
+the other tabs are kept until their turn. The urls don't reliably name the
+location/queue, so the Checker calls skip() before it switches the page to
+another one: requests sent until then are ignored, even if their response
+only arrives later.
+"""
+
+import base64
+import datetime
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Matches .../dates and .../<date>/slots style endpoints (query string allowed)
+DEFAULT_PATTERN = r'/(dates|slots)(\?|$)'
+
+
+@dataclass
+class Availability:
+    location: str
+    queue: str
+    dates: list[datetime.date] = field(default_factory=list)
+    slots: dict[datetime.date, list[str]] = field(default_factory=dict)
+    # Last urls the page used for this location/queue, replayed by lib.http_poller
+    dates_url: str | None = None
+    slots_url: str | None = None
+
+    def furthest_date(self, accept=lambda day: True) -> datetime.date | None:
+        accepted = [day for day in self.dates if accept(day)]
+        return max(accepted) if accepted else None
+
+    def summary(self) -> str:
+        if not self.dates:
+            return f'{self.location} - {self.queue}: no dates captured'
+        with_slots = {day: times for day, times in self.slots.items() if times}
+        return (f'{self.location} - {self.queue}: {len(self.dates)} dates '
+                f'{min(self.dates).isoformat()}..{max(self.dates).isoformat()}, '
+                f'slots on {len(with_slots)} of {len(self.slots)} loaded date(s)')
+
+
+def _parse_date(value) -> datetime.date:
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def parse_dates(payload) -> list[datetime.date]:
+    """Dates endpoint: a list of ISO dates/datetimes."""
+    if not isinstance(payload, list):
+        raise ValueError(f'unexpected dates payload: {type(payload).__name__}')
+    return sorted({_parse_date(item) for item in payload})
+
+
+def parse_slots(payload) -> dict[datetime.date, list[str]]:
+    """Slots endpoint: a list of {"date": "YYYY-MM-DDTHH:MM:SS", ...}; returns HH:MM per date."""
+    if not isinstance(payload, list):
+        raise ValueError(f'unexpected slots payload: {type(payload).__name__}')
+    slots = {}
+    for item in payload:
+        if not isinstance(item, dict) or 'date' not in item:
+            raise ValueError(f'unexpected slot item: {item!r}')
+        value = str(item['date'])
+        slots.setdefault(_parse_date(value), []).append(value[11:16])
+    return slots
+
+
+class NetworkCapture:
+    def __init__(self, driver: WebDriver, pattern: str = DEFAULT_PATTERN):
+        self.driver = driver
+        self.pattern = re.compile(pattern)
+        self.availability: dict[tuple[str, str], Availability] = {}
+        self.target: str | None = None  # window handle whose responses are read, None: all tabs
+        self._backlog: dict[str | None, list[dict]] = {}  # tab -> log messages not read yet
+        self._pending: dict[tuple[str | None, str], str] = {}  # (tab, requestId) -> url, waiting for loadingFinished
+        self._stale: set[tuple[str | None, str]] = set()  # (tab, requestId) sent before the last skip()
+
+    @classmethod
+    def from_env(cls, driver: WebDriver):
+        """NetworkCapture if NETWORK_CAPTURE=true and the driver has a performance log, else None."""
+        if os.environ.get('NETWORK_CAPTURE', 'false').lower() != 'true':
+            return None
+        try:
+            capture = cls(driver, os.environ.get('NETWORK_CAPTURE_PATTERN', DEFAULT_PATTERN))
+            capture.enable()
+            driver.get_log('performance')  # also drops what was logged before this Checker
+        except Exception as e:
+            logging.warning(f'Network capture unavailable, using the DOM only: {e}')
+            return None
+        return capture
+
+    def enable(self):
+        """Enable the Network domain in the current tab (again for every new tab)."""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+
+    @staticmethod
+    def _tab_id(handle: str | None) -> str | None:
+        # Window handles are the DevTools target id, older chromedrivers prefix it with "CDwindow-"
+        return handle.rsplit('-', 1)[-1].upper() if handle else None
+
+    def _drain(self):
+        """Move the performance log into per-tab backlogs."""
+        for entry in self.driver.get_log('performance'):
+            try:
+                logged = json.loads(entry['message'])
+                message = logged['message']
+            except (KeyError, ValueError):
+                continue
+            self._backlog.setdefault(self._tab_id(logged.get('webview')), []).append(message)
+
+    def _responses(self):
+        """(url, parsed JSON) of every matching response of the target tab(s) finished since the last call."""
+        self._drain()
+        target = self._tab_id(self.target)
+        if target is None:
+            backlogs, self._backlog = self._backlog, {}
+        else:
+            # Entries without a tab id can't be attributed, they go with the tab being read
+            backlogs = {tab: self._backlog.pop(tab, []) for tab in (target, None)}
+        finished = []
+        for tab, messages in backlogs.items():
+            for message in messages:
+                method = message.get('method')
+                params = message.get('params', {})
+                key = (tab, params.get('requestId'))
+                if key in self._stale:
+                    if method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                        self._stale.discard(key)
+                    continue
+                if method == 'Network.responseReceived':
+                    response = params.get('response', {})
+                    if response.get('status') == 200 and self.pattern.search(response.get('url', '')):
+                        self._pending[key] = response['url']
+                elif method == 'Network.loadingFinished' and key in self._pending:
+                    finished.append(key)
+
+        # Bodies are fetched in the current tab, which is the target one when a target is set
+        for key in finished:
+            request_id = key[1]
+            url = self._pending.pop(key)
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                text = body['body']
+                if body.get('base64Encoded'):
+                    text = base64.b64decode(text).decode('utf-8')
+                yield url, json.loads(text)
+            except Exception as e:
+                logging.debug(f'Could not read response body of {url}: {e}')
+
+    def skip(self):
+        """
+        Ignore the target tab's requests so far (all tabs without a target), including responses still
+        on their way: called before the page moves to another location/queue, whose Availability
+        must not get a late response of the previous one.
+        """
+        self._drain()
+        target = self._tab_id(self.target)
+        tabs = set(self._backlog) if target is None else {target, None}
+        for tab in tabs:
+            for message in self._backlog.pop(tab, []):
+                request_id = message.get('params', {}).get('requestId')
+                if request_id is not None:
+                    self._stale.add((tab, request_id))
+        for key in [key for key in self._pending if target is None or key[0] in tabs]:
+            del self._pending[key]
+            self._stale.add(key)
+
+    def discard(self):
+        """Drop everything logged so far without reading it (e.g. responses of closed tabs)."""
+        try:
+            self.driver.get_log('performance')
+        except Exception as e:
+            logging.debug(f'Could not clear performance log: {e}')
+        self._backlog.clear()
+        self._pending.clear()
+        self._stale.clear()
+
+    def collect(self, location: str, queue: str) -> Availability:
+        """Fold newly captured responses into the Availability of this location/queue."""
+        availability = self.availability.setdefault((location, queue), Availability(location, queue))
+        for url, payload in self._responses():
+            path = url.split('?', 1)[0]
+            try:
+                if path.endswith('/dates'):
+                    availability.dates = parse_dates(payload)
+                    availability.dates_url = url
+                elif path.endswith('/slots'):
+                    # An empty list still tells that the date (taken from the url) has no slots
+                    requested = re.search(r'\d{4}-\d{2}-\d{2}', url)
+                    if requested:
+                        availability.slots.setdefault(_parse_date(requested.group()), [])
+                    availability.slots.update(parse_slots(payload))
+                    if requested:
+                        availability.slots_url = url
+            except ValueError as e:
+                logging.warning(f'Ignoring captured response from {url}: {e}')
+        return availability
@@ -0,0 +1,96 @@
+"""
+SQLite store of check results.
+
+One row per checked location/queue: what the calendar offered (furthest
+date, number of enabled dates), how many slots were found, whether a captcha
+got in the way and how long each phase took. Rows are buffered by the Checker
+and written in one transaction at the end of the cycle; the database runs in
+WAL mode so readers (dashboards, the scheduler) never block the writer.
+"""
+
+import datetime
+import json
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    observed_at TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    location TEXT NOT NULL,
+    queue TEXT,
+    furthest_date TEXT,
+    enabled_dates INTEGER NOT NULL DEFAULT 0,
+    slot_count INTEGER NOT NULL DEFAULT 0,
+    captcha INTEGER NOT NULL DEFAULT 0,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS observations_observed_at ON observations (observed_at);
+CREATE INDEX IF NOT EXISTS observations_location_queue ON observations (location, queue, observed_at);
+'''
+
+
+@dataclass
+class Observation:
+    case_id: str
+    location: str
+    queue: str | None = None
+    furthest_date: str | None = None  # ISO date
+    enabled_dates: int = 0
+    slot_count: int = 0
+    captcha: bool = False
+    timings: dict = field(default_factory=dict)  # phase -> {count, total, max}
+    observed_at: str = field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'))
+
+
+class ObservationStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.pending: list[Observation] = []
+        self._connection = None
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get('OBSERVATION_DB')
+        return cls(path) if path else None
+
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def add(self, observation: Observation):
+        self.pending.append(observation)
+
+    def flush(self):
+        """Write all buffered observations in one transaction."""
+        if not self.pending:
+            return
+        rows = [
+            (o.observed_at, o.case_id, o.location, o.queue, o.furthest_date, o.enabled_dates,
+             o.slot_count, int(o.captcha), json.dumps(o.timings))
+            for o in self.pending
+        ]
+        try:
+            with self.connection():
+                self.connection().executemany(
+                    'INSERT INTO observations (observed_at, case_id, location, queue, furthest_date, '
+                    'enabled_dates, slot_count, captcha, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self.pending = []
+        except sqlite3.Error as e:
+            logging.warning(f'Could not write {len(rows)} observation(s) to {self.path}: {e}')
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,380 @@
+"""
+Several accounts on one host.
+
+Every account from the accounts file runs the usual loop
+(run_staged_multi_loop_wh.main) in its own process, with its own environment
+and its own Chrome profile directory. The supervisor limits how many check
+cycles run at the same time: a worker asks for a slot before each cycle and
+gives it back after it. Slots are owned by the supervisor, which grants them
+in shared memory, so the slots of a worker that dies are known exactly. The
+limit is derived from CPU cores and available RAM unless MAX_PARALLEL is
+set. A browser kept between cycles (SESSION_REUSE) or launched ahead of
+time (PREWARM_LEAD) holds no slot while it idles. Workers
+start staggered, are restarted with backoff when they crash, and the
+supervisor logs a status table of all accounts.
+
+Accounts file (ACCOUNTS_PATH, JSON): a list of objects with environment
+variables, e.g. [{"name": "anna", "EMAIL": "...", "PASSWORD": "...", "CASE_ID": "..."}].
+Variables not given for an account are taken from the orchestrator's environment.
+"""
+
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import time
+from dataclasses import dataclass, field
+
+from pytimeparse.timeparse import timeparse
+
+# Variables holding per-account files: a shared value gets the account name appended
+PER_ACCOUNT_PATHS = ('SESSION_STORE_PATH', 'TIMINGS_PATH', 'SLOT_HISTORY_PATH', 'DATE_CACHE_PATH')
+
+
+@dataclass
+class Account:
+    name: str
+    env: dict[str, str]
+
+    @classmethod
+    def load(cls, path: str) -> list['Account']:
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+        accounts = []
+        for number, entry in enumerate(entries):
+            env = {key: str(value) for key, value in entry.items() if key != 'name'}
+            name = entry.get('name') or env.get('EMAIL', '').split('@')[0] or f'account{number + 1}'
+            accounts.append(cls(name=name, env=env))
+        names = [a.name for a in accounts]
+        if len(set(names)) != len(names):
+            raise ValueError(f'Account names must be unique: {names}')
+        return accounts
+
+    def environment(self, base: dict[str, str]) -> dict[str, str]:
+        """Full environment of the worker: orchestrator env, account overrides, own profile and files."""
+        env = dict(base)
+        for key in PER_ACCOUNT_PATHS:
+            if key in env and key not in self.env:
+                root, ext = os.path.splitext(env[key])
+                env[key] = f'{root}-{self.name}{ext}'
+        env.update(self.env)
+        if 'PROFILE_PATH' not in self.env:
+            env['PROFILE_PATH'] = os.path.join(base.get('PROFILE_PATH', '/tmp/browser-profile'), self.name)
+        return env
+
+
+def available_memory_mb() -> int | None:
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def parallel_limit(accounts: int, browser_memory_mb: int = 700) -> int:
+    """How many checks (browsers in use) may run at once: MAX_PARALLEL, or bounded by cores and free RAM."""
+    if os.environ.get('MAX_PARALLEL'):
+        return max(1, min(accounts, int(os.environ['MAX_PARALLEL'])))
+    limit = os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None:
+        limit = min(limit, memory // browser_memory_mb)
+    return max(1, min(accounts, limit))
+
+
+def _report(events, name: str, kind: str, **data):
+    try:
+        events.put_nowait({'name': name, 'kind': kind, 'at': time.time(), **data})
+    except Exception:
+        pass
+
+
+class CycleSlots:
+    """
+    A worker's side of the parallel limit. The worker only raises its hand (`wanted`, the time it asked) and
+    waits until the supervisor sets its `held` flag; it clears both when done. Each step is a single write to
+    shared memory, so the supervisor always knows who holds a slot, whenever a worker dies.
+    """
+
+    def __init__(self, index: int, wanted, held, granted, wakeup):
+        self.index = index
+        self.wanted = wanted
+        self.held = held
+        self.granted = granted
+        self.wakeup = wakeup
+
+    def acquire(self):
+        waited = time.monotonic()
+        self.wanted[self.index] = waited
+        self.wakeup.set()
+        while not self.held[self.index]:
+            self.granted.wait(1)
+            self.granted.clear()
+        waited = time.monotonic() - waited
+        if waited > 1:
+            logging.info(f'Waited {waited:.0f}s for a free browser slot')
+
+    def release(self):
+        # `wanted` first: the supervisor must not grant again in between
+        self.wanted[self.index] = 0
+        self.held[self.index] = 0
+        self.wakeup.set()
+
+
+class CycleGate:
+    """Context manager around one check cycle in a worker: takes a parallel slot, reports the outcome."""
+
+    def __init__(self, name: str, slots: CycleSlots, events):
+        self.name = name
+        self.slots = slots
+        self.events = events
+        self._started = 0.0
+
+    def __enter__(self):
+        self.slots.acquire()
+        self._started = time.monotonic()
+        _report(self.events, self.name, 'busy')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.slots.release()
+        _report(self.events, self.name, 'cycle', duration=round(time.monotonic() - self._started, 1),
+                error=f'{exc_type.__name__}: {exc}' if exc_type else None)
+        return False
+
+
+def _exit(*_):
+    raise SystemExit(0)
+
+
+def _worker(account: Account, env: dict[str, str], delay: float, slots: CycleSlots, events):
+    # Runs in a fresh (spawned) process: the checker reads its configuration from os.environ
+    os.environ.clear()
+    os.environ.update(env)
+    logging.basicConfig(format=f'[%(levelname)s] [{account.name}] %(message)s',
+                        level=env.get('LOG_LEVEL', 'INFO').upper())
+    # SIGTERM from the supervisor: unwind normally so browsers are quit in finally blocks
+    signal.signal(signal.SIGTERM, _exit)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.makedirs(env['PROFILE_PATH'], exist_ok=True)
+    if delay > 0:
+        logging.info(f'Starting in {delay:.0f}s')
+        time.sleep(delay)
+
+    import run_staged_multi_loop_wh
+    run_staged_multi_loop_wh.main(gate=CycleGate(account.name, slots, events))
+
+
+@dataclass
+class WorkerState:
+    account: Account
+    process: multiprocessing.Process | None = None
+    restarts: int = 0
+    started_at: float = 0.0
+    restart_at: float | None = None
+    last_exit: int | None = None
+    cycles: int = 0
+    busy: bool = False  # in a check cycle (between 'busy' and 'cycle' events)
+    errors: int = 0
+    last_cycle: dict = field(default_factory=dict)
+
+
+class Orchestrator:
+    def __init__(self, accounts: list[Account], parallel: int, stagger: float = 30,
+                 restart_backoff: float = 30, max_backoff: float = 900, status_interval: float = 300,
+                 status_path: str | None = None):
+        self.accounts = accounts
+        self.parallel = parallel
+        self.stagger = stagger
+        self.restart_backoff = restart_backoff
+        self.max_backoff = max_backoff
+        self.status_interval = status_interval
+        self.status_path = status_path
+        self._context = multiprocessing.get_context('spawn')
+        self._events = self._context.Queue()
+        self._workers = [WorkerState(account) for account in accounts]
+        # Parallel slots, per worker: when it asked for one (0 = not waiting) and whether it holds one
+        self._wanted = self._context.Array('d', len(accounts), lock=False)
+        self._held = self._context.Array('b', len(accounts), lock=False)
+        self._granted = [self._context.Event() for _ in accounts]
+        self._wakeup = self._context.Event()
+        self._stopping = False
+
+    @classmethod
+    def from_env(cls):
+        accounts = Account.load(os.environ.get('ACCOUNTS_PATH', 'accounts.json'))
+        return cls(
+            accounts=accounts,
+            parallel=parallel_limit(len(accounts), int(os.environ.get('BROWSER_MEMORY_MB', '700'))),
+            stagger=timeparse(os.environ.get('STAGGER', '30s')),
+            restart_backoff=timeparse(os.environ.get('RESTART_BACKOFF', '30s')),
+            status_interval=timeparse(os.environ.get('STATUS_INTERVAL', '5m')),
+            status_path=os.environ.get('STATUS_PATH'),
+        )
+
+    def _start(self, worker: WorkerState, delay: float = 0):
+        index = self._workers.index(worker)
+        slots = CycleSlots(index, self._wanted, self._held, self._granted[index], self._wakeup)
+        worker.process = self._context.Process(
+            target=_worker,
+            args=(worker.account, worker.account.environment(dict(os.environ)), delay, slots, self._events),
+            name=f'checker-{worker.account.name}',
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logging.info(f'Started {worker.account.name} (pid {worker.process.pid})')
+
+    def _reap(self, worker: WorkerState):
+        """Schedule a restart of a worker whose process has exited."""
+        worker.last_exit = worker.process.exitcode
+        worker.process = None
+        self._drain_events()
+        worker.busy = False
+        index = self._workers.index(worker)
+        if self._held[index]:
+            # Died in a cycle (e.g. killed by the OOM killer): take its slot back
+            logging.info(f'Releasing the browser slot of {worker.account.name}')
+        self._wanted[index] = 0
+        self._held[index] = 0
+        self._granted[index].clear()
+        # A worker that ran for an hour is considered healthy again: start the backoff from scratch
+        if time.monotonic() - worker.started_at > 3600:
+            worker.restarts = 0
+        backoff = min(self.max_backoff, self.restart_backoff * 2 ** worker.restarts)
+        worker.restarts += 1
+        worker.restart_at = time.monotonic() + backoff + random.random() * self.stagger
+        logging.warning(f'{worker.account.name} exited with code {worker.last_exit}, '
+                        f'restarting in {backoff:.0f}s (restart #{worker.restarts})')
+
+    def _drain_events(self):
+        by_name = {w.account.name: w for w in self._workers}
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            worker = by_name.get(event['name'])
+            if worker is None:
+                continue
+            if event['kind'] == 'busy':
+                worker.busy = True
+                continue
+            worker.busy = False
+            worker.cycles += 1
+            if event['error']:
+                worker.errors += 1
+            worker.last_cycle = event
+
+    def _grant_slots(self):
+        """Give free slots to running workers waiting for one, longest waiting first."""
+        free = self.parallel - sum(self._held)
+        waiting = sorted(
+            (self._wanted[index], index) for index, w in enumerate(self._workers)
+            if self._wanted[index] and not self._held[index] and w.process is not None and w.process.is_alive()
+        )
+        for _, index in waiting[:max(0, free)]:
+            self._held[index] = 1
+            self._granted[index].set()
+
+    def status(self) -> list[dict]:
+        rows = []
+        now = time.monotonic()
+        for w in self._workers:
+            if w.process is not None and w.process.is_alive():
+                state = 'running'
+            elif w.restart_at is not None:
+                state = f'restart in {max(0.0, w.restart_at - now):.0f}s'
+            else:
+                state = 'stopped'
+            last = w.last_cycle
+            rows.append({
+                'account': w.account.name,
+                'state': state,
+                'pid': w.process.pid if w.process is not None else None,
+                'restarts': w.restarts,
+                'last_exit': w.last_exit,
+                'cycles': w.cycles,
+                'errors': w.errors,
+                'last_cycle_at': datetime.datetime.fromtimestamp(last['at']).strftime('%H:%M:%S') if last else None,
+                'last_cycle_s': last.get('duration'),
+                'last_error': last.get('error'),
+            })
+        return rows
+
+    def log_status(self):
+        rows = self.status()
+        logging.info(f'Status ({self.parallel} parallel check(s) max):')
+        for row in rows:
+            line = (f'  {row["account"]:<16} {row["state"]:<18} cycles {row["cycles"]:>4} errors {row["errors"]:>3} '
+                    f'restarts {row["restarts"]:>2}')
+            if row['last_cycle_at']:
+                line += f' last {row["last_cycle_at"]} ({row["last_cycle_s"]}s)'
+            if row['last_error']:
+                line += f' {row["last_error"][:80]}'
+            logging.info(line)
+        if self.status_path:
+            try:
+                with open(self.status_path, 'w', encoding='utf-8') as f:
+                    json.dump({'updated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                               'parallel': self.parallel, 'accounts': rows}, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                logging.warning(f'Could not write status to {self.status_path}: {e}')
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def run(self):
+        logging.info(f'{len(self.accounts)} account(s), up to {self.parallel} check(s) at once')
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for number, worker in enumerate(self._workers):
+            self._start(worker, delay=number * self.stagger)
+
+        next_status = time.monotonic() + self.status_interval
+        try:
+            while not self._stopping:
+                self._drain_events()
+                now = time.monotonic()
+                for worker in self._workers:
+                    if worker.process is not None and not worker.process.is_alive():
+                        self._reap(worker)
+                    elif worker.process is None and worker.restart_at is not None and now >= worker.restart_at:
+                        self._start(worker)
+                self._grant_slots()
+                if now >= next_status:
+                    self.log_status()
+                    next_status = now + self.status_interval
+                # Woken early when a worker asks for or gives back a slot
+                self._wakeup.wait(1)
+                self._wakeup.clear()
+        finally:
+            self.shutdown()
+
+    def shutdown(self, timeout: float = 30):
+        logging.info('Stopping workers')
+        running = [w.process for w in self._workers if w.process is not None]
+        for process in running:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logging.warning(f'{process.name} did not stop in {timeout:.0f}s, killing it')
+                process.kill()
+        self._drain_events()
+        for w in self._workers:
+            w.process = None
+            w.restart_at = None
+        self.log_status()
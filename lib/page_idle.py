@@ -0,0 +1,158 @@
+"""
+Event-driven "page is idle" wait for the Angular front end.
+
+A small tracker counts pending XHR/fetch requests and remembers the time of
+the last DOM mutation. install_tracker() registers it to run in every new
+document of a tab before the page's own scripts, so requests started right
+after a click are counted even when the wait begins later; the wait injects
+it itself into a page that has none. The wait itself is a
+single execute_async_script call that polls the tracker inside the browser and
+resolves as soon as there is no pending request, no visible mat-spinner and the
+DOM has been quiet for a short window.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from lib import locators
+
+
+TRACKER_JS = '''
+if (!window.__inpolIdle) {
+    const state = {pending: 0, lastActivity: Date.now()};
+    const settle = () => {
+        state.pending = Math.max(0, state.pending - 1);
+        state.lastActivity = Date.now();
+    };
+
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pending += 1;
+        let settled = false;
+        this.addEventListener('loadend', () => {
+            if (!settled) {
+                settled = true;
+                settle();
+            }
+        });
+        try {
+            return originalSend.apply(this, arguments);
+        } catch (e) {
+            if (!settled) {
+                settled = true;
+                settle();
+            }
+            throw e;
+        }
+    };
+
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function () {
+            state.pending += 1;
+            return originalFetch.apply(this, arguments).finally(settle);
+        };
+    }
+
+    new MutationObserver(() => {
+        state.lastActivity = Date.now();
+    }).observe(document, {childList: true, subtree: true, characterData: true});
+
+    window.__inpolIdle = state;
+}
+'''
+
+IDLE_WAIT_JS = '''
+const done = arguments[arguments.length - 1];
+const quietMs = arguments[0];
+const timeoutMs = arguments[1];
+const pollMs = arguments[2];
+const spinnerCss = arguments[3];
+''' + TRACKER_JS + '''
+const spinnerVisible = () => {
+    for (const spinner of document.querySelectorAll(spinnerCss)) {
+        if (spinner.getClientRects().length > 0 && getComputedStyle(spinner).visibility !== 'hidden') {
+            return true;
+        }
+    }
+    return false;
+};
+
+const started = Date.now();
+(function poll() {
+    const state = window.__inpolIdle;
+    const now = Date.now();
+    const spinner = spinnerVisible();
+    if (state.pending === 0 && !spinner && now - state.lastActivity >= quietMs) {
+        done({idle: true, elapsed: now - started, pending: 0, spinner: false});
+        return;
+    }
+    if (now - started >= timeoutMs) {
+        done({idle: false, elapsed: now - started, pending: state.pending, spinner: spinner});
+        return;
+    }
+    setTimeout(poll, pollMs);
+})();
+'''
+
+
+def install_tracker(driver: WebDriver):
+    """Run the tracker in every new document of the current tab (and in the current one)."""
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': TRACKER_JS})
+    driver.execute_script(TRACKER_JS)
+
+
+@dataclass
+class IdleWaitResult:
+    idle: bool
+    elapsed: float  # seconds, measured on the Python side (includes the round-trip)
+    pending: int = 0
+    spinner: bool = False
+
+
+@dataclass
+class PageIdleWaiter:
+    driver: WebDriver
+    quiet_ms: int = 150
+    poll_ms: int = 25
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1000))  # the most recent waits
+    _script_timeout: float | None = field(default=None, init=False, repr=False)
+
+    def wait(self, timeout: float) -> IdleWaitResult:
+        """Block until the page is idle or `timeout` seconds pass."""
+        if self._script_timeout is None or self._script_timeout < timeout + 5:
+            # execute_async_script is bounded by the driver's script timeout
+            self.driver.set_script_timeout(timeout + 5)
+            self._script_timeout = timeout + 5
+
+        started = time.monotonic()
+        raw = self.driver.execute_async_script(
+            IDLE_WAIT_JS, self.quiet_ms, int(timeout * 1000), self.poll_ms, locators.SPINNER.css)
+        elapsed = time.monotonic() - started
+
+        return IdleWaitResult(
+            idle=bool(raw.get('idle')),
+            elapsed=elapsed,
+            pending=int(raw.get('pending', 0)),
+            spinner=bool(raw.get('spinner')),
+        )
+
+    def is_idle(self) -> bool:
+        """One look at the tracker without waiting."""
+        return self.wait(0).idle
+
+    def record(self, elapsed: float):
+        """Remember the latency of one complete wait (idle wait or fallback)."""
+        self.latencies.append(elapsed)
+
+    def summary(self) -> str:
+        if not self.latencies:
+            return 'page idle waits: none'
+        ordered = sorted(self.latencies)
+        total = sum(ordered)
+        p50 = ordered[len(ordered) // 2]
+        return (f'page idle waits: {len(ordered)}, total {total:.1f}s, '
+                f'p50 {p50 * 1000:.0f} ms, max {ordered[-1] * 1000:.0f} ms')
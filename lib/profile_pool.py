@@ -0,0 +1,198 @@
+"""
+Pool of Chrome user-data-dirs.
+
+A new profile per browser start (mkdtemp) leaves a full Chrome profile on
+disk every loop, and a cold profile makes every start slower. The pool keeps
+a few directories under PROFILE_PATH (profile-0, profile-1, ...) and hands
+out a free one, locked with flock for as long as the browser runs, so caches
+stay warm between loops and no two browsers share a directory. The lock dies
+with the process, so a crashed run never blocks a profile.
+
+On every acquire, leftovers this program provably owns are collected:
+PID-suffixed PROFILE_PATH copies of earlier versions whose process is dead
+and that no running Chrome holds, stale throwaway profiles and slots beyond
+the pool size. Anything else in the temp directory is left alone. Above the disk cap the caches of free profiles
+are dropped, then whole free profiles.
+"""
+
+import fcntl
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+
+# Regenerated by Chrome, safe to drop when the pool is over its disk cap
+CACHE_DIRS = ('Cache', 'Code Cache', 'GPUCache', 'Service Worker/CacheStorage', 'Service Worker/ScriptCache')
+# Left behind by a Chrome that did not exit cleanly; would make the next start refuse the profile
+SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _chrome_holds(path: str) -> bool:
+    """Whether a live Chrome has the profile open (its SingletonLock points to "<host>-<pid>")."""
+    try:
+        target = os.readlink(os.path.join(path, 'SingletonLock'))
+    except OSError:
+        return False
+    pid = target.rsplit('-', 1)[-1]
+    return not pid.isdigit() or _pid_alive(int(pid))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@dataclass
+class ProfileLease:
+    path: str
+    lock_file: object | None = None
+    temporary: bool = False
+
+    def release(self):
+        if self.temporary:
+            shutil.rmtree(self.path, ignore_errors=True)
+        if self.lock_file is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+
+
+@dataclass
+class ProfilePool:
+    root: str
+    size: int = 2
+    max_disk_mb: int = 1500
+    stale_seconds: float = 24 * 3600
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            root=os.environ.get('PROFILE_PATH') or os.path.join(tempfile.gettempdir(), 'inpol-chrome-profiles'),
+            size=int(os.environ.get('PROFILE_POOL_SIZE', '2')),
+            max_disk_mb=int(os.environ.get('PROFILE_MAX_DISK_MB', '1500')),
+        )
+
+    def slot_path(self, number: int) -> str:
+        return os.path.join(self.root, f'profile-{number}')
+
+    def _try_lock(self, number: int):
+        lock_file = open(os.path.join(self.root, f'profile-{number}.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def acquire(self) -> ProfileLease:
+        """A locked profile directory; a throwaway one if every slot is in use."""
+        os.makedirs(self.root, exist_ok=True)
+        self.collect_garbage()
+        for number in range(self.size):
+            lock_file = self._try_lock(number)
+            if lock_file is None:
+                continue
+            path = self.slot_path(number)
+            os.makedirs(path, exist_ok=True)
+            for name in SINGLETON_FILES:
+                try:
+                    os.unlink(os.path.join(path, name))
+                except FileNotFoundError:
+                    pass
+            os.utime(path)
+            logging.debug(f'Using browser profile {path}')
+            return ProfileLease(path, lock_file)
+        path = tempfile.mkdtemp(prefix='tmp-', dir=self.root)
+        logging.info(f'All {self.size} browser profiles are in use, using throwaway profile {path}')
+        return ProfileLease(path, temporary=True)
+
+    def _legacy_dirs(self) -> list[str]:
+        """
+        PROFILE_PATH-<pid> profiles of earlier versions: only those of this user whose process is
+        gone and that no Chrome has open. (mkdtemp chrome-profile-* directories can't be told apart
+        from other programs' and are not touched.)
+        """
+        found = []
+        parent, base = os.path.split(self.root.rstrip(os.sep))
+        if not parent or not os.path.isdir(parent):
+            return found
+        for name in os.listdir(parent):
+            suffix = name[len(base) + 1:] if name.startswith(f'{base}-') else ''
+            path = os.path.join(parent, name)
+            if not suffix.isdigit() or int(suffix) == os.getpid() or _pid_alive(int(suffix)):
+                continue
+            try:
+                owned = os.lstat(path).st_uid == os.getuid()
+            except OSError:
+                continue
+            # 'Local State' marks a Chrome user-data-dir (not e.g. another pool's root)
+            if owned and os.path.exists(os.path.join(path, 'Local State')) and not _chrome_holds(path):
+                found.append(path)
+        return found
+
+    def collect_garbage(self):
+        for path in self._legacy_dirs():
+            logging.info(f'Removing stale browser profile {path}')
+            shutil.rmtree(path, ignore_errors=True)
+
+        # Free slots only: a locked one belongs to a running browser
+        free = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith('tmp-'):
+                # Throwaway profiles of crashed runs (an old one may still belong to a long-running browser)
+                if (os.path.isdir(path) and time.time() - os.path.getmtime(path) > self.stale_seconds
+                        and not _chrome_holds(path)):
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            if not (name.startswith('profile-') and name[8:].isdigit()):
+                continue
+            number = int(name[8:])
+            lock_file = self._try_lock(number)
+            if lock_file is None:
+                continue
+            try:
+                if number >= self.size:
+                    logging.info(f'Removing browser profile {path} (pool size {self.size})')
+                    shutil.rmtree(path, ignore_errors=True)
+                    os.unlink(os.path.join(self.root, f'profile-{number}.lock'))
+                else:
+                    free.append(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+        limit = self.max_disk_mb * 1024 * 1024
+        total = directory_size(self.root)
+        if total <= limit:
+            return
+        # Oldest first: drop caches, then whole profiles, until under the cap
+        ordered = sorted(free, key=os.path.getmtime)
+        for path in ordered:
+            for cache in CACHE_DIRS:
+                shutil.rmtree(os.path.join(path, 'Default', cache), ignore_errors=True)
+        total = directory_size(self.root)
+        for path in ordered:
+            if total <= limit:
+                break
+            logging.info(f'Browser profiles use {total // (1024 * 1024)} MB (cap {self.max_disk_mb} MB), removing {path}')
+            shutil.rmtree(path, ignore_errors=True)
+            total = directory_size(self.root)
@@ -0,0 +1,142 @@
+"""
+Encrypted store for the Inpol login session (cookies + localStorage).
+
+After a successful login the browser's cookies and localStorage (the auth
+token lives there) are saved, encrypted with a key kept next to the store.
+A fresh browser can then restore them and go straight to the case page,
+falling back to a full login only when the app redirects back to /login.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+
+READ_LOCAL_STORAGE_JS = '''
+const items = {};
+for (let i = 0; i < window.localStorage.length; i++) {
+    const key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return items;
+'''
+
+WRITE_LOCAL_STORAGE_JS = '''
+const items = arguments[0];
+for (const key of Object.keys(items)) {
+    window.localStorage.setItem(key, items[key]);
+}
+'''
+
+
+class SessionStore:
+    def __init__(self, path: str, key_path: str):
+        self.path = path
+        self.key_path = key_path
+
+    @classmethod
+    def from_env(cls):
+        """SessionStore configured by SESSION_STORE_PATH, or None if not configured/unavailable."""
+        path = os.environ.get('SESSION_STORE_PATH')
+        if not path:
+            return None
+        if not CRYPTOGRAPHY_AVAILABLE:
+            logging.warning('cryptography not installed - session store disabled')
+            return None
+        return cls(path=path, key_path=os.environ.get('SESSION_KEY_PATH', f'{path}.key'))
+
+    def _fernet(self):
+        if not os.path.exists(self.key_path):
+            os.makedirs(os.path.dirname(os.path.abspath(self.key_path)), exist_ok=True)
+            # O_EXCL: never overwrite a key another process has just created
+            try:
+                fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(Fernet.generate_key())
+            except FileExistsError:
+                pass
+        with open(self.key_path, 'rb') as f:
+            return Fernet(f.read().strip())
+
+    def save(self, driver):
+        """Save cookies and localStorage of the current page's origin."""
+        try:
+            payload = {
+                'saved_at': time.time(),
+                'cookies': driver.get_cookies(),
+                'local_storage': driver.execute_script(READ_LOCAL_STORAGE_JS),
+            }
+            token = self._fernet().encrypt(json.dumps(payload).encode('utf-8'))
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.session-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(token)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            logging.info(f'Saved login session ({len(payload["cookies"])} cookies)')
+        except Exception as e:
+            logging.warning(f'Could not save login session: {e}')
+
+    def load(self) -> dict | None:
+        try:
+            with open(self.path, 'rb') as f:
+                token = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(self._fernet().decrypt(token))
+        except InvalidToken:
+            logging.warning(f'Saved session {self.path} cannot be decrypted with {self.key_path}, ignoring it')
+            return None
+
+    def restore(self, driver, origin_page_url: str) -> bool:
+        """
+        Put saved cookies and localStorage into the browser.
+        Opens `origin_page_url` first (unless the browser is already there),
+        since both are bound to the site's origin.
+        """
+        payload = self.load()
+        if payload is None:
+            return False
+
+        if driver.current_url != origin_page_url:
+            driver.get(origin_page_url)
+        host = urlsplit(origin_page_url).hostname or ''
+        restored = 0
+        for cookie in payload.get('cookies', []):
+            cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'path', 'domain', 'secure',
+                                                                  'httpOnly', 'expiry', 'sameSite')}
+            if cookie.get('domain') and not host.endswith(cookie['domain'].lstrip('.')):
+                continue
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            try:
+                driver.add_cookie(cookie)
+                restored += 1
+            except Exception as e:
+                logging.debug(f'Skipping cookie {cookie.get("name")}: {e}')
+        driver.execute_script(WRITE_LOCAL_STORAGE_JS, payload.get('local_storage') or {})
+
+        age_minutes = (time.time() - payload.get('saved_at', 0)) / 60
+        logging.info(f'Restored login session from {age_minutes:.0f} min ago ({restored} cookies)')
+        return True
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
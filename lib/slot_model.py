@@ -0,0 +1,180 @@
+"""
+Learned slot-release schedule.
+
+Every loop and every found slot is appended to a history file
+(SLOT_HISTORY_PATH). The model turns that history into a find rate (slots
+found per check) by weekday and time-of-day bin and spreads a fixed daily
+number of checks (CHECK_BUDGET) over the bins in proportion to it: bins
+where slots used to appear get short intervals, quiet bins long ones. The
+rate, not the raw count, is what matters: a bin checked twice as often
+finds twice as many slots without releasing more of them. Prior finds and
+checks per bin keep every bin checked now and then, so the model can still
+learn about new release times.
+"""
+
+import datetime
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Callable
+
+import pytz
+from pytimeparse.timeparse import timeparse
+
+TIMEZONE = 'Europe/Warsaw'
+
+
+@dataclass
+class SlotHistory:
+    path: str
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get('SLOT_HISTORY_PATH')
+        return cls(path) if path else None
+
+    def _append(self, entry: dict):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logging.warning(f'Could not write to slot history {self.path}: {e}')
+
+    def record(self, location: str, queue: str | None = None, found_at: datetime.datetime | None = None):
+        found_at = found_at or datetime.datetime.now(pytz.timezone(TIMEZONE))
+        self._append({'found_at': found_at.isoformat(timespec='seconds'), 'location': location, 'queue': queue})
+
+    def record_check(self, checked_at: datetime.datetime | None = None):
+        """One loop ran (found something or not) - the denominator of the find rate."""
+        checked_at = checked_at or datetime.datetime.now(pytz.timezone(TIMEZONE))
+        self._append({'checked_at': checked_at.isoformat(timespec='seconds')})
+
+    def load(self, key: str = 'found_at') -> list[datetime.datetime]:
+        """Times of the found slots (`checked_at`: of the loops)."""
+        times = []
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        times.append(datetime.datetime.fromisoformat(json.loads(line)[key]))
+                    except (ValueError, KeyError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return times
+
+    def mtime(self) -> float:
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return 0.0
+
+
+@dataclass
+class SlotReleaseModel:
+    history: SlotHistory
+    daily_budget: int = 80
+    bin_minutes: int = 30
+    min_interval: float = 180
+    max_interval: float = 2700
+    prior: float = 1.0
+    prior_checks: float = 10.0
+    _histogram: list[list[float]] | None = field(default=None, init=False, repr=False)
+    _loaded_mtime: float = field(default=-1.0, init=False, repr=False)
+
+    @classmethod
+    def from_env(cls):
+        """Model for SCHEDULE_MODE=learned, else None."""
+        if os.environ.get('SCHEDULE_MODE', 'flat').lower() != 'learned':
+            return None
+        return cls(
+            history=SlotHistory(os.environ.get('SLOT_HISTORY_PATH', 'slot-history.jsonl')),
+            daily_budget=int(os.environ.get('CHECK_BUDGET', '80')),
+            bin_minutes=timeparse(os.environ.get('SLOT_BIN', '30m')) // 60,
+            min_interval=timeparse(os.environ.get('MIN_INTERVAL', '3m')),
+            max_interval=timeparse(os.environ.get('MAX_INTERVAL', '45m')),
+        )
+
+    @property
+    def bins_per_day(self) -> int:
+        return 24 * 60 // self.bin_minutes
+
+    def bin_of(self, dt: datetime.datetime) -> int:
+        return (dt.hour * 60 + dt.minute) // self.bin_minutes
+
+    def histogram(self) -> list[list[float]]:
+        """Find rate per [weekday][bin], smoothed with the priors; rebuilt only when the history file changed."""
+        mtime = self.history.mtime()
+        if self._histogram is None or mtime != self._loaded_mtime:
+            tz = pytz.timezone(TIMEZONE)
+            found = [[0] * self.bins_per_day for _ in range(7)]
+            checks = [[0] * self.bins_per_day for _ in range(7)]
+            for counts, key in ((found, 'found_at'), (checks, 'checked_at')):
+                for at in self.history.load(key):
+                    local = at.astimezone(tz) if at.tzinfo else tz.localize(at)
+                    counts[local.weekday()][self.bin_of(local)] += 1
+            self._histogram = [
+                [(found[day][b] + self.prior) / (checks[day][b] + self.prior_checks) for b in range(self.bins_per_day)]
+                for day in range(7)
+            ]
+            self._loaded_mtime = mtime
+        return self._histogram
+
+    def allocation(self, weights: list[float], bins: list[int]) -> dict[int, float]:
+        """
+        Checks per bin: the daily budget split over `bins` in proportion to their
+        weight, every bin kept within MIN_INTERVAL/MAX_INTERVAL. The split is
+        clamp(scale * weight) with the scale that makes the day add up to the
+        budget (whenever the bounds allow it), so what the bounds take from or
+        add to a bin is spread over the others by weight.
+        """
+        seconds = self.bin_minutes * 60
+        low, high = seconds / self.max_interval, seconds / self.min_interval
+        if not bins:
+            return {}
+        if not any(weights[b] > 0 for b in bins):
+            even = min(high, max(low, self.daily_budget / len(bins)))
+            return {b: even for b in bins}
+
+        def spread(scale: float) -> dict[int, float]:
+            return {b: min(high, max(low, scale * weights[b])) for b in bins}
+
+        # The day's total only grows with the scale: bisect for the one that spends the budget
+        below, above = 0.0, 1.0
+        while sum(spread(above).values()) < self.daily_budget and above < 1e12:
+            above *= 2
+        for _ in range(100):
+            middle = (below + above) / 2
+            if sum(spread(middle).values()) < self.daily_budget:
+                below = middle
+            else:
+                above = middle
+        return spread(above)
+
+    def interval_at(self, dt: datetime.datetime, active: Callable[[datetime.datetime], bool] | None = None) -> float:
+        """
+        Seconds until the next check at `dt`: the daily budget is split over the
+        bins of that day by find rate (see allocation); `active` limits the split
+        to bins where checks actually run (working hours).
+        """
+        weights = self.histogram()[dt.weekday()]
+        current = self.bin_of(dt)
+        active_bins = list(range(self.bins_per_day))
+        if active is not None:
+            midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+            active_bins = [b for b in active_bins
+                           if active(midnight + datetime.timedelta(minutes=b * self.bin_minutes))] or active_bins
+        checks_in_bin = self.allocation(weights, active_bins).get(current, 0)
+        if checks_in_bin <= 0:
+            return self.max_interval
+        # Already within the bounds, min/max only guard against rounding
+        return min(self.max_interval, max(self.min_interval, self.bin_minutes * 60 / checks_in_bin))
+
+    def describe(self, weekday: int) -> str:
+        """Interval per hour for one weekday, for logs."""
+        monday = datetime.datetime(2024, 1, 1)  # a Monday
+        day = monday + datetime.timedelta(days=weekday)
+        parts = [f'{hour:02d}h {self.interval_at(day.replace(hour=hour)) / 60:.0f}m' for hour in range(24)]
+        return ', '.join(parts)
@@ -0,0 +1,179 @@
+"""
+Pipelined checking of several locations, one browser tab per location.
+
+In the serial flow every location waits for its own server round-trips
+(location -> list of queues -> calendar) before the next one starts. Here
+each location gets its own tab: the case page starts loading in every extra
+tab at once (navigation is not waited for), the first location is selected
+in the current tab, then the pipeline goes round the tabs (switch_to.window)
+and moves on whichever tab has finished loading - open the list of
+locations and select one, select the queue, later read the calendar. The
+server latencies of the locations overlap, so one pass takes about as long
+as the slowest location.
+
+Network capture keeps working: the performance log tells the tabs apart,
+so NetworkCapture.target is pointed at the tab being advanced.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+from lib import locators
+from lib.checker import Checker
+from lib.memory_governor import MemoryGovernor
+from lib.messenger import Messenger
+from lib.page_idle import install_tracker
+from lib.slot_model import SlotHistory
+
+# Stages of a tab
+PAGE = 'page'          # case page loading in a background tab
+LOCATION = 'location'  # location clicked, list of queues loading
+QUEUE = 'queue'        # queue clicked, calendar loading
+DONE = 'done'
+
+
+@dataclass
+class Tab:
+    handle: str
+    location: str
+    stage: str = LOCATION
+    queue: str | None = None
+    captcha_mark: int = 0
+    since: float = 0.0
+
+
+class TabPipeline:
+    def __init__(self, inpol: Checker, messenger: Messenger, slot_history: SlotHistory | None = None,
+                 governor: MemoryGovernor | None = None, poll_interval: float = 0.2):
+        self.inpol = inpol
+        self.messenger = messenger
+        self.slot_history = slot_history
+        self.governor = governor
+        self.poll_interval = poll_interval
+
+    @property
+    def browser(self):
+        return self.inpol.config.browser
+
+    def _select(self, tab: Tab):
+        self.inpol.select_location(tab.location, wait=False)
+        tab.stage = LOCATION
+        tab.captcha_mark = self.inpol.captcha_hits
+        tab.since = time.monotonic()
+
+    def _open_tabs(self, locations: list[str], tabs: list[Tab]):
+        """
+        Start loading the case page in a new tab for every location but the first, appending to `tabs`
+        as they open (so they can be closed on errors), then select the first location in the current
+        tab, where the list of locations is open.
+        """
+        main = Tab(self.browser.current_window_handle, locations[0])
+        url = self.inpol.case_page_url(self.inpol.config.case_id)
+        for location in locations[1:]:
+            self.browser.switch_to.new_window('tab')
+            tab = Tab(self.browser.current_window_handle, location, stage=PAGE, since=time.monotonic())
+            tabs.append(tab)
+            try:
+                # New tabs don't inherit the request tracker BrowserFactory installed in the first one
+                install_tracker(self.browser)
+                if self.inpol.network is not None:
+                    self.inpol.network.enable()
+                # Assigning location returns at once, unlike driver.get() which waits for the load event
+                self.browser.execute_script('window.location.href = arguments[0];', url)
+            except Exception as e:
+                logging.error(f'Error opening tab for "{location}": {e}')
+                tab.stage = DONE
+        self.browser.switch_to.window(main.handle)
+        tabs.insert(0, main)
+        self._select(main)
+
+    def _ready(self, tab: Tab) -> bool:
+        if tab.stage == PAGE:
+            loaded = len(locators.find_elements(self.browser, locators.APPOINTMENT_SECTION)) != 0
+        else:
+            loaded = True
+        if loaded and self.inpol.idle_waiter.is_idle():
+            return True
+        if time.monotonic() - tab.since < self.inpol.config.page_load_timeout:
+            return False
+        if tab.stage == PAGE:
+            raise TimeoutError('case page did not load')
+        # Past the page load timeout: wait the usual way (raises if the spinner never goes away)
+        self.inpol.wait_spinner()
+        return True
+
+    def _advance(self, tab: Tab, results: dict[str, bool]):
+        """Move a loaded tab to its next stage."""
+        if tab.stage == PAGE:
+            self.inpol.detect_captcha()
+            self.inpol.expand_appointment_panel(pause=False)
+            self.inpol.expand_locations()
+            self._select(tab)
+            return
+        self.inpol.focus_location(tab.location, tab.captcha_mark)
+        if tab.stage == LOCATION:
+            tab.queue = self.inpol.select_first_queue_atomic(wait=False)
+            if tab.queue is None:
+                msg = f'⚠️ No queues available for location "{tab.location}" - skipping'
+                logging.warning(msg)
+                self.messenger.send_message(msg)
+                tab.stage = DONE
+                return
+            tab.stage = QUEUE
+            tab.since = time.monotonic()
+        elif tab.stage == QUEUE:
+            self.inpol.detect_captcha()
+            slots_found = self.inpol.check_last_date_only(location=tab.location, queue=tab.queue)
+            results[tab.location] = bool(slots_found)
+            if slots_found and self.slot_history is not None:
+                self.slot_history.record(tab.location, tab.queue)
+            tab.stage = DONE
+
+    def run(self, locations: list[str]) -> dict[str, bool]:
+        """Check `locations`; the current tab must show the open list of locations. Returns location -> slots found."""
+        results = {}
+        if not locations:
+            return results
+        main_handle = self.browser.current_window_handle
+        network = self.inpol.network
+        tabs = []
+        try:
+            self._open_tabs(locations, tabs)
+            current = main_handle
+            while any(tab.stage != DONE for tab in tabs):
+                progressed = False
+                for tab in tabs:
+                    if tab.stage == DONE:
+                        continue
+                    if current != tab.handle:
+                        self.browser.switch_to.window(tab.handle)
+                        current = tab.handle
+                    if network is not None:
+                        network.target = tab.handle
+                    try:
+                        if not self._ready(tab):
+                            continue
+                        self._advance(tab, results)
+                        progressed = True
+                    except Exception as e:
+                        logging.error(f'Error checking location "{tab.location}": {e}')
+                        tab.stage = DONE
+                    if tab.stage == DONE and self.governor is not None and any(t.stage != DONE for t in tabs):
+                        # Safe point between locations; a reset only empties this finished tab
+                        self.governor.between_locations(self.browser)
+                if not progressed:
+                    time.sleep(self.poll_interval)
+        finally:
+            for tab in tabs:
+                if tab.handle != main_handle:
+                    try:
+                        self.browser.switch_to.window(tab.handle)
+                        self.browser.close()
+                    except Exception as e:
+                        logging.debug(f'Could not close tab of "{tab.location}": {e}')
+            self.browser.switch_to.window(main_handle)
+            if network is not None:
+                network.target = None
+                network.discard()
+        return results
@@ -0,0 +1,106 @@
+"""
+Per-phase latency records for one checking cycle.
+
+Checker methods are wrapped with @timed('<phase>'), which records the
+duration into the Checker's PhaseTimer together with the location that is
+being checked at the moment. At the end of a cycle the runner writes one
+JSON line with per-phase and per-location totals (TIMINGS_PATH).
+
+Phases can nest (wait_spinner runs inside select_location), so phase totals
+overlap and do not add up to the cycle duration.
+"""
+
+import datetime
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PhaseRecord:
+    phase: str
+    seconds: float
+    location: str | None = None
+
+
+def _aggregate(records: list[PhaseRecord]) -> dict:
+    phases = {}
+    for record in records:
+        stats = phases.setdefault(record.phase, {'count': 0, 'total': 0.0, 'max': 0.0})
+        stats['count'] += 1
+        stats['total'] += record.seconds
+        stats['max'] = max(stats['max'], record.seconds)
+    for stats in phases.values():
+        stats['total'] = round(stats['total'], 3)
+        stats['max'] = round(stats['max'], 3)
+    return phases
+
+
+@dataclass
+class PhaseTimer:
+    records: list[PhaseRecord] = field(default_factory=list)
+    location: str | None = None
+    started_at: float = field(default_factory=time.time)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append(PhaseRecord(name, time.perf_counter() - start, self.location))
+
+    def add(self, name: str, started: float):
+        """Record a phase that began at time.perf_counter() value `started` and ends now."""
+        self.records.append(PhaseRecord(name, time.perf_counter() - started, self.location))
+
+    def phases(self) -> dict:
+        return _aggregate(self.records)
+
+    def locations(self, since: int = 0) -> dict:
+        """Per-location totals of the records from index `since` on (a len(records) taken earlier)."""
+        by_location = {}
+        for record in self.records[since:]:
+            if record.location is not None:
+                by_location.setdefault(record.location, []).append(record)
+        return {location: _aggregate(records) for location, records in by_location.items()}
+
+    def summary(self) -> str:
+        parts = [f'{name} {stats["count"]}x {stats["total"]:.2f}s' for name, stats in
+                 sorted(self.phases().items(), key=lambda item: -item[1]['total'])]
+        return 'Phase timings: ' + (', '.join(parts) if parts else 'none')
+
+    def cycle_record(self, **extra) -> dict:
+        return {
+            'started_at': datetime.datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration': round(time.time() - self.started_at, 3),
+            **extra,
+            'phases': self.phases(),
+            'locations': self.locations(),
+        }
+
+    def write_cycle(self, path: str | None = None, **extra):
+        """Append this cycle as one JSON line to `path` (default TIMINGS_PATH; nothing is written if unset)."""
+        path = path or os.environ.get('TIMINGS_PATH')
+        if not path:
+            return
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.cycle_record(**extra), ensure_ascii=False) + '\n')
+        except Exception as e:
+            logging.warning(f'Could not write timings to {path}: {e}')
+
+
+def timed(phase: str):
+    """Record the duration of a method into `self.timer` under `phase`."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.timer.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+"""
+Working-day calendar for Poland.
+
+A day is bookable when it is Monday-Friday and not a statutory public holiday
+(the office is closed on those, so they never have slots). The index for the
+next months is built once per process; lookups are dict/set hits.
+"""
+
+import calendar as cal
+import datetime
+import functools
+import logging
+import os
+
+import pytz
+
+TIMEZONE = 'Europe/Warsaw'
+
+# Month abbreviations shown in the calendar header, e.g. "PAŹ 2025"
+MONTHS_PL = {
+    'STY': 1, 'LUT': 2, 'MAR': 3, 'KWI': 4, 'MAJ': 5, 'CZE': 6,
+    'LIP': 7, 'SIE': 8, 'WRZ': 9, 'PAŹ': 10, 'LIS': 11, 'GRU': 12
+}
+
+
+@functools.lru_cache(maxsize=None)
+def parse_month_year(month_year_text: str) -> tuple[int | None, int | None]:
+    """Parse month/year text like 'PAŹ 2025' into (year, month_number)"""
+    try:
+        parts = month_year_text.split()
+        if len(parts) >= 2:
+            month_str = parts[0]
+            year = int(parts[1])
+            month = MONTHS_PL.get(month_str, 1)
+            return year, month
+    except Exception as e:
+        logging.debug(f'Error parsing month/year "{month_year_text}": {e}')
+
+    return None, None
+
+
+def easter_sunday(year: int) -> datetime.date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday_shift = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday_shift) // 451
+    month, day = divmod(h + weekday_shift - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+@functools.lru_cache(maxsize=None)
+def polish_holidays(year: int) -> frozenset[datetime.date]:
+    """Statutory non-working days (ustawa o dniach wolnych od pracy)."""
+    easter = easter_sunday(year)
+    days = {
+        datetime.date(year, 1, 1),    # Nowy Rok
+        datetime.date(year, 1, 6),    # Trzech Króli
+        easter,                       # Wielkanoc
+        easter + datetime.timedelta(days=1),   # Poniedziałek Wielkanocny
+        datetime.date(year, 5, 1),    # Święto Pracy
+        datetime.date(year, 5, 3),    # Święto Konstytucji 3 Maja
+        easter + datetime.timedelta(days=49),  # Zielone Świątki
+        easter + datetime.timedelta(days=60),  # Boże Ciało
+        datetime.date(year, 8, 15),   # Wniebowzięcie NMP
+        datetime.date(year, 11, 1),   # Wszystkich Świętych
+        datetime.date(year, 11, 11),  # Święto Niepodległości
+        datetime.date(year, 12, 25),  # Boże Narodzenie
+        datetime.date(year, 12, 26),  # drugi dzień Bożego Narodzenia
+    }
+    if year >= 2025:
+        days.add(datetime.date(year, 12, 24))  # Wigilia, non-working since 2025
+    return frozenset(days)
+
+
+def is_holiday(day: datetime.date) -> bool:
+    return day in polish_holidays(day.year)
+
+
+class WorkingDayIndex:
+    """Bookable days and last bookable day per month, precomputed for a range of months."""
+
+    def __init__(self, start: datetime.date, months: int):
+        self._bookable: set[datetime.date] = set()
+        self._last_bookable: dict[tuple[int, int], int | None] = {}
+
+        year, month = start.year, start.month
+        for _ in range(months):
+            self._add_month(year, month)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def _add_month(self, year: int, month: int):
+        last_bookable = None
+        for day in range(1, cal.monthrange(year, month)[1] + 1):
+            date = datetime.date(year, month, day)
+            if date.weekday() < 5 and not is_holiday(date):
+                self._bookable.add(date)
+                last_bookable = day
+        self._last_bookable[(year, month)] = last_bookable
+
+    def _ensure_month(self, year: int, month: int):
+        # Months outside the precomputed range are added on first use
+        if (year, month) not in self._last_bookable:
+            self._add_month(year, month)
+
+    def is_bookable(self, year: int, month: int, day: int) -> bool:
+        self._ensure_month(year, month)
+        return datetime.date(year, month, day) in self._bookable
+
+    def last_bookable_day(self, year: int, month: int) -> int | None:
+        self._ensure_month(year, month)
+        return self._last_bookable[(year, month)]
+
+
+@functools.lru_cache(maxsize=None)
+def get_working_day_index() -> WorkingDayIndex:
+    """Process-wide index starting at the current month (WORKING_DAY_INDEX_MONTHS months ahead)."""
+    today = datetime.datetime.now(pytz.timezone(TIMEZONE)).date()
+    months = int(os.environ.get('WORKING_DAY_INDEX_MONTHS', '12'))
+    return WorkingDayIndex(today.replace(day=1), months)
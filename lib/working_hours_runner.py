@@ -1,5 +1,6 @@
 import datetime
 import logging
+import math
 import time
 from dataclasses import dataclass
 from random import random
@@ -17,42 +18,139 @@ class WorkingHours:
     end_displace_from_midnight: str
 
 
+@dataclass(frozen=True)
+class CompiledWindow:
+    """Working hours as offsets from local midnight; `end` may be past 24h (window spans midnight)."""
+    begin: datetime.timedelta
+    end: datetime.timedelta
+
+
 @dataclass
 class WorkingHoursRunner:
     sleep_interval: str
     sleep_interval_jitter: str
     working_hours: list[WorkingHours]
+    # Called this long before a run that falls into working hours, e.g. to start the browser
+    prewarm: Callable | None = None
+    prewarm_lead: str = '0s'
+    # Seconds between runs at a given moment (e.g. SlotReleaseModel); the flat sleep_interval if None
+    interval_model: Callable[[datetime.datetime], float] | None = None
+
+    def __post_init__(self):
+        # Parse everything once; the loop only does datetime arithmetic
+        self._windows = [
+            CompiledWindow(
+                begin=datetime.timedelta(seconds=timeparse(wh.begin_displace_from_midnight)),
+                end=datetime.timedelta(seconds=timeparse(wh.end_displace_from_midnight)),
+            )
+            for wh in self.working_hours
+        ]
+        self._sleep_seconds = timeparse(self.sleep_interval)
+        self._jitter_seconds = timeparse(self.sleep_interval_jitter)
+        self._prewarm_lead_seconds = timeparse(self.prewarm_lead) or 0
+        # A window ending at 29h59m59s is still open on the next day: look that many days back
+        longest_end = max((w.end for w in self._windows), default=datetime.timedelta(0))
+        self._days_back = max(0, math.ceil(longest_end / datetime.timedelta(days=1)) - 1)
+
+    @property
+    def tz(self):
+        return pytz.timezone(TIMEZONE)
 
     def dt_now(self):
-        return datetime.datetime.now(pytz.timezone(TIMEZONE))
+        return datetime.datetime.now(self.tz)
+
+    def random_sleep(self, dt: datetime.datetime | None = None):
+        if self.interval_model is not None:
+            interval = self.interval_model(self.localize(dt or self.dt_now()))
+            return interval + (random() - 0.5) * min(self._jitter_seconds, interval / 2)
+        return self._sleep_seconds + (random() - 0.5) * self._jitter_seconds
 
-    def random_sleep(self):
-        return timeparse(self.sleep_interval) + (random() - 0.5) * timeparse(self.sleep_interval_jitter)
+    def localize(self, dt: datetime.datetime) -> datetime.datetime:
+        """Aware Europe/Warsaw datetime; naive values are taken as Warsaw wall time."""
+        if dt.tzinfo is None:
+            return self.tz.localize(dt)
+        return dt.astimezone(self.tz)
 
     def midnight_of_datetime(self, dt: datetime.datetime) -> datetime.datetime:
-        return datetime.datetime.combine(dt, datetime.time.min)
+        return self.tz.localize(datetime.datetime.combine(self.localize(dt).date(), datetime.time.min))
+
+    def windows_on(self, day: datetime.date) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Windows anchored at the midnight of `day`, as aware datetimes.
+        Offsets are wall-clock time, so 7h30m is 07:30 also on DST change days.
+        """
+        midnight = datetime.datetime.combine(day, datetime.time.min)
+        return [
+            (self.tz.normalize(self.tz.localize(midnight + w.begin)),
+             self.tz.normalize(self.tz.localize(midnight + w.end)))
+            for w in self._windows
+        ]
+
+    def _candidate_windows(self, dt: datetime.datetime, days_ahead: int = 0):
+        day = dt.date()
+        for offset in range(-self._days_back, days_ahead + 1):
+            yield from self.windows_on(day + datetime.timedelta(days=offset))
 
     def in_working_hours(self, dt: datetime.datetime) -> bool:
-        midnight = self.midnight_of_datetime(dt)
-        for wh in self.working_hours:
-            begin_dt = midnight + datetime.timedelta(seconds=timeparse(wh.begin_displace_from_midnight))
-            end_dt = midnight + datetime.timedelta(seconds=timeparse(wh.end_displace_from_midnight))
-            if begin_dt <= dt <= end_dt:
-                return True
-        return False
+        dt = self.localize(dt)
+        return any(begin <= dt <= end for begin, end in self._candidate_windows(dt))
+
+    def next_eligible(self, dt: datetime.datetime) -> datetime.datetime | None:
+        """`dt` itself if it is inside working hours, otherwise the start of the next window."""
+        dt = self.localize(dt)
+        if self.in_working_hours(dt):
+            return dt
+        starts = [begin for begin, _ in self._candidate_windows(dt, days_ahead=2) if begin > dt]
+        return min(starts, default=None)
+
+    def schedule(self, start: datetime.datetime | None = None, days: int = 2) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """Merged working windows from `start` (default now) over the next `days` days, for inspection."""
+        start = self.localize(start or self.dt_now())
+        windows = sorted((begin, end) for begin, end in self._candidate_windows(start, days_ahead=days)
+                         if end >= start)
+        merged = []
+        for begin, end in windows:
+            if merged and begin <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((begin, end))
+        return merged
 
     def sleep_until(self, dt):
-        seconds = (dt - datetime.datetime.now()).total_seconds()
-        time.sleep(seconds)
+        # Wall-clock target converted once, then waited for on the monotonic clock
+        seconds = (self.localize(dt) - self.dt_now()).total_seconds()
+        deadline = time.monotonic() + max(0.0, seconds)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def prewarm_before(self, next_run_at: datetime.datetime):
+        lead = self._prewarm_lead_seconds
+        if self.prewarm is None or lead <= 0 or not self.in_working_hours(next_run_at):
+            return
+        self.sleep_until(next_run_at - datetime.timedelta(seconds=lead))
+        logging.info(f'Pre-warming {lead}s before next run')
+        try:
+            self.prewarm()
+        except Exception as e:
+            logging.warning(f'Pre-warm failed: {e}')
 
     def run(self, func: Callable):
+        for begin, end in self.schedule():
+            logging.info(f'Working window {begin.strftime("%c %Z")} - {end.strftime("%c %Z")}')
         while True:
-            dt = datetime.datetime.now()
+            dt = self.dt_now()
             logging.info(f'Start loop at {dt.strftime("%c")}')
             if self.in_working_hours(dt):
                 func()
-            dt2 = datetime.datetime.now()
+            dt2 = self.dt_now()
             logging.info(f'End loop ({(dt2 - dt).total_seconds()}s) at {dt2.strftime("%c")}')
-            next_run_at = dt2 + datetime.timedelta(seconds=self.random_sleep())
+            next_run_at = self.next_eligible(dt2 + datetime.timedelta(seconds=self.random_sleep(dt2)))
+            if next_run_at is None:
+                logging.warning('No working hours configured, stopping')
+                return
             logging.info(f'Sleep until {next_run_at.strftime("%c")}')
+            self.prewarm_before(next_run_at)
             self.sleep_until(next_run_at)
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Inpol site for offline runs and benchmarks.
+
+Serves a login page and a case page with the same DOM structure the Checker
+locators target (lib/locators.py): login form, appointment accordion,
+mat-select location/queue dropdowns, mat-spinner, mat-calendar with
+enabled/disabled day cells and reservation__hours time tiles. The page talks
+to small JSON endpoints, so the latency and the offered dates/slots can be
+set per run.
+
+Run with: python mock_inpol.py --port 8765 --latency 0.3 --slots 2
+then point the checker at it: INPOL_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from lib import working_days
+
+SESSION_COOKIE = 'inpol_mock_session'
+MONTH_NAMES = {number: name for name, number in working_days.MONTHS_PL.items()}
+
+
+@dataclass
+class MockScenario:
+    latency: float = 0.2         # seconds added to every JSON endpoint
+    jitter: float = 0.1          # +- random part of the latency
+    horizon_days: int = 40       # dates are offered from tomorrow up to this many days ahead
+    slots: int = 0               # time tiles shown on the furthest offered date (0 = no slot)
+    login_ok: bool = True        # False renders the "Incorrect email" error
+    locations: list[str] = field(default_factory=lambda: [
+        'ul. Marszałkowska 3/5', 'al. Jerozolimskie 28', 'ul. Długa 5'])
+    queues: list[str] = field(default_factory=lambda: ['X - Złożenie wniosku'])
+
+    def sleep(self):
+        delay = self.latency + (random.random() - 0.5) * 2 * self.jitter
+        if delay > 0:
+            time.sleep(delay)
+
+    def offered_dates(self, today: datetime.date) -> list[datetime.date]:
+        index = working_days.WorkingDayIndex(today.replace(day=1), 3)
+        dates = []
+        for offset in range(1, self.horizon_days + 1):
+            day = today + datetime.timedelta(days=offset)
+            if index.is_bookable(day.year, day.month, day.day):
+                dates.append(day)
+        return dates
+
+
+PAGE_HTML = '''<!DOCTYPE html>
+<html lang="pl">
+<head>
+<meta charset="utf-8">
+<title>Inpol mock</title>
+<style>
+  body { font-family: sans-serif; margin: 20px; }
+  mat-select, mat-option, mat-calendar, mat-month-view, mat-error { display: block; }
+  mat-spinner { display: block; width: 40px; height: 40px; border-radius: 50%; border: 4px solid #3f51b5; }
+  mat-select { width: 320px; padding: 8px; border: 1px solid #999; cursor: pointer; margin: 8px 0; }
+  mat-option { padding: 6px 8px; cursor: pointer; }
+  mat-option:hover { background: #eee; }
+  .cdk-overlay-pane { border: 1px solid #999; width: 320px; background: #fff; }
+  td[role="gridcell"] { width: 36px; height: 32px; text-align: center; }
+  .mat-calendar-body-disabled { color: #bbb; }
+  .mat-calendar-body-cell-content { cursor: pointer; padding: 6px; }
+  .tile { display: inline-block; padding: 6px 10px; margin: 4px; border: 1px solid #3f51b5; }
+  .hidden { display: none !important; }
+</style>
+</head>
+<body>
+<div id="app"></div>
+<script>
+const app = document.getElementById('app');
+const MONTHS = __MONTHS__;
+const CASE_PAGE = location.pathname.startsWith('/home/cases/');
+
+async function api(path, options) {
+    const response = await fetch(path, options);
+    if (!response.ok) {
+        throw new Error(path + ' ' + response.status);
+    }
+    return response.json();
+}
+
+function spinner(show) {
+    document.getElementById('spinner').classList.toggle('hidden', !show);
+}
+
+function renderLogin() {
+    app.innerHTML = `
+        <div id="cookies">We use cookies
+            <a href="#" aria-label="cookie dismiss" onclick="document.getElementById('cookies').remove(); return false;">OK</a>
+        </div>
+        <h2>Logowanie</h2>
+        <form id="login" onsubmit="return false;">
+            <input formcontrolname="email" type="email"><br>
+            <input formcontrolname="password" type="password"><br>
+            <div id="login-error"></div>
+            <button class="btn btn--submit" type="submit">Zaloguj</button>
+        </form>`;
+    document.querySelector('button.btn--submit').addEventListener('click', async () => {
+        const body = JSON.stringify({
+            email: document.querySelector('input[formcontrolname="email"]').value,
+            password: document.querySelector('input[formcontrolname="password"]').value,
+        });
+        try {
+            const result = await api('/api/login', {method: 'POST', body: body});
+            localStorage.setItem('token', result.token);
+            history.pushState({}, '', '/home');
+            app.innerHTML = '<h2>Witaj</h2><a routerlink="/home/cases-choose" class="btn" href="#">Moje sprawy</a>';
+        } catch (e) {
+            document.getElementById('login-error').innerHTML =
+                '<mat-error>Incorrect email or password</mat-error>';
+        }
+    });
+}
+
+const state = {location: null, queue: null, year: null, month: null, dates: []};
+
+function renderCase() {
+    app.innerHTML = `
+        <h2>Sprawa</h2>
+        <h3>Make an appointment</h3>
+        <button class="btn btn--accordion" type="button" id="accordion-button">▼</button>
+        <div class="accordion">
+            <div id="accordion-body" class="hidden">
+                <mat-select name="location" id="location-select">Wybierz lokalizację</mat-select>
+                <mat-select name="queueName" id="queue-select" class="hidden">Wybierz kolejkę</mat-select>
+                <mat-spinner role="progressbar" id="spinner" class="hidden"></mat-spinner>
+                <div id="calendar-host"></div>
+                <div id="hours-host"></div>
+            </div>
+        </div>
+        <div id="overlay" class="cdk-overlay-pane hidden"></div>`;
+    document.getElementById('accordion-button').addEventListener('click', () => {
+        document.getElementById('accordion-body').classList.remove('hidden');
+    });
+    document.getElementById('location-select').addEventListener('click', async () => {
+        openOverlay(await api('/api/locations'), selectLocation);
+    });
+    document.getElementById('queue-select').addEventListener('click', async () => {
+        openOverlay(await api('/api/queues?location=' + encodeURIComponent(state.location)), selectQueue);
+    });
+}
+
+function openOverlay(options, onSelect) {
+    const overlay = document.getElementById('overlay');
+    overlay.innerHTML = '';
+    for (const text of options) {
+        const option = document.createElement('mat-option');
+        const span = document.createElement('span');
+        span.className = 'mat-option-text';
+        span.textContent = text;
+        option.appendChild(span);
+        option.addEventListener('click', () => {
+            overlay.classList.add('hidden');
+            overlay.innerHTML = '';
+            onSelect(text);
+        });
+        overlay.appendChild(option);
+    }
+    overlay.classList.remove('hidden');
+}
+
+async function selectLocation(text) {
+    state.location = text;
+    state.queue = null;
+    document.getElementById('location-select').textContent = text;
+    document.getElementById('queue-select').classList.add('hidden');
+    document.getElementById('calendar-host').innerHTML = '';
+    document.getElementById('hours-host').innerHTML = '';
+    spinner(true);
+    try {
+        await api('/api/queues?location=' + encodeURIComponent(text));
+        document.getElementById('queue-select').classList.remove('hidden');
+    } finally {
+        spinner(false);
+    }
+}
+
+async function selectQueue(text) {
+    state.queue = text;
+    document.getElementById('queue-select').textContent = text;
+    spinner(true);
+    try {
+        // All offered dates of the queue at once, like the real API; months are rendered from it
+        state.dates = await api(`/api/dates?location=${encodeURIComponent(state.location)}` +
+                                `&queue=${encodeURIComponent(text)}`);
+    } finally {
+        spinner(false);
+    }
+    const today = new Date();
+    showMonth(today.getFullYear(), today.getMonth() + 1);
+}
+
+function showMonth(year, month) {
+    state.year = year;
+    state.month = month;
+    const prefix = `${year}-${String(month).padStart(2, '0')}-`;
+    renderCalendar(state.dates.filter((date) => date.startsWith(prefix))
+                              .map((date) => parseInt(date.slice(8, 10), 10)));
+}
+
+function renderCalendar(enabledDays) {
+    const first = new Date(state.year, state.month - 1, 1);
+    const daysInMonth = new Date(state.year, state.month, 0).getDate();
+    const leading = (first.getDay() + 6) % 7;  // Monday first
+    let rows = '<tr><td class="mat-calendar-body-label" colspan="7" aria-hidden="true"></td></tr>';
+    let row = '';
+    for (let i = 0; i < leading; i++) {
+        row += '<td aria-hidden="true"></td>';
+    }
+    for (let day = 1; day <= daysInMonth; day++) {
+        const disabled = enabledDays.indexOf(day) === -1;
+        row += `<td role="gridcell" class="mat-calendar-body-cell${disabled ? ' mat-calendar-body-disabled' : ''}"
+                    data-day="${day}"><div class="mat-calendar-body-cell-content">${day}</div></td>`;
+        if ((leading + day) % 7 === 0) {
+            rows += '<tr>' + row + '</tr>';
+            row = '';
+        }
+    }
+    if (row) {
+        rows += '<tr>' + row + '</tr>';
+    }
+    document.getElementById('calendar-host').innerHTML = `
+        <mat-calendar class="mat-calendar reservation-calander">
+            <mat-calendar-header>
+                <button class="mat-calendar-period-button" type="button"><span>${MONTHS[state.month]} ${state.year}</span></button>
+                <button class="mat-calendar-previous-button" type="button">‹</button>
+                <button class="mat-calendar-next-button" type="button">›</button>
+            </mat-calendar-header>
+            <div class="mat-calendar-content">
+                <mat-month-view><table class="mat-calendar-table"><thead><tr>
+                    <th>Pn</th><th>Wt</th><th>Śr</th><th>Cz</th><th>Pt</th><th>So</th><th>Nd</th>
+                </tr></thead><tbody>${rows}</tbody></table></mat-month-view>
+            </div>
+        </mat-calendar>`;
+    document.getElementById('hours-host').innerHTML = '';
+    const host = document.getElementById('calendar-host');
+    host.querySelector('.mat-calendar-previous-button').addEventListener('click', () => {
+        const month = state.month === 1 ? 12 : state.month - 1;
+        showMonth(state.month === 1 ? state.year - 1 : state.year, month);
+    });
+    host.querySelector('.mat-calendar-next-button').addEventListener('click', () => {
+        const month = state.month === 12 ? 1 : state.month + 1;
+        showMonth(state.month === 12 ? state.year + 1 : state.year, month);
+    });
+    host.querySelectorAll('td[role="gridcell"]:not(.mat-calendar-body-disabled)').forEach((td) => {
+        td.addEventListener('click', () => selectDay(parseInt(td.dataset.day, 10)));
+    });
+}
+
+async function selectDay(day) {
+    spinner(true);
+    try {
+        const date = `${state.year}-${String(state.month).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
+        const data = await api(`/api/slots?location=${encodeURIComponent(state.location)}` +
+                               `&queue=${encodeURIComponent(state.queue)}&date=${date}`);
+        const tiles = data.map((slot) => `<div class="tile">${slot.date.slice(11, 16)}</div>`).join('');
+        document.getElementById('hours-host').innerHTML =
+            `<div class="reservation__hours"><div class="tiles tiles--hours"><div class="row">${tiles}</div></div></div>`;
+    } finally {
+        spinner(false);
+    }
+}
+
+if (CASE_PAGE) {
+    renderCase();
+} else {
+    renderLogin();
+}
+</script>
+</body>
+</html>
+'''
+
+
+class MockInpolServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scenario: MockScenario):
+        super().__init__(address, MockInpolHandler)
+        self.scenario = scenario
+        self.sessions = set()
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+
+class MockInpolHandler(BaseHTTPRequestHandler):
+    server: MockInpolServer
+
+    def log_message(self, fmt, *args):
+        logging.debug(f'mock: {fmt % args}')
+
+    def _send(self, status, body: bytes, content_type='application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, payload, status=200, headers=None):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), headers=headers)
+
+    def _authenticated(self):
+        for part in self.headers.get('Cookie', '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == SESSION_COOKIE and value in self.server.sessions:
+                return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.count(url.path)
+        scenario = self.server.scenario
+
+        if url.path in ('/', '/login', '/home') or url.path.startswith('/home/cases/'):
+            if url.path.startswith('/home/cases/') and not self._authenticated():
+                self._send(302, b'', headers={'Location': '/login'})
+                return
+            page = PAGE_HTML.replace('__MONTHS__', json.dumps(MONTH_NAMES, ensure_ascii=False))
+            self._send(200, page.encode('utf-8'), 'text/html; charset=utf-8')
+            return
+
+        if not url.path.startswith('/api/'):
+            self._send(404, b'{}')
+            return
+        if not self._authenticated():
+            self._json({'error': 'unauthorized'}, status=401)
+            return
+
+        scenario.sleep()
+        if url.path == '/api/locations':
+            self._json(scenario.locations)
+        elif url.path == '/api/queues':
+            self._json(scenario.queues if query.get('location') in scenario.locations else [])
+        elif url.path == '/api/dates':
+            self._json([day.isoformat() for day in scenario.offered_dates(datetime.date.today())])
+        elif url.path == '/api/slots':
+            offered = scenario.offered_dates(datetime.date.today())
+            furthest = offered[-1].isoformat() if offered else None
+            count = scenario.slots if query.get('date') == furthest else 0
+            self._json([{'id': i, 'date': f'{furthest}T{9 + i // 4:02d}:{(i % 4) * 15:02d}:00', 'count': 1}
+                        for i in range(count)])
+        else:
+            self._send(404, b'{}')
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        self.server.count(url.path)
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if url.path != '/api/login':
+            self._send(404, b'{}')
+            return
+        self.server.scenario.sleep()
+        if not self.server.scenario.login_ok:
+            self._json({'error': 'invalid credentials'}, status=401)
+            return
+        token = f'{random.getrandbits(64):016x}'
+        self.server.sessions.add(token)
+        self._json({'token': token}, headers={'Set-Cookie': f'{SESSION_COOKIE}={token}; Path=/'})
+
+
+def serve(scenario: MockScenario, host='127.0.0.1', port=0) -> MockInpolServer:
+    """Start the mock in a background thread; `port=0` picks a free port (see server.base_url)."""
+    server = MockInpolServer((host, port), scenario)
+    threading.Thread(target=server.serve_forever, name='mock-inpol', daemon=True).start()
+    return server
+
+
+def add_scenario_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds added to every API call')
+    parser.add_argument('--jitter', type=float, default=0.1, help='+- random part of the latency')
+    parser.add_argument('--horizon-days', type=int, default=40, help='how far ahead dates are offered')
+    parser.add_argument('--slots', type=int, default=0, help='time slots on the furthest date (0 = none)')
+    parser.add_argument('--login-fails', action='store_true', help='reject every login')
+
+
+def scenario_from_args(args) -> MockScenario:
+    return MockScenario(latency=args.latency, jitter=args.jitter, horizon_days=args.horizon_days,
+                        slots=args.slots, login_ok=not args.login_fails)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the Inpol site')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_scenario_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
+    server = MockInpolServer((args.host, args.port), scenario_from_args(args))
+    logging.info(f'Mock Inpol at {server.base_url} (INPOL_BASE_URL={server.base_url})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
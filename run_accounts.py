@@ -0,0 +1,14 @@
+import logging
+import os
+
+from lib.orchestrator import Orchestrator
+
+
+def main():
+    log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(format='[%(levelname)s] [orchestrator] %(message)s', level=log_level)
+    Orchestrator.from_env().run()
+
+
+if __name__ == '__main__':
+    main()
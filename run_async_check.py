@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+One check of all locations with the asyncio DevTools backend (lib.async_checker).
+
+Logs in once, then checks every location in its own tab of the same browser,
+all tabs in one event loop. Needs `pip install websockets`.
+Run with: EMAIL=... PASSWORD=... CASE_ID=... python run_async_check.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from lib.async_checker import AsyncChecker
+from lib.cdp import WEBSOCKETS_AVAILABLE, ChromeProcess
+from lib.checker_config import CheckerConfig
+from lib.messenger import ConsoleMessenger, TelegramMessenger
+from lib.profile_pool import ProfilePool
+
+
+async def check(config: CheckerConfig) -> dict[str, bool | None]:
+    profile = ProfilePool.from_env().acquire()
+    chrome = ChromeProcess(
+        profile_dir=profile.path,
+        binary=os.environ.get('CHROME_BINARY'),
+        headless=os.environ.get('HEADLESS', 'false').lower() == 'true',
+    )
+    try:
+        await chrome.start()
+        main = AsyncChecker(config, await chrome.new_tab())
+        if not await main.login():
+            logging.error('Login failed')
+            return {}
+        if not await main.open_case_page():
+            return {}
+        await main.expand_appointment_panel()
+        await main.expand_locations()
+        locations = await main.get_locations()
+        logging.info(f'Locations: {locations}')
+
+        # One tab per location; the logged-in cookies are shared by all tabs of the browser
+        checkers = [main] + [AsyncChecker(config, await chrome.new_tab()) for _ in locations[1:]]
+        results = await asyncio.gather(
+            # The main tab already has the list of locations open
+            *(checker.check_location(location, list_open=checker is main)
+              for checker, location in zip(checkers, locations)),
+            return_exceptions=True,
+        )
+        for checker in checkers:
+            logging.info(f'{checker.timer.location}: {checker.timer.summary()}')
+        return {location: (None if isinstance(result, Exception) else result)
+                for location, result in zip(locations, results)}
+    finally:
+        await chrome.close()
+        profile.release()
+
+
+def main():
+    log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=log_level)
+    if not WEBSOCKETS_AVAILABLE:
+        logging.error('websockets is not installed: pip install websockets')
+        sys.exit(1)
+
+    messenger = TelegramMessenger() if 'TELEGRAM_TOKEN' in os.environ and 'TELEGRAM_CHAT_ID' in os.environ \
+        else ConsoleMessenger()
+    config = CheckerConfig(
+        email=os.environ['EMAIL'],
+        password=os.environ['PASSWORD'],
+        case_id=os.environ['CASE_ID'],
+        messenger=messenger,
+        browser=None,
+    )
+    started = time.monotonic()
+    try:
+        results = asyncio.run(check(config))
+    finally:
+        messenger.flush()
+    for location, found in results.items():
+        logging.info(f'{location}: {"SLOTS" if found else "no slots" if found is False else "not checked"}')
+    logging.info(f'Checked {len(results)} location(s) in {time.monotonic() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
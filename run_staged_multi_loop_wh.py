@@ -1,104 +1,315 @@
+import argparse
+import contextlib
 import logging
 import os
 import time
 
+# Taken before the lib imports for --startup-profile
+_STARTED = time.perf_counter()
+
 from lib.browser_factory import BrowserFactory
+from lib.browser_pool import BrowserPool
+from lib.browser_session import BrowserSession
 from lib.checker import Checker
 from lib.checker_config import CheckerConfig
-from lib.messenger import ConsoleMessenger, TelegramMessenger
+from lib.date_cache import DateCache
+from lib.http_poller import HttpPoller, PollerError
+from lib.memory_governor import MemoryGovernor
+from lib.messenger import ConsoleMessenger, Messenger, PrefixedMessenger, TelegramMessenger
+from lib.observation_store import ObservationStore
+from lib.session_store import SessionStore
+from lib.slot_model import SlotHistory, SlotReleaseModel
+from lib.tab_pipeline import TabPipeline
+from lib.timing import PhaseTimer
 from lib.working_hours_runner import WorkingHours, WorkingHoursRunner
 
+_IMPORTED = time.perf_counter()
+
 
-def check():
-    browser = BrowserFactory().create(window_size='1300,800')
+def create_messenger():
     if 'TELEGRAM_TOKEN' in os.environ and 'TELEGRAM_CHAT_ID' in os.environ:
-        messenger = TelegramMessenger()
+        return TelegramMessenger()
+    return ConsoleMessenger()
+
+
+def fast_check(messenger: Messenger, poller: HttpPoller, slot_history: SlotHistory | None = None) -> bool:
+    """One cycle over plain HTTP. False if the browser flow has to run instead."""
+    try:
+        results = poller.poll()
+        failed = None
+    except PollerError as e:
+        # Slots found at the endpoints polled before the error are still real
+        results, failed = e.results, e
+    for endpoint, checked, slot_count in results:
+        if slot_count > 0:
+            msg = f'🎯 SLOT FOUND! {checked}: {endpoint.location} - {endpoint.queue} ({slot_count} slots)'
+            logging.info(msg)
+            messenger.send_message(msg)
+            if slot_history is not None:
+                slot_history.record(endpoint.location, endpoint.queue)
+    if failed is not None:
+        logging.warning(f'Fast path failed ({failed}), checking in the browser')
+        return False
+    return True
+
+
+def check_case(inpol: Checker, messenger: Messenger, slot_history: SlotHistory | None = None,
+               governor: MemoryGovernor | None = None) -> dict[str, bool]:
+    """Check every location of the case whose page is open. Returns location -> slots found."""
+    results = {}
+    inpol.expand_appointment_panel()
+    inpol.expand_locations()
+    locations = inpol.get_locations()
+
+    if len(locations) != CheckerConfig.count_of_locations:
+        msg = f'wrong list of locations {locations}'
+        logging.warning(msg)
+        messenger.send_message(msg)
+        if len(locations) == 0:
+            return results
+
+    if os.environ.get('PIPELINE_TABS', 'false').lower() == 'true':
+        return TabPipeline(inpol, messenger, slot_history, governor).run(locations)
+
+    # НЕ перемешиваем - проходим по порядку!
+    # Новый алгоритм: проверяем ТОЛЬКО ПОСЛЕДНЮЮ доступную дату
+
+    for location in locations:
+        logging.info(f'=== Checking location: {location} ===')
+        inpol.select_location(location)
+
+        try:
+            # Атомарно: открыть dropdown очередей и выбрать первую
+            queue = inpol.select_first_queue_atomic()
+
+            if queue is None:
+                msg = f'⚠️ No queues available for location "{location}" - skipping'
+                logging.warning(msg)
+                messenger.send_message(msg)
+                inpol.expand_locations()
+                continue
+
+            # Проверяем ТОЛЬКО последнюю доступную дату (игнорируя выходные)
+            slots_found = inpol.check_last_date_only(location=location, queue=queue)
+            results[location] = bool(slots_found)
+            if slots_found and slot_history is not None:
+                slot_history.record(location, queue)
+
+        except Exception as e:
+            logging.error(f'Error checking location "{location}": {e}')
+            # Продолжаем к следующему адресу
+
+        # Готовимся к следующему адресу
+        if governor is not None and location != locations[-1] and governor.between_locations(inpol.config.browser):
+            # The tab was reset to free memory: back to the case page
+            inpol.open_case_page()
+            inpol.expand_appointment_panel()
+        inpol.expand_locations()
+
+    return results
+
+
+def check(messenger: Messenger, session: BrowserSession | None = None, pool: BrowserPool | None = None,
+          poller: HttpPoller | None = None, slot_history: SlotHistory | None = None,
+          governor: MemoryGovernor | None = None, factory: BrowserFactory | None = None):
+    if poller is not None and poller.ready() and fast_check(messenger, poller, slot_history):
+        return
+
+    if session is not None:
+        browser = session.acquire()
+    elif pool is not None:
+        browser = pool.acquire()
     else:
-        messenger = ConsoleMessenger()
+        browser = (factory or BrowserFactory()).create(window_size='1300,800')
 
+    # CASE_ID may list several cases of the same account: one login, then each case page in turn
+    case_ids = [case_id.strip() for case_id in os.environ['CASE_ID'].split(',') if case_id.strip()]
+    results = {}
+    inpol = None
     try:
         config = CheckerConfig(
             email=os.environ['EMAIL'],
             password=os.environ['PASSWORD'],
-            case_id=os.environ['CASE_ID'],
+            case_id=case_ids[0],
             messenger=messenger,
             browser=browser,
+            date_cache=DateCache.from_env(),
+            session_store=SessionStore.from_env(),
+            observation_store=ObservationStore.from_env(),
         )
 
         inpol = Checker(config)
 
-        tries = 0
-        while not inpol.login():
-            if tries == 4:
-                return
-            tries += 1
-            time.sleep(tries * 2)
-
-        tries = 0
-        while not inpol.open_case_page():
-            if tries == 4:
-                return
-            tries += 1
-            time.sleep(tries * 2)
-
-        inpol.expand_appointment_panel()
-        inpol.expand_locations()
-        locations = inpol.get_locations()
+        if session is not None and session.authenticated and inpol.session_is_valid():
+            logging.info(f'Reusing browser session (cycle {session.cycles}/{session.max_cycles})')
+        elif inpol.restore_session():
+            if session is not None:
+                session.authenticated = True
+        else:
+            tries = 0
+            while not inpol.login():
+                if tries == 4:
+                    return
+                tries += 1
+                time.sleep(tries * 2)
+            if session is not None:
+                session.authenticated = True
 
-        if len(locations) != CheckerConfig.count_of_locations:
-            msg = f'wrong list of locations {locations}'
-            logging.warning(msg)
-            messenger.send_message(msg)
-            if len(locations) == 0:
-                return
-
-        # НЕ перемешиваем - проходим по порядку!
-        # Новый алгоритм: проверяем ТОЛЬКО ПОСЛЕДНЮЮ доступную дату
-        
-        for location in locations:
-            logging.info(f'=== Checking location: {location} ===')
-            inpol.select_location(location)
-            
-            try:
-                # Атомарно: открыть dropdown очередей и выбрать первую
-                queue = inpol.select_first_queue_atomic()
-                
-                if queue is None:
-                    msg = f'⚠️ No queues available for location "{location}" - skipping'
-                    logging.warning(msg)
-                    messenger.send_message(msg)
-                    inpol.expand_locations()
+            tries = 0
+            while not inpol.open_case_page():
+                if tries == 4:
+                    return
+                tries += 1
+                time.sleep(tries * 2)
+
+        for number, case_id in enumerate(case_ids):
+            case_messenger = messenger
+            if len(case_ids) > 1:
+                logging.info(f'##### Case {case_id} ({number + 1}/{len(case_ids)}) #####')
+                case_messenger = PrefixedMessenger(messenger, f'[{case_id}] ')
+                inpol.switch_case(case_id, case_messenger)
+                # The first case page was opened by the login/session check above
+                if number > 0 and not inpol.open_case_page():
+                    logging.error(f'Could not open case {case_id}, skipping it')
                     continue
-                
-                # Проверяем ТОЛЬКО последнюю доступную дату (игнорируя выходные)
-                slots_found = inpol.check_last_date_only(location=location, queue=queue)
-                
-            except Exception as e:
-                logging.error(f'Error checking location "{location}": {e}')
-                # Продолжаем к следующему адресу
-            
-            # Готовимся к следующему адресу
-            inpol.expand_locations()
+            results[case_id] = check_case(inpol, case_messenger, slot_history, governor)
 
+        for case_id, case_results in results.items():
+            checked = ', '.join(f'{location}: {"SLOTS" if found else "no slots"}'
+                                for location, found in case_results.items())
+            logging.info(f'Case {case_id}: {checked or "nothing checked"}')
+        logging.info(inpol.idle_waiter.summary())
+        logging.info(inpol.timer.summary())
+        if poller is not None and inpol.network is not None and len(case_ids) == 1:
+            poller.prime(browser, list(inpol.network.availability.values()))
         logging.debug('end')
 
+    except Exception:
+        if session is not None:
+            # Unknown page/driver state - start the next cycle from a fresh browser
+            session.recycle()
+        raise
+
     finally:
-        browser.quit()
+        browser_mb = None
+        if governor is not None:
+            try:
+                browser_mb, recycle = governor.after_cycle(browser)
+                if recycle and session is not None:
+                    session.recycle()
+            except Exception as e:
+                logging.debug(f'Could not check browser memory: {e}')
+        if inpol is not None:
+            inpol.timer.write_cycle(case_id=','.join(case_ids), browser_mb=browser_mb)
+            if inpol.config.observation_store is not None:
+                inpol.config.observation_store.close()
+        if session is None:
+            browser.quit()
 
 
-def main():
+def main(gate=None):
+    """`gate` wraps every check cycle (a context manager), e.g. the orchestrator's concurrency limit."""
     log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
     logging.basicConfig(format='[%(levelname)s] %(message)s', level=log_level)
 
-    WorkingHoursRunner(
-        sleep_interval=os.environ.get('SLEEP_INTERVAL', '15m'),
-        sleep_interval_jitter=os.environ.get('SLEEP_INTERVAL_JITTER', '3m'),
-        working_hours=[
-            WorkingHours(begin_displace_from_midnight='7h30m', end_displace_from_midnight='29h59m59s'),
-            WorkingHours(begin_displace_from_midnight='0s', end_displace_from_midnight='57m')
-        ]
-    ).run(check)
+    # One messenger for the whole run: its sender thread and connection outlive single loops
+    messenger = create_messenger()
+    poller = HttpPoller.from_env()
+    governor = MemoryGovernor.from_env()
+    # Found slots are recorded whenever there is a history file; SCHEDULE_MODE=learned also schedules from it
+    slot_model = SlotReleaseModel.from_env()
+    slot_history = slot_model.history if slot_model is not None else SlotHistory.from_env()
+    factory = BrowserFactory()
+    session = None
+    pool = None
+    if os.environ.get('SESSION_REUSE', 'false').lower() == 'true':
+        session = BrowserSession.from_env(factory)
+    elif os.environ.get('PREWARM_LEAD'):
+        # A reused session is already warm; the pool only helps when every loop starts a new browser
+        pool = BrowserPool(factory, size=int(os.environ.get('PREWARM_POOL_SIZE', '1')))
+
+    try:
+        runner = WorkingHoursRunner(
+            sleep_interval=os.environ.get('SLEEP_INTERVAL', '15m'),
+            sleep_interval_jitter=os.environ.get('SLEEP_INTERVAL_JITTER', '3m'),
+            working_hours=[
+                WorkingHours(begin_displace_from_midnight='7h30m', end_displace_from_midnight='29h59m59s'),
+                WorkingHours(begin_displace_from_midnight='0s', end_displace_from_midnight='57m')
+            ],
+            prewarm=(lambda: pool.prewarm(Checker.login_page_url())) if pool is not None else None,
+            prewarm_lead=os.environ.get('PREWARM_LEAD', '0s'),
+        )
+        if slot_model is not None:
+            runner.interval_model = lambda dt: slot_model.interval_at(dt, active=runner.in_working_hours)
+            logging.info(f'Learned intervals today: {slot_model.describe(runner.dt_now().weekday())}')
+        gate = gate or contextlib.nullcontext()
+
+        def cycle():
+            with gate:
+                check(messenger, session, pool, poller, slot_history, governor, factory)
+            if slot_history is not None:
+                slot_history.record_check()
+
+        runner.run(cycle)
+    finally:
+        if session is not None:
+            session.close()
+        if pool is not None:
+            pool.close()
+        messenger.flush()
+
+
+def _process_age() -> float | None:
+    """Seconds since this process was started (Linux), to include interpreter startup."""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def startup_profile():
+    """Start one browser, load the login page and print where the time to the first driver.get went."""
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=os.environ.get("LOG_LEVEL", "INFO").upper())
+    age = _process_age()
+    interpreter = age - (time.perf_counter() - _STARTED) if age is not None else None
+
+    timer = PhaseTimer()
+    factory = BrowserFactory(timer=timer)
+    started = time.perf_counter()
+    browser = factory.create(window_size='1300,800')
+    timer.add('browser_total', started)
+    try:
+        started = time.perf_counter()
+        browser.get(Checker.login_page_url())
+        timer.add('first_get', started)
+    finally:
+        browser.quit()
+    total = time.perf_counter() - _STARTED
+
+    print('Startup profile (time to first driver.get):')
+    if interpreter is not None:
+        print(f'  {"interpreter":<16} {interpreter:8.3f}s')
+    print(f'  {"imports":<16} {_IMPORTED - _STARTED:8.3f}s')
+    # The phases inside BrowserFactory.create() end before browser_total does: print them after it, indented
+    outer = {record.phase: record.seconds for record in timer.records
+             if record.phase in ('browser_total', 'first_get')}
+    print(f'  {"browser_total":<16} {outer["browser_total"]:8.3f}s')
+    for record in timer.records:
+        if record.phase not in outer:
+            print(f'    {record.phase:<14} {record.seconds:8.3f}s')
+    print(f'  {"first_get":<16} {outer["first_get"]:8.3f}s')
+    print(f'  {"total":<16} {total + (interpreter or 0):8.3f}s')
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Check Inpol for free slots during working hours')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='start the browser once, load the login page and report the startup phases')
+    if parser.parse_args().startup_profile:
+        startup_profile()
+    else:
+        main()
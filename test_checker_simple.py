@@ -148,6 +148,7 @@ def main():
     finally:
         logging.info("Closing browser...")
         browser.quit()
+        messenger.flush()
         logging.info("Done!")
 
 
@@ -0,0 +1,58 @@
+import json
+
+from lib import date_cache
+from lib.date_cache import DateCache
+
+DATE_INFO = {'date': '18', 'month_year': 'GRU 2026', 'months_forward': 2, 'base_month_year': 'PAŹ 2026'}
+
+
+def test_put_then_get(tmp_path):
+    cache = DateCache(str(tmp_path / 'cache.json'), ttl_seconds=60)
+    cache.put('123', 'Marszałkowska', DATE_INFO)
+    entry = cache.get('123', 'Marszałkowska')
+    assert {key: entry[key] for key in DATE_INFO} == DATE_INFO
+    assert cache.get('123', 'Aleje') is None
+    assert cache.get('456', 'Marszałkowska') is None
+
+
+def test_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / 'nested' / 'cache.json')
+    DateCache(path, ttl_seconds=60).put('123', 'Aleje', DATE_INFO)
+    assert DateCache(path, ttl_seconds=60).get('123', 'Aleje')['month_year'] == 'GRU 2026'
+
+
+def test_expired_entry_is_dropped(tmp_path, monkeypatch):
+    cache = DateCache(str(tmp_path / 'cache.json'), ttl_seconds=60)
+    now = 1_800_000_000.0
+    monkeypatch.setattr(date_cache.time, 'time', lambda: now)
+    cache.put('123', 'Aleje', DATE_INFO)
+    now += 61
+    assert cache.get('123', 'Aleje') is None
+    with open(cache.path, encoding='utf-8') as f:
+        assert json.load(f) == {}
+
+
+def test_invalidate_keeps_other_entries(tmp_path):
+    cache = DateCache(str(tmp_path / 'cache.json'), ttl_seconds=60)
+    cache.put('123', 'Aleje', DATE_INFO)
+    cache.put('123', 'Marszałkowska', DATE_INFO)
+    cache.invalidate('123', 'Aleje')
+    assert cache.get('123', 'Aleje') is None
+    assert cache.get('123', 'Marszałkowska') is not None
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / 'cache.json'
+    path.write_text('{not json', encoding='utf-8')
+    cache = DateCache(str(path), ttl_seconds=60)
+    assert cache.get('123', 'Aleje') is None
+    cache.put('123', 'Aleje', DATE_INFO)
+    assert cache.get('123', 'Aleje') is not None
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATE_CACHE_PATH', str(tmp_path / 'cache.json'))
+    monkeypatch.setenv('DATE_CACHE_TTL', '2h')
+    cache = DateCache.from_env()
+    assert cache.path == str(tmp_path / 'cache.json')
+    assert cache.ttl_seconds == 7200
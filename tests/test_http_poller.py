@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+
+pytest.importorskip('requests')
+
+import mock_inpol
+from lib.http_poller import HttpPoller, PollerError
+from lib.network_capture import Availability
+
+LOCATION = 'al. Jerozolimskie 28'
+QUEUE = 'X - Złożenie wniosku'
+
+
+@pytest.fixture
+def server():
+    server = mock_inpol.serve(mock_inpol.MockScenario(latency=0, jitter=0, slots=2))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class LoggedInDriver:
+    """What the poller takes over from the browser: User-Agent, cookies, localStorage."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def execute_script(self, script):
+        if 'userAgent' in script:
+            return 'Mozilla/5.0 (test)'
+        return {'token': '"token-from-local-storage"'}
+
+    def get_cookies(self):
+        return [{'name': mock_inpol.SESSION_COOKIE, 'value': self.session, 'domain': '127.0.0.1', 'path': '/'}]
+
+
+def availability(server, location=LOCATION, dates_path='/api/dates'):
+    query = f'location={location}&queue={QUEUE}'
+    return Availability(location, QUEUE, dates_url=f'{server.base_url}{dates_path}?{query}',
+                        slots_url=f'{server.base_url}/api/slots?{query}&date=2026-01-02')
+
+
+def primed_poller(server, availabilities):
+    server.sessions.add('session-1')
+    poller = HttpPoller(min_interval=0, timeout=5)
+    poller.prime(LoggedInDriver('session-1'), availabilities)
+    return poller
+
+
+def test_poll_checks_the_furthest_date(server):
+    poller = primed_poller(server, [availability(server)])
+    assert poller.ready()
+    assert poller.session.headers['Authorization'] == 'Bearer token-from-local-storage'
+    [(endpoint, checked, slot_count)] = poller.poll()
+    furthest = server.scenario.offered_dates(datetime.date.today())[-1]
+    assert endpoint.location == LOCATION
+    assert checked.startswith(f'{furthest.day} ') and checked.endswith(str(furthest.year))
+    assert slot_count == 2
+    assert server.requests['/api/dates'] == 1 and server.requests['/api/slots'] == 1
+
+
+def test_expired_session_falls_back(server):
+    poller = primed_poller(server, [availability(server)])
+    server.sessions.clear()
+    with pytest.raises(PollerError, match='401'):
+        poller.poll()
+    assert not poller.ready()
+
+
+def test_error_keeps_what_was_found_before(server):
+    poller = primed_poller(server, [availability(server), availability(server, 'ul. Długa 5', '/api/missing')])
+    with pytest.raises(PollerError) as error:
+        poller.poll()
+    assert [(endpoint.location, slot_count) for endpoint, _, slot_count in error.value.results] == [(LOCATION, 2)]
+    assert not poller.ready()
+
+
+def test_prime_without_urls():
+    poller = HttpPoller(min_interval=0)
+    poller.prime(LoggedInDriver('x'), [Availability(LOCATION, QUEUE)])
+    assert not poller.ready()
+    with pytest.raises(PollerError):
+        poller.poll()
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv('HTTP_POLL', 'true')
+    monkeypatch.setenv('CASE_ID', '123')
+    monkeypatch.delenv('NETWORK_CAPTURE', raising=False)
+    assert HttpPoller.from_env() is None
+    monkeypatch.setenv('NETWORK_CAPTURE', 'true')
+    assert isinstance(HttpPoller.from_env(), HttpPoller)
+    # The learned urls belong to one case page
+    monkeypatch.setenv('CASE_ID', '123, 456')
+    assert HttpPoller.from_env() is None
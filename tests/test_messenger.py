@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip('requests')
+
+import requests
+
+from lib import messenger as messenger_module
+from lib.messenger import PrefixedMessenger, TelegramMessenger
+
+
+class Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = str(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers posts from a list of responses (or exceptions to raise)."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.posts = []
+
+    def post(self, url, data, timeout):
+        self.posts.append((url, data))
+        answer = self.answers.pop(0) if self.answers else Response(200)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(messenger_module.time, 'sleep', delays.append)
+    monkeypatch.setattr(messenger_module.random, 'random', lambda: 0.0)
+    return delays
+
+
+def telegram(answers, max_retries=5):
+    tm = TelegramMessenger(token='TOKEN', chat_id='42', api_url='http://telegram.test/', max_retries=max_retries)
+    tm.session = FakeSession(answers)
+    return tm
+
+
+def test_429_waits_retry_after(sleeps):
+    tm = telegram([Response(429, {'ok': False, 'parameters': {'retry_after': 7}}), Response(200)])
+    tm.send_message('🎯 SLOT FOUND!')
+    assert tm.flush(timeout=5)
+    assert sleeps == [7.0]
+    assert tm.session.posts == [('http://telegram.test/botTOKEN/sendMessage', {'chat_id': '42', 'text': '🎯 SLOT FOUND!'})] * 2
+
+
+def test_server_and_connection_errors_back_off(sleeps):
+    tm = telegram([Response(502), requests.ConnectionError('reset'), Response(200)])
+    tm.send_message('hello')
+    assert tm.flush(timeout=5)
+    assert sleeps == [1.0, 2.0]
+    assert len(tm.session.posts) == 3
+
+
+def test_client_error_is_not_retried(sleeps):
+    tm = telegram([Response(400, {'ok': False, 'description': 'chat not found'})])
+    tm.send_message('hello')
+    assert tm.flush(timeout=5)
+    assert sleeps == []
+    assert len(tm.session.posts) == 1
+
+
+def test_gives_up_after_max_retries(sleeps):
+    tm = telegram([Response(500)] * 10, max_retries=2)
+    tm.send_message('hello')
+    assert tm.flush(timeout=5)
+    assert len(tm.session.posts) == 3
+    assert sleeps == [1.0, 2.0]
+
+
+def test_prefixed_messenger():
+    sent = []
+
+    class Recorder(messenger_module.Messenger):
+        def send_message(self, body):
+            sent.append(body)
+
+    PrefixedMessenger(Recorder(), '[123] ').send_message('no slots')
+    assert sent == ['[123] no slots']
@@ -0,0 +1,151 @@
+import base64
+import datetime
+import json
+
+import pytest
+
+from lib.network_capture import Availability, NetworkCapture, parse_dates, parse_slots
+
+DATES_URL = 'https://inpol.test/api/reservations/queue/q1/dates'
+SLOTS_URL = 'https://inpol.test/api/reservations/queue/q1/2026-12-14/slots'
+
+
+class FakeDriver:
+    """Performance log and response bodies of a Chrome with network logging."""
+
+    def __init__(self):
+        self.log = []
+        self.bodies = {}
+
+    def get_log(self, kind):
+        log, self.log = self.log, []
+        return log
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.getResponseBody':
+            return self.bodies[params['requestId']]
+        return {}
+
+    def request(self, request_id, url, payload, tab='TAB1', status=200, finished=True, encode=False):
+        """Log a whole request/response and keep its body."""
+        self.sent(request_id, tab)
+        self._log(tab, 'Network.responseReceived', requestId=request_id, response={'status': status, 'url': url})
+        text = json.dumps(payload)
+        if encode:
+            self.bodies[request_id] = {'body': base64.b64encode(text.encode()).decode(), 'base64Encoded': True}
+        else:
+            self.bodies[request_id] = {'body': text}
+        if finished:
+            self.finished(request_id, tab)
+
+    def sent(self, request_id, tab='TAB1'):
+        self._log(tab, 'Network.requestWillBeSent', requestId=request_id)
+
+    def finished(self, request_id, tab='TAB1'):
+        self._log(tab, 'Network.loadingFinished', requestId=request_id)
+
+    def _log(self, tab, method, **params):
+        self.log.append({'message': json.dumps({'webview': tab, 'message': {'method': method, 'params': params}})})
+
+
+def test_parse_dates():
+    assert parse_dates(['2026-12-14T00:00:00', '2026-11-30', '2026-12-14']) == [
+        datetime.date(2026, 11, 30), datetime.date(2026, 12, 14)]
+    with pytest.raises(ValueError):
+        parse_dates({'dates': []})
+    with pytest.raises(ValueError):
+        parse_dates(['14.12.2026'])
+
+
+def test_parse_slots():
+    assert parse_slots([{'date': '2026-12-14T09:30:00', 'id': 1}, {'date': '2026-12-14T10:00:00', 'id': 2}]) == {
+        datetime.date(2026, 12, 14): ['09:30', '10:00']}
+    assert parse_slots([]) == {}
+    with pytest.raises(ValueError):
+        parse_slots([{'time': '09:30'}])
+    with pytest.raises(ValueError):
+        parse_slots('none')
+
+
+def test_availability():
+    availability = Availability('Aleje', 'Q1', dates=[datetime.date(2026, 12, 14), datetime.date(2026, 12, 19)])
+    assert availability.furthest_date() == datetime.date(2026, 12, 19)
+    assert availability.furthest_date(lambda day: day.weekday() < 5) == datetime.date(2026, 12, 14)
+    assert availability.furthest_date(lambda day: False) is None
+    assert 'no dates captured' in Availability('Aleje', 'Q1').summary()
+
+
+def test_collect_dates_and_slots():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.request('1', DATES_URL, ['2026-12-14', '2026-11-30'])
+    driver.request('2', SLOTS_URL, [{'date': '2026-12-14T09:30:00'}], encode=True)
+    driver.request('3', 'https://inpol.test/api/profile', {'name': 'x'})
+    driver.request('4', DATES_URL, ['2027-01-04'], status=500)
+    availability = capture.collect('Aleje', 'Q1')
+    assert availability.dates == [datetime.date(2026, 11, 30), datetime.date(2026, 12, 14)]
+    assert availability.slots == {datetime.date(2026, 12, 14): ['09:30']}
+    assert (availability.dates_url, availability.slots_url) == (DATES_URL, SLOTS_URL)
+    assert capture.availability[('Aleje', 'Q1')] is availability
+
+
+def test_empty_slots_response_marks_the_date():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.request('1', SLOTS_URL, [])
+    assert capture.collect('Aleje', 'Q1').slots == {datetime.date(2026, 12, 14): []}
+
+
+def test_unfinished_response_is_read_later():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.request('1', DATES_URL, ['2026-12-14'], finished=False)
+    assert capture.collect('Aleje', 'Q1').dates == []
+    driver.finished('1')
+    assert capture.collect('Aleje', 'Q1').dates == [datetime.date(2026, 12, 14)]
+
+
+def test_skip_ignores_late_responses_of_the_previous_queue():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    # Sent for the previous location, still in flight when the next one is selected
+    driver.sent('1')
+    driver.request('2', DATES_URL, ['2026-12-01'], finished=False)
+    capture.skip()
+    driver.request('1', SLOTS_URL, [{'date': '2026-12-14T09:30:00'}])
+    driver.finished('2')
+    driver.request('3', DATES_URL, ['2027-01-04'])
+    availability = capture.collect('Marszałkowska', 'Q2')
+    assert availability.dates == [datetime.date(2027, 1, 4)]
+    assert availability.slots == {}
+
+
+def test_target_reads_only_its_tab():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.request('1', DATES_URL, ['2026-12-14'], tab='TAB1')
+    driver.request('2', DATES_URL, ['2027-01-04'], tab='TAB2')
+    capture.target = 'CDwindow-tab2'
+    assert capture.collect('Marszałkowska', 'Q2').dates == [datetime.date(2027, 1, 4)]
+    capture.target = 'tab1'
+    assert capture.collect('Aleje', 'Q1').dates == [datetime.date(2026, 12, 14)]
+
+
+def test_unknown_payload_leaves_availability_empty():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.request('1', DATES_URL, {'unexpected': True})
+    assert capture.collect('Aleje', 'Q1').dates == []
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv('NETWORK_CAPTURE', raising=False)
+    assert NetworkCapture.from_env(FakeDriver()) is None
+    monkeypatch.setenv('NETWORK_CAPTURE', 'true')
+    assert isinstance(NetworkCapture.from_env(FakeDriver()), NetworkCapture)
+
+    class NoLog(FakeDriver):
+        def get_log(self, kind):
+            raise ValueError('log type performance not found')
+
+    assert NetworkCapture.from_env(NoLog()) is None
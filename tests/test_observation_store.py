@@ -0,0 +1,48 @@
+import sqlite3
+
+from lib.observation_store import Observation, ObservationStore
+from lib.timing import PhaseRecord, PhaseTimer
+
+
+def test_rows_are_written_on_flush(tmp_path):
+    store = ObservationStore(str(tmp_path / 'db' / 'observations.sqlite'))
+    store.add(Observation('123', 'Aleje', 'Q1', furthest_date='2026-12-14', enabled_dates=12, slot_count=2,
+                          timings={'wait_spinner': {'count': 1, 'total': 0.4, 'max': 0.4}}))
+    store.add(Observation('123', 'Długa', 'Q1', captcha=True))
+    assert not (tmp_path / 'db').exists()
+    store.close()
+
+    connection = sqlite3.connect(store.path)
+    assert connection.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    rows = connection.execute('SELECT location, furthest_date, enabled_dates, slot_count, captcha, timings '
+                              'FROM observations ORDER BY id').fetchall()
+    assert rows == [
+        ('Aleje', '2026-12-14', 12, 2, 0, '{"wait_spinner": {"count": 1, "total": 0.4, "max": 0.4}}'),
+        ('Długa', None, 0, 0, 1, '{}'),
+    ]
+    assert store.pending == []
+
+
+def test_reopened_store_appends(tmp_path):
+    path = str(tmp_path / 'observations.sqlite')
+    for location in ('Aleje', 'Długa'):
+        store = ObservationStore(path)
+        store.add(Observation('123', location))
+        store.close()
+    assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM observations').fetchone() == (2,)
+
+
+def test_timings_since_a_mark():
+    # A location checked again (another case, another loop) only gets the records of its own pass
+    timer = PhaseTimer(records=[PhaseRecord('select_location', 3.0, 'Aleje'), PhaseRecord('login', 1.0)])
+    mark = len(timer.records)
+    timer.records.append(PhaseRecord('select_location', 0.5, 'Aleje'))
+    assert timer.locations(mark)['Aleje']['select_location'] == {'count': 1, 'total': 0.5, 'max': 0.5}
+    assert timer.locations()['Aleje']['select_location']['count'] == 2
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv('OBSERVATION_DB', raising=False)
+    assert ObservationStore.from_env() is None
+    monkeypatch.setenv('OBSERVATION_DB', str(tmp_path / 'o.sqlite'))
+    assert ObservationStore.from_env().path == str(tmp_path / 'o.sqlite')
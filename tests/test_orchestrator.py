@@ -0,0 +1,114 @@
+import json
+import threading
+
+import pytest
+
+from lib import orchestrator
+from lib.orchestrator import Account, CycleSlots, Orchestrator, parallel_limit
+
+
+class Process:
+    """Stands in for a worker process."""
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.exitcode = None if alive else -9
+        self.pid = 1000
+
+    def is_alive(self):
+        return self.alive
+
+
+def test_accounts_file(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([
+        {'name': 'anna', 'EMAIL': 'anna@example.com', 'CASE_ID': 1},
+        {'EMAIL': 'oleg@example.com', 'PROFILE_PATH': '/profiles/oleg'},
+    ]), encoding='utf-8')
+    anna, oleg = Account.load(str(path))
+    assert (anna.name, anna.env['CASE_ID']) == ('anna', '1')
+    assert oleg.name == 'oleg'
+
+    base = {'PROFILE_PATH': '/profiles', 'TIMINGS_PATH': '/data/timings.jsonl', 'LOG_LEVEL': 'DEBUG'}
+    env = anna.environment(base)
+    assert env['TIMINGS_PATH'] == '/data/timings-anna.jsonl'
+    assert env['PROFILE_PATH'] == '/profiles/anna'
+    assert env['LOG_LEVEL'] == 'DEBUG'
+    assert oleg.environment(base)['PROFILE_PATH'] == '/profiles/oleg'
+
+
+def test_account_names_must_be_unique(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([{'name': 'anna'}, {'name': 'anna'}]), encoding='utf-8')
+    with pytest.raises(ValueError):
+        Account.load(str(path))
+
+
+def test_parallel_limit(monkeypatch):
+    monkeypatch.setenv('MAX_PARALLEL', '8')
+    assert parallel_limit(accounts=3) == 3
+    monkeypatch.setenv('MAX_PARALLEL', '0')
+    assert parallel_limit(accounts=3) == 1
+    monkeypatch.delenv('MAX_PARALLEL')
+    monkeypatch.setattr(orchestrator, 'available_memory_mb', lambda: 1500)
+    monkeypatch.setattr(orchestrator.os, 'cpu_count', lambda: 16)
+    assert parallel_limit(accounts=5, browser_memory_mb=700) == 2
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = Orchestrator([Account(f'account{i}', {}) for i in range(3)], parallel=1)
+    for worker in supervisor._workers:
+        worker.process = Process()
+    return supervisor
+
+
+def slots_of(supervisor, index):
+    return CycleSlots(index, supervisor._wanted, supervisor._held, supervisor._granted[index], supervisor._wakeup)
+
+
+def ask(supervisor, index) -> threading.Thread:
+    """Acquire a slot for worker `index` in a thread, as its process would."""
+    thread = threading.Thread(target=slots_of(supervisor, index).acquire, daemon=True)
+    thread.start()
+    supervisor._wakeup.wait(5)
+    supervisor._wakeup.clear()
+    return thread
+
+
+def test_slots_are_granted_in_order_and_within_the_limit(supervisor):
+    first = ask(supervisor, 0)
+    second = ask(supervisor, 1)
+    supervisor._grant_slots()
+    first.join(5)
+    assert not first.is_alive()
+    assert second.is_alive()
+    assert list(supervisor._held) == [1, 0, 0]
+
+    slots_of(supervisor, 0).release()
+    supervisor._grant_slots()
+    second.join(5)
+    assert not second.is_alive()
+    assert list(supervisor._held) == [0, 1, 0]
+
+
+def test_slot_of_a_dead_worker_is_taken_back(supervisor):
+    ask(supervisor, 0).join(0.1)
+    supervisor._grant_slots()
+    waiting = ask(supervisor, 1)
+    # Killed while holding the slot, before it could give it back
+    supervisor._workers[0].process = Process(alive=False)
+    supervisor._reap(supervisor._workers[0])
+    assert supervisor._workers[0].restart_at is not None
+    assert list(supervisor._held) == [0, 0, 0]
+    supervisor._grant_slots()
+    waiting.join(5)
+    assert not waiting.is_alive()
+    assert list(supervisor._held) == [0, 1, 0]
+
+
+def test_dead_worker_is_not_granted_a_slot(supervisor):
+    ask(supervisor, 2).join(0.1)
+    supervisor._workers[2].process = Process(alive=False)
+    supervisor._grant_slots()
+    assert list(supervisor._held) == [0, 0, 0]
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+pytest.importorskip('cryptography.fernet')
+
+from lib.session_store import SessionStore
+
+ORIGIN = 'https://inpol.mazowieckie.pl/login'
+
+
+class FakeDriver:
+    def __init__(self, cookies=(), local_storage=None, current_url='about:blank'):
+        self.cookies = list(cookies)
+        self.local_storage = dict(local_storage or {})
+        self.current_url = current_url
+        self.added = []
+        self.visited = []
+
+    def get_cookies(self):
+        return self.cookies
+
+    def add_cookie(self, cookie):
+        self.added.append(cookie)
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        if args:
+            self.local_storage.update(args[0])
+            return None
+        return dict(self.local_storage)
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / 'session.bin'
+    return SessionStore(str(path), f'{path}.key')
+
+
+def test_saved_session_is_encrypted(store):
+    store.save(FakeDriver([{'name': 'SESSION', 'value': 'secret-cookie'}], {'token': '"secret-token"'}))
+    with open(store.path, 'rb') as f:
+        raw = f.read()
+    assert b'secret-cookie' not in raw and b'secret-token' not in raw
+    assert oct(os.stat(store.key_path).st_mode & 0o777) == '0o600'
+    payload = store.load()
+    assert payload['cookies'] == [{'name': 'SESSION', 'value': 'secret-cookie'}]
+    assert payload['local_storage'] == {'token': '"secret-token"'}
+
+
+def test_other_key_cannot_read_it(store, tmp_path):
+    store.save(FakeDriver([{'name': 'SESSION', 'value': 'x'}]))
+    assert SessionStore(store.path, str(tmp_path / 'other.key')).load() is None
+
+
+def test_restore_filters_foreign_cookies(store):
+    store.save(FakeDriver([
+        {'name': 'SESSION', 'value': 'a', 'domain': '.mazowieckie.pl', 'expiry': 1893456000.7, 'size': 8},
+        {'name': 'tracker', 'value': 'b', 'domain': 'example.com'},
+    ], {'token': 't'}))
+    driver = FakeDriver()
+    assert store.restore(driver, ORIGIN)
+    assert driver.visited == [ORIGIN]
+    assert driver.added == [{'name': 'SESSION', 'value': 'a', 'domain': '.mazowieckie.pl', 'expiry': 1893456000}]
+    assert driver.local_storage == {'token': 't'}
+
+
+def test_restore_without_saved_session(store):
+    driver = FakeDriver()
+    assert not store.restore(driver, ORIGIN)
+    assert driver.visited == []
+
+
+def test_clear(store):
+    store.save(FakeDriver())
+    store.clear()
+    assert store.load() is None
+    store.clear()
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv('SESSION_STORE_PATH', raising=False)
+    assert SessionStore.from_env() is None
+    monkeypatch.setenv('SESSION_STORE_PATH', str(tmp_path / 'session.bin'))
+    monkeypatch.delenv('SESSION_KEY_PATH', raising=False)
+    assert SessionStore.from_env().key_path == str(tmp_path / 'session.bin.key')
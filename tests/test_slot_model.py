@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+import pytz
+
+from lib.slot_model import SlotHistory, SlotReleaseModel
+
+WARSAW = pytz.timezone('Europe/Warsaw')
+MONDAY = datetime.date(2026, 10, 12)
+
+
+def at(hour, minute=0, day=MONDAY):
+    return WARSAW.localize(datetime.datetime.combine(day, datetime.time(hour, minute)))
+
+
+@pytest.fixture
+def history(tmp_path):
+    return SlotHistory(str(tmp_path / 'history.jsonl'))
+
+
+def test_history_keeps_finds_and_checks_apart(history):
+    history.record('Marszałkowska', 'Q1', found_at=at(9, 5))
+    history.record_check(checked_at=at(9, 0))
+    history.record_check(checked_at=at(9, 20))
+    with open(history.path, 'a', encoding='utf-8') as f:
+        f.write('not json\n')
+    assert history.load() == [at(9, 5)]
+    assert history.load('checked_at') == [at(9, 0), at(9, 20)]
+
+
+def test_missing_history(history):
+    assert history.load() == []
+    assert history.mtime() == 0.0
+
+
+def test_histogram_is_a_find_rate(history):
+    model = SlotReleaseModel(history, prior=1.0, prior_checks=10.0)
+    for minute in range(10):
+        history.record_check(checked_at=at(9, minute))
+    history.record('Aleje', found_at=at(9, 3))
+    for minute in range(30):
+        history.record_check(checked_at=at(14, minute))
+    history.record('Aleje', found_at=at(14, 3))
+    rates = model.histogram()[MONDAY.weekday()]
+    assert rates[model.bin_of(at(9, 0))] == pytest.approx(2 / 20)
+    # Same number of finds, but three times the checks: a lower rate
+    assert rates[model.bin_of(at(14, 0))] == pytest.approx(2 / 40)
+    assert rates[model.bin_of(at(3, 0))] == pytest.approx(1 / 10)
+
+
+def test_histogram_reloads_when_the_file_changes(history):
+    model = SlotReleaseModel(history)
+    before = model.histogram()[MONDAY.weekday()][model.bin_of(at(9, 0))]
+    history.record('Aleje', found_at=at(9, 3))
+    model._loaded_mtime = -2.0  # mtime resolution may hide a write within the same tick
+    assert model.histogram()[MONDAY.weekday()][model.bin_of(at(9, 0))] > before
+
+
+def test_allocation_spends_the_budget_within_bounds(history):
+    model = SlotReleaseModel(history, daily_budget=80, bin_minutes=30, min_interval=180, max_interval=2700)
+    weights = [1.0] * 48
+    weights[18] = 100.0  # 09:00
+    checks = model.allocation(weights, list(range(48)))
+    assert sum(checks.values()) == pytest.approx(80)
+    # 30 minute bins: between 1800/2700 and 1800/180 checks
+    assert all(1800 / 2700 - 1e-9 <= c <= 10 + 1e-9 for c in checks.values())
+    assert checks[18] == pytest.approx(10)
+    assert checks[0] == pytest.approx((80 - 10) / 47)
+
+
+def test_allocation_keeps_proportions_between_unclamped_bins(history):
+    model = SlotReleaseModel(history, daily_budget=80, bin_minutes=30, min_interval=180, max_interval=2700)
+    weights = [1.0] * 48
+    weights[20] = 3.0
+    weights[30] = 1000.0
+    checks = model.allocation(weights, list(range(48)))
+    assert sum(checks.values()) == pytest.approx(80)
+    assert checks[30] == pytest.approx(10)
+    assert checks[20] == pytest.approx(3 * checks[1])
+
+
+def test_allocation_when_the_bounds_cannot_meet_the_budget(history):
+    model = SlotReleaseModel(history, daily_budget=1000, bin_minutes=30, min_interval=180, max_interval=2700)
+    checks = model.allocation([1.0] * 48, list(range(48)))
+    assert all(c == pytest.approx(10) for c in checks.values())
+
+
+def test_interval_at_follows_the_find_rate(history):
+    model = SlotReleaseModel(history, daily_budget=80, min_interval=180, max_interval=2700)
+    for week in range(4):
+        day = MONDAY - datetime.timedelta(weeks=week)
+        for minute in range(0, 30, 3):
+            history.record_check(checked_at=at(9, minute, day))
+        for minute in range(5):
+            history.record('Aleje', found_at=at(9, minute, day))
+    busy = model.interval_at(at(9, 10))
+    quiet = model.interval_at(at(15, 10))
+    assert 180 <= busy < quiet <= 2700
+
+
+def test_interval_at_only_spreads_over_active_bins(history):
+    model = SlotReleaseModel(history, daily_budget=40, min_interval=60, max_interval=7200)
+    office = lambda dt: 8 <= dt.hour < 16
+    # 40 checks over 16 active bins of 30 minutes instead of 48 bins
+    assert model.interval_at(at(10, 0), active=office) == pytest.approx(1800 / (40 / 16))
+    assert model.interval_at(at(10, 0)) == pytest.approx(1800 / (40 / 48))
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv('SCHEDULE_MODE', raising=False)
+    assert SlotReleaseModel.from_env() is None
+    monkeypatch.setenv('SCHEDULE_MODE', 'learned')
+    monkeypatch.setenv('SLOT_HISTORY_PATH', str(tmp_path / 'h.jsonl'))
+    monkeypatch.setenv('SLOT_BIN', '1h')
+    monkeypatch.setenv('MIN_INTERVAL', '5m')
+    model = SlotReleaseModel.from_env()
+    assert (model.bin_minutes, model.bins_per_day, model.min_interval) == (60, 24, 300)
@@ -0,0 +1,65 @@
+import json
+
+from lib.timing import PhaseRecord, PhaseTimer, timed
+
+
+class Stage:
+    def __init__(self):
+        self.timer = PhaseTimer()
+
+    @timed('select_location')
+    def select(self, name):
+        self.timer.location = name
+        return name
+
+    @timed('broken')
+    def fail(self):
+        raise RuntimeError('spinner never went away')
+
+
+def test_timed_records_phases_per_location():
+    stage = Stage()
+    assert stage.select('Aleje') == 'Aleje'
+    with stage.timer.phase('wait_spinner'):
+        pass
+    stage.select('Długa')
+    phases = stage.timer.phases()
+    assert phases['select_location']['count'] == 2
+    assert set(stage.timer.locations()) == {'Aleje', 'Długa'}
+    assert set(stage.timer.locations()['Aleje']) == {'select_location', 'wait_spinner'}
+
+
+def test_failed_phase_is_recorded():
+    stage = Stage()
+    try:
+        stage.fail()
+    except RuntimeError:
+        pass
+    assert stage.timer.phases()['broken']['count'] == 1
+
+
+def test_aggregate():
+    timer = PhaseTimer(records=[PhaseRecord('login', 1.25), PhaseRecord('login', 0.5), PhaseRecord('get', 2.0)])
+    assert timer.phases()['login'] == {'count': 2, 'total': 1.75, 'max': 1.25}
+    assert timer.summary().startswith('Phase timings: get 1x 2.00s, login 2x 1.75s')
+    assert PhaseTimer().summary() == 'Phase timings: none'
+
+
+def test_write_cycle(tmp_path, monkeypatch):
+    path = tmp_path / 'timings.jsonl'
+    monkeypatch.setenv('TIMINGS_PATH', str(path))
+    timer = PhaseTimer(records=[PhaseRecord('login', 1.0), PhaseRecord('select_location', 0.5, 'Aleje')])
+    timer.write_cycle(case_id='123', browser_mb=512)
+    timer.write_cycle(case_id='123')
+    lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert len(lines) == 2
+    assert lines[0]['case_id'] == '123' and lines[0]['browser_mb'] == 512
+    assert lines[0]['phases']['login']['total'] == 1.0
+    assert lines[0]['locations'] == {'Aleje': {'select_location': {'count': 1, 'total': 0.5, 'max': 0.5}}}
+
+
+def test_write_cycle_without_path(tmp_path, monkeypatch):
+    monkeypatch.delenv('TIMINGS_PATH', raising=False)
+    monkeypatch.chdir(tmp_path)
+    PhaseTimer().write_cycle()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,51 @@
+import datetime
+
+from lib import working_days
+from lib.working_days import WorkingDayIndex, easter_sunday, is_holiday, parse_month_year, polish_holidays
+
+
+def test_easter_sunday():
+    assert easter_sunday(2024) == datetime.date(2024, 3, 31)
+    assert easter_sunday(2025) == datetime.date(2025, 4, 20)
+    assert easter_sunday(2026) == datetime.date(2026, 4, 5)
+    assert easter_sunday(2038) == datetime.date(2038, 4, 25)
+
+
+def test_movable_holidays_follow_easter():
+    holidays = polish_holidays(2026)
+    assert datetime.date(2026, 4, 6) in holidays   # Poniedziałek Wielkanocny
+    assert datetime.date(2026, 5, 24) in holidays  # Zielone Świątki
+    assert datetime.date(2026, 6, 4) in holidays   # Boże Ciało
+
+
+def test_christmas_eve_is_a_holiday_from_2025():
+    assert not is_holiday(datetime.date(2024, 12, 24))
+    assert is_holiday(datetime.date(2025, 12, 24))
+
+
+def test_index_skips_weekends_and_holidays():
+    index = WorkingDayIndex(datetime.date(2026, 11, 1), months=2)
+    assert not index.is_bookable(2026, 11, 11)  # Święto Niepodległości, Wednesday
+    assert not index.is_bookable(2026, 11, 14)  # Saturday
+    assert index.is_bookable(2026, 11, 12)
+    # 24, 25 and 26 December are holidays, 27 is Sunday
+    assert index.last_bookable_day(2026, 12) == 31
+    assert not index.is_bookable(2026, 12, 24)
+
+
+def test_index_adds_months_outside_its_range():
+    index = WorkingDayIndex(datetime.date(2026, 1, 1), months=1)
+    # May 2027 ends on a Monday
+    assert index.last_bookable_day(2027, 5) == 31
+    assert not index.is_bookable(2027, 5, 3)  # Święto Konstytucji 3 Maja
+
+
+def test_parse_month_year():
+    assert parse_month_year('PAŹ 2025') == (2025, 10)
+    assert parse_month_year('GRU 2026') == (2026, 12)
+    assert parse_month_year('') == (None, None)
+    assert parse_month_year('STY rok') == (None, None)
+
+
+def test_month_names_cover_the_year():
+    assert sorted(working_days.MONTHS_PL.values()) == list(range(1, 13))
@@ -0,0 +1,98 @@
+import datetime
+
+import pytest
+import pytz
+
+from lib.working_hours_runner import WorkingHours, WorkingHoursRunner
+
+WARSAW = pytz.timezone('Europe/Warsaw')
+
+
+def warsaw(*args):
+    return WARSAW.localize(datetime.datetime(*args))
+
+
+@pytest.fixture
+def runner():
+    # The working hours of run_staged_multi_loop_wh.py: 07:30 until 05:59:59 the next day, plus 00:00-00:57
+    return WorkingHoursRunner(
+        sleep_interval='15m',
+        sleep_interval_jitter='3m',
+        working_hours=[
+            WorkingHours(begin_displace_from_midnight='7h30m', end_displace_from_midnight='29h59m59s'),
+            WorkingHours(begin_displace_from_midnight='0s', end_displace_from_midnight='57m'),
+        ],
+    )
+
+
+@pytest.fixture
+def office_hours():
+    return WorkingHoursRunner(
+        sleep_interval='15m',
+        sleep_interval_jitter='0s',
+        working_hours=[WorkingHours(begin_displace_from_midnight='8h', end_displace_from_midnight='16h')],
+    )
+
+
+def test_window_spanning_midnight(runner):
+    assert runner.in_working_hours(warsaw(2026, 1, 10, 3, 0))  # opened at 07:30 the day before
+    assert runner.in_working_hours(warsaw(2026, 1, 10, 5, 59, 59))
+    assert not runner.in_working_hours(warsaw(2026, 1, 10, 6, 0))
+    assert not runner.in_working_hours(warsaw(2026, 1, 10, 7, 29))
+    assert runner.in_working_hours(warsaw(2026, 1, 10, 7, 30))
+
+
+def test_next_eligible(runner, office_hours):
+    inside = warsaw(2026, 1, 10, 12, 0)
+    assert runner.next_eligible(inside) == inside
+    assert runner.next_eligible(warsaw(2026, 1, 10, 6, 30)) == warsaw(2026, 1, 10, 7, 30)
+    # After the last window of the day: the first one of the next day
+    assert office_hours.next_eligible(warsaw(2026, 1, 10, 20, 0)) == warsaw(2026, 1, 11, 8, 0)
+    assert office_hours.next_eligible(warsaw(2026, 1, 10, 23, 59, 59)) == warsaw(2026, 1, 11, 8, 0)
+
+
+def test_offsets_are_wall_clock_on_dst_days(runner, office_hours):
+    # 2026-03-29 has 23 hours, 2026-10-25 has 25 hours; windows still start at 07:30 / 08:00 local time
+    for day in (datetime.date(2026, 3, 29), datetime.date(2026, 10, 25)):
+        begin, _ = runner.windows_on(day)[0]
+        assert (begin.hour, begin.minute) == (7, 30)
+        begin, end = office_hours.windows_on(day)[0]
+        assert (begin.hour, end.hour) == (8, 16)
+    assert runner.windows_on(datetime.date(2026, 3, 29))[0][0].utcoffset() == datetime.timedelta(hours=2)
+    assert runner.windows_on(datetime.date(2026, 10, 25))[0][0].utcoffset() == datetime.timedelta(hours=1)
+    # Saturday evening before the spring change: the next run is Sunday 08:00 CEST
+    assert office_hours.next_eligible(warsaw(2026, 3, 28, 20, 0)) == warsaw(2026, 3, 29, 8, 0)
+
+
+def test_naive_and_utc_datetimes(office_hours):
+    assert office_hours.in_working_hours(datetime.datetime(2026, 1, 10, 9, 0))
+    # 07:30 UTC is 08:30 in Warsaw in winter
+    assert office_hours.in_working_hours(datetime.datetime(2026, 1, 10, 7, 30, tzinfo=pytz.utc))
+    assert not office_hours.in_working_hours(datetime.datetime(2026, 7, 10, 5, 30, tzinfo=pytz.utc))
+
+
+def test_schedule_merges_overlapping_windows(runner):
+    schedule = runner.schedule(warsaw(2026, 1, 10, 12, 0), days=1)
+    # 07:30 .. 05:59:59 the next day swallows that day's 00:00 .. 00:57; the window of the day before has ended
+    assert schedule[0] == (warsaw(2026, 1, 10, 7, 30), warsaw(2026, 1, 11, 5, 59, 59))
+    assert all(end < next_begin for (_, end), (next_begin, _) in zip(schedule, schedule[1:]))
+
+
+def test_random_sleep_within_jitter(runner):
+    for _ in range(100):
+        assert 15 * 60 - 90 <= runner.random_sleep() <= 15 * 60 + 90
+
+
+def test_random_sleep_from_interval_model(runner):
+    seen = []
+    runner.interval_model = lambda dt: seen.append(dt) or 120.0
+    for _ in range(100):
+        # Jitter is capped at half the modelled interval
+        assert 90 <= runner.random_sleep(datetime.datetime(2026, 1, 10, 12, 0)) <= 150
+    assert seen[0] == warsaw(2026, 1, 10, 12, 0)
+
+
+def test_no_working_hours():
+    runner = WorkingHoursRunner(sleep_interval='1m', sleep_interval_jitter='0s', working_hours=[])
+    assert not runner.in_working_hours(warsaw(2026, 1, 10, 12, 0))
+    assert runner.next_eligible(warsaw(2026, 1, 10, 12, 0)) is None